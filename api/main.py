@@ -1,4 +1,5 @@
 
+import asyncio
 import sys
 import os
 
@@ -14,20 +15,41 @@ if SRC_DIR not in sys.path:
 
 from workflow.orchestrator import Orchestrator
 
+from typing import Optional
+
 from fastapi import FastAPI
 from pydantic import BaseModel
 from workflow.orchestrator import Orchestrator
 from db.database import save_history
+from tools.custom.claim_evidence_extractor import enable_micro_batching
+from tools.custom.nlp_service import get_nlp_service_stats
 
 app = FastAPI(title="Agentic Research Assistant API")
 
 orchestrator = Orchestrator()
 
+# Concurrent requests share batched spaCy passes (NLP_BATCH_WINDOW_MS).
+enable_micro_batching()
+
 class QueryInput(BaseModel):
     query: str
+    use_cache: bool = True
+    # Memory is kept per session; requests without one share a store.
+    session_id: Optional[str] = None
 
 @app.post("/query")
-def run_query(data: QueryInput):
-    response = orchestrator.run(data.query)
-    save_history(data.query, response)
+async def run_query(data: QueryInput):
+    # Runs on the event loop; only CPU-bound steps and blocking I/O use threads.
+    response = await orchestrator.run_async(data.query, use_cache=data.use_cache, session_id=data.session_id)
+    await asyncio.to_thread(save_history, data.query, response)
     return {"response": response}
+
+@app.get("/metrics")
+def get_metrics():
+    return orchestrator.get_metrics()
+
+@app.get("/health")
+def health():
+    nlp_service = get_nlp_service_stats()
+    healthy = nlp_service is None or nlp_service.get("status") == "ok"
+    return {"status": "ok" if healthy else "degraded", "nlp_service": nlp_service}
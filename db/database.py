@@ -1,12 +1,18 @@
 import sqlite3
 import os
 import shutil
+import threading
 from datetime import datetime
 from utils.logger import log_info, log_error
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "db", "history.db")
-DB_BACKUP_PATH = os.path.join(BASE_DIR, "db", "history_backup.db")
+# HISTORY_DB_PATH moves the history database (tests and benchmarks use a temp dir).
+DB_PATH = os.environ.get("HISTORY_DB_PATH") or os.path.join(BASE_DIR, "db", "history.db")
+DB_BACKUP_PATH = os.path.splitext(DB_PATH)[0] + "_backup.db"
+
+# The database is initialized on first use rather than on import.
+_DB_READY = False
+_DB_INIT_LOCK = threading.Lock()
 
 
 def backup_database():
@@ -95,8 +101,19 @@ def init_db():
         raise
 
 
+def ensure_db():
+    """Run init_db once per process, before the first history access."""
+    global _DB_READY
+    if not _DB_READY:
+        with _DB_INIT_LOCK:
+            if not _DB_READY:
+                init_db()
+                _DB_READY = True
+
+
 def save_history(query: str, response: str):
     """Save query history with error handling and backup."""
+    ensure_db()
     try:
         conn = sqlite3.connect(DB_PATH, timeout=10.0)
         c = conn.cursor()
@@ -137,6 +154,7 @@ def save_history(query: str, response: str):
 
 def get_history():
     """Get query history with error handling."""
+    ensure_db()
     try:
         conn = sqlite3.connect(DB_PATH, timeout=10.0)
         c = conn.cursor()
@@ -151,6 +169,7 @@ def get_history():
 
 def get_entry_count() -> int:
     """Get total number of entries in database."""
+    ensure_db()
     try:
         conn = sqlite3.connect(DB_PATH, timeout=10.0)
         c = conn.cursor()
@@ -161,7 +180,3 @@ def get_entry_count() -> int:
     except Exception as e:
         log_error(f"Error getting entry count: {e}")
         return 0
-
-
-# Initialize DB on import
-init_db()
\ No newline at end of file
@@ -3,11 +3,16 @@ from utils.api_client import ask_backend
 import sqlite3
 import os
 import time
+import uuid
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "..", "db", "history.db")
+DB_PATH = os.environ.get("HISTORY_DB_PATH") or os.path.join(os.path.dirname(__file__), "..", "db", "history.db")
 
 st.set_page_config(page_title="Agentic Research Assistant", layout="wide", page_icon="🤖")
 
+# Each browser session gets its own memory on the backend.
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+
 # Custom CSS for better UX
 st.markdown("""
 <style>
@@ -87,7 +92,7 @@ if run_button:
         
         try:
             # Make API call
-            response = ask_backend(query)
+            response = ask_backend(query, session_id=st.session_state["session_id"])
             
             # Complete
             progress_bar.progress(100)
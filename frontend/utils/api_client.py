@@ -2,8 +2,11 @@ import requests
 
 API_URL = "http://localhost:8000/query"
 
-def ask_backend(query: str):
-    response = requests.post(API_URL, json={"query": query})
+def ask_backend(query: str, session_id: str = None):
+    payload = {"query": query}
+    if session_id:
+        payload["session_id"] = session_id
+    response = requests.post(API_URL, json=payload)
     if response.status_code == 200:
         return response.json().get("response", "")
     return "Error: API call failed."
@@ -1,4 +1,11 @@
 # Initializes the agents package.
-from .research_agent import ResearchAgent
-from .analysis_agent import AnalysisAgent
-from .writer_agent import WriterAgent
+
+from utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "ResearchAgent": ".research_agent",
+    "AnalysisAgent": ".analysis_agent",
+    "WriterAgent": ".writer_agent",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
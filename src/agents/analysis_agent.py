@@ -1,11 +1,14 @@
 # This module defines the AnalysisAgent, which summarizes sources
 # and uses the custom claim/evidence extractor tool.
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-from tools.built_in.summarizer_tool import summarize_documents
-from tools.custom.claim_evidence_extractor import extract_claims_and_evidence
-from memory.memory_manager import MemoryManager
+from tools.built_in.parsed_document import parse_documents
+from tools.built_in.stream_summary import is_streamed, join_summary, select_stream_sentences
+from tools.built_in.summarizer_tool import get_summary_mode, summarize_parsed
+from tools.custom.claim_evidence_extractor import extract_claims_and_evidence_parsed
+from memory.memory_manager import ANALYSIS_FACT_SOURCE, MemoryManager
+from utils.async_utils import run_cpu_bound
 from utils.logger import log_info
 
 
@@ -17,11 +20,16 @@ class AnalysisAgent:
     def run(self, query: str, sources: List[Dict[str, str]]) -> Dict[str, object]:
         # This method summarizes sources and extracts claims and evidence.
         log_info("AnalysisAgent: starting analysis step")
-        summary = summarize_documents(sources)
-        extraction = extract_claims_and_evidence(summary)
+        if get_summary_mode() == "stream" or is_streamed(sources):
+            summary, extraction = self._summarize_streamed(query, sources)
+        else:
+            # Each source is segmented once; the summarizer picks sentences and
+            # the extractor classifies exactly those, keeping their source ids.
+            parsed = parse_documents(sources)
+            summary, picked = summarize_parsed(parsed, query=query)
+            extraction = extract_claims_and_evidence_parsed(parsed, picked)
         # This stores the main claims as "facts" for future context.
-        for c in extraction.get("claims", []):
-            self.memory.add_fact(c, source="analysis_summary")
+        self.memory.add_facts(extraction.get("claims", []), source=ANALYSIS_FACT_SOURCE)
 
         analysis_result: Dict[str, object] = {
             "query": query,
@@ -29,9 +37,29 @@ class AnalysisAgent:
             "claims": extraction.get("claims", []),
             "evidence": extraction.get("evidence", []),
             "confidence": extraction.get("confidence", 0.0),
+            "claim_sources": extraction.get("claim_sources", []),
+            "evidence_sources": extraction.get("evidence_sources", []),
         }
         log_info(
             f"AnalysisAgent: analysis done with {len(analysis_result['claims'])} claims "
             f"and confidence {analysis_result['confidence']}"
         )
         return analysis_result
+
+    def _summarize_streamed(self, query: str, sources: List[Dict[str, object]]) -> Tuple[str, Dict[str, object]]:
+        # This method reads the sources incrementally; only the picked
+        # sentences are parsed for extraction, and their source ids are
+        # mapped back to the original sources.
+        picks = select_stream_sentences(sources, query=query)
+        parsed = parse_documents([{"content": sentence} for _, _, sentence in picks])
+        extraction = extract_claims_and_evidence_parsed(
+            parsed, [(k, i) for k, doc in enumerate(parsed) for i in range(len(doc))]
+        )
+        origin = [source for source, _, _ in picks]
+        for field in ("claim_sources", "evidence_sources"):
+            extraction[field] = [origin[k] for k in extraction.get(field, [])]
+        return join_summary(picks), extraction
+
+    async def run_async(self, query: str, sources: List[Dict[str, str]]) -> Dict[str, object]:
+        # Parsing and extraction are CPU-bound, so they run on the CPU pool.
+        return await run_cpu_bound(self.run, query, sources)
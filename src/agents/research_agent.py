@@ -1,24 +1,107 @@
 # This module defines the ResearchAgent, responsible for finding
 # relevant documents using the web_search tool and using memory.
 
-from typing import List, Dict
+import asyncio
+import os
+from typing import List, Dict, Optional
 
 from tools.built_in.web_search_tool import web_search
-from memory.memory_manager import MemoryManager
+from tools.built_in.async_search_tool import web_search_fanout, web_search_fanout_async
+from tools.built_in.dedup_tool import dedupe_sources
+from memory.memory_manager import ANALYSIS_FACT_SOURCE, MemoryManager
 from utils.logger import log_info
 
+# Title of the source document built from claims recalled from memory.
+MEMORY_SOURCE_TITLE = "Memory: earlier research"
+
 
 class ResearchAgent:
     # This class represents an agent specialized in information retrieval.
-    def __init__(self, memory: MemoryManager) -> None:
+    def __init__(
+        self,
+        memory: MemoryManager,
+        max_subqueries: Optional[int] = None,
+        search_deadline: Optional[float] = None,
+        dedup_threshold: Optional[float] = None,
+        memory_recall: Optional[int] = None,
+    ) -> None:
         self.memory = memory
+        # This controls web search fan-out: how many sub-queries are issued
+        # concurrently, and how long to wait for them before merging.
+        self.max_subqueries = max_subqueries or int(os.environ.get("SEARCH_FANOUT", "3"))
+        self.search_deadline = search_deadline or float(os.environ.get("SEARCH_DEADLINE", "5.0"))
+        # This is the shingle similarity above which sources count as
+        # mirrors of one another; values above 1 disable de-duplication.
+        if dedup_threshold is None:
+            dedup_threshold = float(os.environ.get("SOURCE_DEDUP_THRESHOLD", "0.7"))
+        self.dedup_threshold = dedup_threshold
+        # This is how many relevant claims from earlier analyses are looked
+        # up before searching (0 disables), and how many strong matches let
+        # memory stand in for the search fan-out. A match is strong when it
+        # contains at least MEMORY_RECALL_MIN_SCORE of the query terms; raw
+        # BM25 scores are not comparable between memory backends.
+        self.memory_recall = memory_recall if memory_recall is not None else int(os.environ.get("MEMORY_RECALL", "5"))
+        self.memory_min_hits = int(os.environ.get("MEMORY_RECALL_MIN_HITS", "3"))
+        self.memory_min_score = float(os.environ.get("MEMORY_RECALL_MIN_SCORE", "0.6"))
+
+    def recall(self, query: str) -> Optional[Dict[str, str]]:
+        # This method turns prior claims relevant to the query into one
+        # source document, if memory holds enough of them.
+        if self.memory_recall <= 0:
+            return None
+        facts = self.memory.get_relevant_context(query, k=self.memory_recall)["facts"]
+        claims = [
+            f["fact"] for f in facts
+            if ANALYSIS_FACT_SOURCE in f.get("sources", []) and f["relevance"] >= self.memory_min_score
+        ]
+        if len(claims) < self.memory_min_hits:
+            return None
+        return {"title": MEMORY_SOURCE_TITLE, "url": "", "content": " ".join(claims)}
 
     def run(self, query: str, top_k: int = 3) -> List[Dict[str, str]]:
         # This method executes the research step using the web_search tool.
         log_info("ResearchAgent: starting research step")
-        results = web_search(query, top_k=top_k)
+        recalled = self.recall(query)
+        if recalled is not None:
+            # Memory covers part of the question, so one plain search fills
+            # the remaining slots instead of the concurrent fan-out.
+            log_info("ResearchAgent: answering partly from memory")
+            results = [recalled] + web_search(query, top_k=max(1, top_k - 1))
+        elif self.max_subqueries > 1:
+            results = web_search_fanout(
+                query, top_k=top_k, max_subqueries=self.max_subqueries, deadline=self.search_deadline
+            )
+        else:
+            results = web_search(query, top_k=top_k)
+        return self._finish(results, recalled)
+
+    async def run_async(self, query: str, top_k: int = 3) -> List[Dict[str, str]]:
+        # This method is run() for the asyncio pipeline: searches are awaited
+        # on the event loop and memory access runs in a worker thread.
+        log_info("ResearchAgent: starting research step")
+        recalled = await asyncio.to_thread(self.recall, query)
+        if recalled is not None:
+            log_info("ResearchAgent: answering partly from memory")
+            results = [recalled] + await web_search_fanout_async(
+                query, top_k=max(1, top_k - 1), max_subqueries=1, deadline=self.search_deadline
+            )
+        else:
+            results = await web_search_fanout_async(
+                query, top_k=top_k, max_subqueries=max(1, self.max_subqueries), deadline=self.search_deadline
+            )
+        return await asyncio.to_thread(self._finish, results, recalled)
+
+    def _finish(self, results: List[Dict[str, str]], recalled: Optional[Dict[str, str]]) -> List[Dict[str, str]]:
+        # This private method merges mirrors and records the consulted sources.
+        if self.dedup_threshold <= 1.0:
+            unique = dedupe_sources(results, threshold=self.dedup_threshold)
+            if len(unique) < len(results):
+                log_info(f"ResearchAgent: merged {len(results) - len(unique)} near-duplicate sources")
+            results = unique
         # This stores brief "facts" about which titles were consulted.
         for r in results:
+            if r is recalled:
+                continue
             title = r.get("title", "Untitled Source")
             self.memory.add_fact(f"Consulted source: {title}", source=title)
         log_info(f"ResearchAgent: completed with {len(results)} results")
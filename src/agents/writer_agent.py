@@ -1,6 +1,7 @@
 # This module defines the WriterAgent, which converts analysis results
 # into a nicely formatted markdown response for the user.
 
+import asyncio
 from typing import Dict, List
 
 from tools.built_in.formatter_tool import format_markdown_response
@@ -33,3 +34,7 @@ class WriterAgent:
         self.memory.add_conversation(query=query, response=response)
         log_info("WriterAgent: writing step completed")
         return response
+
+    async def run_async(self, query: str, analysis: Dict[str, object], sources: List[Dict[str, str]]) -> str:
+        # Formatting is cheap; the thread keeps the memory write off the loop.
+        return await asyncio.to_thread(self.run, query, analysis, sources)
@@ -1,3 +1,12 @@
 # Initializes the controller package.
-from .controller import Controller
-from .protocol import AgentMessage, ControllerDecision
+
+from utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "Controller": ".controller",
+    "AgentMessage": ".protocol",
+    "ControllerDecision": ".protocol",
+    "QueryResult": ".protocol",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,8 +1,9 @@
 
+import asyncio
 import time
-from typing import Dict, Any, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
 
-from controller.protocol import AgentMessage, ControllerDecision
+from controller.protocol import AgentMessage, ControllerDecision, QueryResult
 from agents.research_agent import ResearchAgent
 from agents.analysis_agent import AnalysisAgent
 from agents.writer_agent import WriterAgent
@@ -10,6 +11,64 @@ from rl.feedback_loop import evaluate_response_quality, should_retry
 from utils.logger import log_info, log_error  
 from utils.validators import validate_query
 
+T = TypeVar("T")
+
+WRITER_FALLBACK = "# System Error\n\nUnable to generate response. Please try again."
+INVALID_QUERY_MESSAGE = "Your query appears to be empty. Please provide a meaningful question."
+
+
+def system_error(e: Exception) -> str:
+    return f"# System Error\n\nAn unexpected error occurred: {str(e)}\nPlease try again or contact support."
+
+
+def check_sources(sources: List[Dict[str, Any]]) -> None:
+    if not sources:
+        raise ValueError("No sources returned from research agent")
+
+
+def check_analysis(analysis: Dict[str, Any]) -> None:
+    # Validate analysis output
+    if not isinstance(analysis, dict):
+        raise ValueError("Analysis returned invalid format")
+    if "summary" not in analysis:
+        raise ValueError("Analysis missing required 'summary' field")
+
+
+def check_response(response: str) -> None:
+    if not response or len(response.strip()) < 50:
+        raise ValueError("Writer returned insufficient content")
+
+
+def research_fallback(query: str) -> List[Dict[str, Any]]:
+    # Fallback: return minimal context
+    return [{
+        "title": "System Notice",
+        "content": f"Unable to retrieve sources for query: {query}. Using cached knowledge.",
+        "degraded": True,
+    }]
+
+
+def analysis_fallback(query: str) -> Dict[str, Any]:
+    # Fallback: basic analysis
+    return {
+        "query": query,
+        "summary": "Analysis could not be completed. Please try a different query.",
+        "claims": [],
+        "evidence": [],
+        "confidence": 0.0,
+        "degraded": True,
+    }
+
+
+def is_degraded(sources: List[Dict[str, Any]], analysis: Dict[str, Any], response: str) -> bool:
+    # This function reports whether a run used any fallback output.
+    return (
+        any(source.get("degraded") for source in sources)
+        or bool(analysis.get("degraded"))
+        or response == WRITER_FALLBACK
+    )
+
+
 class Controller:
     def __init__(
         self,
@@ -34,9 +93,7 @@ class Controller:
                 log_info(f"Research attempt {attempt + 1}/{self.max_retries}")
                 sources = self.research_agent.run(query=query, top_k=3)
                 
-                if not sources or len(sources) == 0:
-                    raise ValueError("No sources returned from research agent")
-                
+                check_sources(sources)
                 return sources
                 
             except Exception as e:
@@ -47,11 +104,7 @@ class Controller:
                     time.sleep(self.retry_delay)
                 else:
                     log_error("Research failed after all retries. Using fallback.")
-                    # Fallback: return minimal context
-                    return [{
-                        "title": "System Notice",
-                        "content": f"Unable to retrieve sources for query: {query}. Using cached knowledge."
-                    }]
+                    return research_fallback(query)
 
     def _handle_analysis_with_retry(self, msg: AgentMessage) -> Dict[str, Any]:
         """Execute analysis with automatic retry on failure."""
@@ -63,13 +116,7 @@ class Controller:
                 log_info(f"Analysis attempt {attempt + 1}/{self.max_retries}")
                 analysis = self.analysis_agent.run(query=query, sources=sources)
                 
-                # Validate analysis output
-                if not isinstance(analysis, dict):
-                    raise ValueError("Analysis returned invalid format")
-                
-                if "summary" not in analysis:
-                    raise ValueError("Analysis missing required 'summary' field")
-                
+                check_analysis(analysis)
                 return analysis
                 
             except Exception as e:
@@ -78,15 +125,8 @@ class Controller:
                 if attempt < self.max_retries - 1:
                     time.sleep(self.retry_delay)
                 else:
-                    # Fallback: basic analysis
                     log_error("Analysis failed. Using fallback analysis.")
-                    return {
-                        "query": query,
-                        "summary": "Analysis could not be completed. Please try a different query.",
-                        "claims": [],
-                        "evidence": [],
-                        "confidence": 0.0
-                    }
+                    return analysis_fallback(query)
 
     def _handle_writer_with_retry(self, msg: AgentMessage) -> str:
         """Execute writer with automatic retry on failure."""
@@ -99,9 +139,7 @@ class Controller:
                     sources=msg.payload.get("sources", [])
                 )
                 
-                if not response or len(response.strip()) < 50:
-                    raise ValueError("Writer returned insufficient content")
-                
+                check_response(response)
                 return response
                 
             except Exception as e:
@@ -110,17 +148,21 @@ class Controller:
                 if attempt < self.max_retries - 1:
                     time.sleep(self.retry_delay)
                 else:
-                    return "# System Error\n\nUnable to generate response. Please try again."
+                    return WRITER_FALLBACK
 
     def handle_query(self, query: str) -> str:
         """Handle query with comprehensive error recovery."""
+        return self.run_query(query).response
+
+    def run_query(self, query: str) -> QueryResult:
+        """handle_query, also reporting whether the report is degraded."""
         log_info(f"Controller: received query: {query}")
 
         try:
             # Validate query
             if not validate_query(query):
                 log_error("Controller: invalid query provided")
-                return "Your query appears to be empty. Please provide a meaningful question."
+                return QueryResult(INVALID_QUERY_MESSAGE)
 
             # Step 1: Research with retry
             research_msg = AgentMessage(
@@ -158,11 +200,81 @@ class Controller:
                 response = self._handle_writer_with_retry(writer_msg)
 
             log_info("Controller: Successfully completed query")
-            return response
+            return QueryResult(response, is_degraded(sources, analysis, response))
+
+        except Exception as e:
+            log_error(f"Critical error in controller: {str(e)}")
+            return QueryResult(system_error(e), degraded=True)
+
+    async def _retry_async(
+        self, step: str, call: Callable[[], Awaitable[T]], check: Callable[[T], None], fallback: Callable[[], T]
+    ) -> T:
+        """Await call() until check() accepts its result; waits never hold a thread."""
+        for attempt in range(self.max_retries):
+            try:
+                log_info(f"{step} attempt {attempt + 1}/{self.max_retries}")
+                result = await call()
+                check(result)
+                return result
+            except Exception as e:
+                log_error(f"{step} failed on attempt {attempt + 1}: {str(e)}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay)
+        log_error(f"{step} failed after all retries. Using fallback.")
+        return fallback()
+
+    async def handle_query_async(self, query: str) -> str:
+        """handle_query for the asyncio pipeline, with the same recovery."""
+        return (await self.run_query_async(query)).response
+
+    async def run_query_async(self, query: str) -> QueryResult:
+        """run_query for the asyncio pipeline."""
+        log_info(f"Controller: received query: {query}")
+
+        try:
+            if not validate_query(query):
+                log_error("Controller: invalid query provided")
+                return QueryResult(INVALID_QUERY_MESSAGE)
+
+            sources = await self._retry_async(
+                "Research",
+                lambda: self.research_agent.run_async(query=query, top_k=3),
+                check_sources,
+                lambda: research_fallback(query),
+            )
+
+            async def analyze() -> Dict[str, Any]:
+                return await self._retry_async(
+                    "Analysis",
+                    lambda: self.analysis_agent.run_async(query=query, sources=sources),
+                    check_analysis,
+                    lambda: analysis_fallback(query),
+                )
+
+            async def write(analysis: Dict[str, Any]) -> str:
+                return await self._retry_async(
+                    "Writer",
+                    lambda: self.writer_agent.run_async(query=query, analysis=analysis, sources=sources),
+                    check_response,
+                    lambda: WRITER_FALLBACK,
+                )
+
+            analysis = await analyze()
+            response = await write(analysis)
+
+            # Quality check and potential retry
+            quality = evaluate_response_quality(analysis, response)
+            if should_retry(quality):
+                log_info("Controller: Low quality detected, attempting improvement")
+                analysis = await analyze()
+                response = await write(analysis)
+
+            log_info("Controller: Successfully completed query")
+            return QueryResult(response, is_degraded(sources, analysis, response))
 
         except Exception as e:
             log_error(f"Critical error in controller: {str(e)}")
-            return f"# System Error\n\nAn unexpected error occurred: {str(e)}\nPlease try again or contact support."
+            return QueryResult(system_error(e), degraded=True)
 
     # Keep old methods but mark as deprecated
     def _handle_research(self, msg: AgentMessage) -> List[Dict[str, Any]]:
@@ -14,6 +14,14 @@ class AgentMessage:
     payload: Dict[str, Any]
 
 
+@dataclass
+class QueryResult:
+    # This dataclass carries a report and whether any step of the run fell
+    # back (failed research or analysis, writer fallback or a system error).
+    response: str
+    degraded: bool = False
+
+
 @dataclass
 class ControllerDecision:
     # This dataclass captures a controller decision about which agent to call next.
@@ -0,0 +1,47 @@
+# This is the command-line entry point for corpus ingestion.
+# It indexes directories of .txt/.md files and JSONL dumps into a corpus
+# directory that the local search fallback loads through CORPUS_PATH.
+#
+# Usage:
+#   python src/ingest.py --output data/corpus docs/ dumps/articles.jsonl
+#   python src/ingest.py --output data/corpus --prune docs/
+#   python src/ingest.py --output data/corpus --compact
+
+import argparse
+import os
+import sys
+
+# This block ensures that the current src directory is on sys.path
+# so that imports of "tools", "utils", etc. work when running ingest.py directly.
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from tools.built_in.corpus_ingest import compact, ingest  # type: ignore  # noqa: E402
+
+
+def main() -> None:
+    # This function parses arguments and runs an incremental ingestion.
+    parser = argparse.ArgumentParser(description="Ingest documents into the local search corpus.")
+    parser.add_argument("inputs", nargs="*", help="Files or directories (.txt, .md, .jsonl)")
+    parser.add_argument("--output", required=True, help="Corpus directory to create or update")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument(
+        "--prune", action="store_true", help="Remove previously ingested files that are not under these inputs"
+    )
+    parser.add_argument("--compact", action="store_true", help="Merge all segments and drop deleted documents")
+    args = parser.parse_args()
+
+    if args.inputs:
+        stats = ingest(args.inputs, args.output, workers=args.workers, prune=args.prune)
+        print(
+            f"Scanned {stats['scanned']} files: {stats['indexed_files']} reindexed "
+            f"({stats['indexed_docs']} documents), {stats['unchanged']} unchanged, {stats['removed']} removed."
+        )
+    if args.compact:
+        print(f"Compacted corpus holds {compact(args.output)} documents.")
+    print(f"Set CORPUS_PATH={os.path.abspath(args.output)} to search it.")
+
+
+if __name__ == "__main__":
+    main()
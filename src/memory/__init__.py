@@ -1,2 +1,14 @@
 # Initializes memory package.
-from .memory_manager import MemoryManager
+
+from utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "MemoryManager": ".memory_manager",
+    "create_memory_manager": ".memory_manager",
+    "JournaledMemoryManager": ".journaled_memory",
+    "SQLiteMemoryManager": ".sqlite_memory",
+    "ShardedMemory": ".session_memory",
+    "session_scope": ".session_memory",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,165 @@
+# This module implements a journaled variant of the memory manager.
+# Each mutation is appended to <store>.journal as one JSON line instead of
+# rewriting the whole store, and fsync is issued in batches. On load the
+# snapshot (the usual memory_store.json) is read and the journal replayed.
+# Once the journal grows past a threshold it is folded into a new snapshot
+# on a background thread. Every journal line carries a sequence number and
+# the snapshot records the last one it contains, so a crash between writing
+# the snapshot and truncating the journal never applies a mutation twice.
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from memory.memory_manager import MEMORY_FILE_DEFAULT, MemoryManager, copy_entry
+from utils.logger import log_error, log_info
+
+
+class JournaledMemoryManager(MemoryManager):
+    """
+    MemoryManager whose writes cost O(1) bytes. Up to fsync_every mutations
+    (or fsync_interval seconds of them) are flushed to the OS but not yet
+    fsynced, so a power loss can drop that many; a process crash drops none.
+    """
+
+    def __init__(
+        self,
+        filename: str = MEMORY_FILE_DEFAULT,
+        max_entries: int = 50,
+        fsync_every: Optional[int] = None,
+        fsync_interval: Optional[float] = None,
+        compact_threshold: Optional[int] = None,
+        fact_eviction: Optional[str] = None,
+    ) -> None:
+        self.journal_path = filename + ".journal"
+        self.fsync_every = fsync_every or int(os.environ.get("MEMORY_FSYNC_EVERY", "32"))
+        self.fsync_interval = (
+            fsync_interval if fsync_interval is not None else float(os.environ.get("MEMORY_FSYNC_INTERVAL", "1.0"))
+        )
+        self.compact_threshold = compact_threshold or int(os.environ.get("MEMORY_COMPACT_THRESHOLD", "1000"))
+        self._seq = 0
+        self._entries = 0
+        self._pending = 0
+        self._last_fsync = time.monotonic()
+        # Lines written while a compaction runs; they survive the truncation.
+        self._tail: Optional[List[str]] = None
+        self._compactor: Optional[threading.Thread] = None
+        self._stats = {"appends": 0, "fsyncs": 0, "compactions": 0, "replayed": 0}
+        super().__init__(filename, max_entries, fact_eviction)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        # This private method reads the snapshot, then replays the journal.
+        super()._load()
+        self._seq = int(self.state.pop("journal_seq", 0))
+        if not os.path.exists(self.journal_path):
+            return
+        offset = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("missing newline")
+                    op = json.loads(line)
+                except ValueError:
+                    # Only the last line can be torn by a crash mid-write; it
+                    # is cut off so that new appends start on a fresh line.
+                    log_error(f"Memory journal: dropping truncated entry in {self.journal_path}")
+                    break
+                offset += len(line)
+                self._entries += 1
+                if op["seq"] <= self._seq:
+                    continue
+                self._apply(op)
+                self._seq = op["seq"]
+                self._stats["replayed"] += 1
+        if offset < os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, offset)
+        log_info(f"Memory journal: replayed {self._stats['replayed']} entries")
+
+    def _commit(self, ops: List[Dict[str, Any]]) -> None:
+        # Called under the manager lock, so journal order is mutation order.
+        lines = []
+        for op in ops:
+            self._seq += 1
+            lines.append(json.dumps(dict(op, seq=self._seq), ensure_ascii=False) + "\n")
+        self._journal.writelines(lines)
+        self._journal.flush()
+        if self._tail is not None:
+            self._tail.extend(lines)
+        self._entries += len(lines)
+        self._pending += len(lines)
+        self._stats["appends"] += len(lines)
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+        if self._entries >= self.compact_threshold and self._compactor is None:
+            self._compactor = threading.Thread(target=self.compact, name="memory-compactor", daemon=True)
+            self._compactor.start()
+
+    def _fsync(self) -> None:
+        if self._pending:
+            os.fsync(self._journal.fileno())
+            self._stats["fsyncs"] += 1
+        self._pending = 0
+        self._last_fsync = time.monotonic()
+
+    def flush(self) -> None:
+        # This method forces every journaled mutation to stable storage.
+        with self._lock:
+            self._fsync()
+
+    def compact(self) -> None:
+        """Write a snapshot of the current state and truncate the journal."""
+        try:
+            with self._lock:
+                snapshot = {
+                    "conversations": list(self.state["conversations"]),
+                    # Fact entries are updated in place, so they are copied.
+                    "facts": {key: copy_entry(entry) for key, entry in self.state["facts"].items()},
+                    "journal_seq": self._seq,
+                }
+                self._tail = []
+
+            # The snapshot is written outside the lock; mutations meanwhile
+            # go to the journal and to _tail.
+            tmp_path = self.filename + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.filename)
+
+            with self._lock:
+                tmp_path = self.journal_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(self._tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal.close()
+                os.replace(tmp_path, self.journal_path)
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+                self._entries = len(self._tail)
+                self._pending = 0
+                self._stats["compactions"] += 1
+        except Exception as e:
+            log_error(f"Memory journal: compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._tail = None
+                if self._compactor is threading.current_thread():
+                    self._compactor = None
+
+    def close(self) -> None:
+        # This method folds the journal into the snapshot and closes it.
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        self.compact()
+        with self._lock:
+            self._journal.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, journal_entries=self._entries, seq=self._seq)
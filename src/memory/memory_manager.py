@@ -1,25 +1,85 @@
 # This module implements a JSON-based memory manager
 # which stores past conversations and extracted facts for contextual awareness.
 
+import hashlib
 import json
 import os
-from typing import Any, Dict, List, Optional
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Set
 
+from tools.built_in.bm25_index import BM25Index, tokenize
 from utils.logger import log_error, log_info
 
 
 MEMORY_FILE_DEFAULT = "memory_store.json"
+MEMORY_SHARD_DIR_DEFAULT = "memory_shards"
+SAFE_SESSION_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+MEMORY_KINDS = ("conversations", "facts")
+# Source label of the claims AnalysisAgent stores as facts.
+ANALYSIS_FACT_SOURCE = "analysis_summary"
+# Sampled LFU looks at this many of the least recently seen facts and
+# evicts the least frequent of them.
+LFU_SAMPLE = 16
+
+
+def fact_key(fact: str) -> str:
+    # This function is the content address of a fact; whitespace is ignored.
+    return hashlib.blake2b(" ".join(fact.split()).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def entry_text(kind: str, entry: Dict[str, Any]) -> Dict[str, str]:
+    # This function gives the searchable {title, content} form of an entry.
+    if kind == "conversations":
+        return {"title": entry.get("query") or "", "content": entry.get("response") or ""}
+    return {"title": "", "content": entry.get("fact") or ""}
+
+
+def query_relevance(query_terms: Set[str], kind: str, entry: Dict[str, Any]) -> float:
+    # This function returns the share of the (tokenized) query terms that an
+    # entry contains. Unlike the ranking scores, which are on each backend's
+    # own BM25 scale, it is in [0, 1] for every backend.
+    if not query_terms:
+        return 0.0
+    text = entry_text(kind, entry)
+    return round(len(query_terms.intersection(tokenize(text["title"] + " " + text["content"]))) / len(query_terms), 3)
+
+
+def copy_entry(entry: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    # This function copies an entry so callers never share its sources list.
+    copied = dict(entry, **extra)
+    if "sources" in copied:
+        copied["sources"] = list(copied["sources"])
+    return copied
 
 
 class MemoryManager:
     # This class manages loading, saving, and updating the agentic system's memory.
-    def __init__(self, filename: str = MEMORY_FILE_DEFAULT, max_entries: int = 50) -> None:
+    # Facts are content-addressed: state["facts"] maps fact_key -> {fact,
+    # source, sources, count, first_seen, last_seen}, least recently seen first.
+    def __init__(
+        self, filename: str = MEMORY_FILE_DEFAULT, max_entries: int = 50, fact_eviction: Optional[str] = None
+    ) -> None:
         self.filename = filename
         self.max_entries = max_entries
+        # "lru" evicts the least recently seen fact, "lfu" the least frequent
+        # of the LFU_SAMPLE least recently seen ones.
+        self.fact_eviction = (fact_eviction or os.environ.get("MEMORY_FACT_EVICTION", "lfu")).lower()
+        # Agents may share one manager across request threads.
+        self._lock = threading.RLock()
         self.state: Dict[str, Any] = {
             "conversations": [],  # list of {query, response}
-            "facts": []           # list of extracted facts from sources
+            "facts": OrderedDict()  # distinct facts extracted from sources
         }
+        # One inverted index per kind, updated with every mutation;
+        # conversation doc ids are kept in entry order, fact ones by key.
+        self._indexes: Dict[str, BM25Index] = {}
+        self._conversation_docs: Deque[int] = deque()
+        self._fact_docs: Dict[str, int] = {}
+        self._reindex()
         self._load()
 
     def _load(self) -> None:
@@ -32,6 +92,27 @@ class MemoryManager:
             except Exception as e:
                 log_error(f"Failed to load memory: {e}. Initializing fresh memory.")
                 self.state = {"conversations": [], "facts": []}
+            facts = self.state.get("facts", [])
+            if isinstance(facts, dict):
+                self.state["facts"] = OrderedDict(facts)
+            else:
+                # Stores written before facts were deduplicated hold a list.
+                self.state["facts"] = OrderedDict()
+                now = time.time()
+                for entry in facts:
+                    self._merge_fact(dict(entry, ts=now))
+            self._reindex()
+
+    def _reindex(self) -> None:
+        # This private method rebuilds the relevance indexes from the state.
+        self._indexes = {kind: BM25Index() for kind in MEMORY_KINDS}
+        self._conversation_docs = deque(
+            self._index_entry("conversations", entry) for entry in self.state["conversations"]
+        )
+        self._fact_docs = {key: self._index_entry("facts", entry) for key, entry in self.state["facts"].items()}
+
+    def _index_entry(self, kind: str, entry: Dict[str, Any]) -> int:
+        return self._indexes[kind].add_document(dict(entry_text(kind, entry), entry=entry))
 
     def _save(self) -> None:
         # This private method persists memory state to disk as JSON.
@@ -41,24 +122,142 @@ class MemoryManager:
         except Exception as e:
             log_error(f"Failed to save memory: {e}")
 
-    def add_conversation(self, query: str, response: str) -> None:
-        # This method stores a new query-response pair in memory.
-        self.state["conversations"].append({"query": query, "response": response})
+    def _merge_fact(self, entry: Dict[str, Any]) -> Optional[str]:
+        # This private method counts a fact, inserting it if unseen, and
+        # returns the key of a new fact (None for a repeat).
+        facts = self.state["facts"]
+        key = fact_key(entry["fact"])
+        source, ts = entry.get("source"), entry["ts"]
+        existing = facts.get(key)
+        if existing is not None:
+            existing["count"] += 1
+            existing["last_seen"] = ts
+            if source is not None:
+                existing["source"] = source
+                if source not in existing["sources"]:
+                    existing["sources"].append(source)
+            facts.move_to_end(key)
+            return None
+        facts[key] = {
+            "fact": entry["fact"],
+            "source": source,
+            "sources": [source] if source is not None else [],
+            "count": 1,
+            "first_seen": ts,
+            "last_seen": ts,
+        }
+        return key
+
+    def _evict_fact(self) -> None:
+        # This private method drops one fact according to fact_eviction.
+        facts = self.state["facts"]
+        if self.fact_eviction == "lfu":
+            key = min(islice(facts, LFU_SAMPLE), key=lambda k: facts[k]["count"])
+        else:
+            key = next(iter(facts))
+        del facts[key]
+        self._indexes["facts"].remove_document(self._fact_docs.pop(key))
+
+    def _apply(self, op: Dict[str, Any]) -> None:
+        # This private method applies one mutation to the in-memory state.
         # This keeps memory bounded by trimming older entries if necessary.
-        if len(self.state["conversations"]) > self.max_entries:
-            self.state["conversations"] = self.state["conversations"][-self.max_entries :]
+        if op["kind"] == "facts":
+            key = self._merge_fact(op["entry"])
+            if key is not None:
+                self._fact_docs[key] = self._index_entry("facts", self.state["facts"][key])
+                while len(self.state["facts"]) > self.max_entries:
+                    self._evict_fact()
+            return
+        conversations = self.state["conversations"]
+        conversations.append(op["entry"])
+        self._conversation_docs.append(self._index_entry("conversations", op["entry"]))
+        if len(conversations) > self.max_entries:
+            del conversations[: len(conversations) - self.max_entries]
+            while len(self._conversation_docs) > self.max_entries:
+                self._indexes["conversations"].remove_document(self._conversation_docs.popleft())
+
+    def _commit(self, ops: List[Dict[str, Any]]) -> None:
+        # This private method makes a batch of mutations durable; the JSON
+        # store rewrites the whole file once per batch.
         self._save()
 
+    def _mutate(self, ops: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for op in ops:
+                self._apply(op)
+            self._commit(ops)
+
+    def add_conversation(self, query: str, response: str) -> None:
+        # This method stores a new query-response pair in memory.
+        self._mutate([{"kind": "conversations", "entry": {"query": query, "response": response}}])
+
     def add_fact(self, fact: str, source: Optional[str] = None) -> None:
         # This method stores an extracted fact, optionally with its source.
-        self.state["facts"].append({"fact": fact, "source": source})
-        if len(self.state["facts"]) > self.max_entries:
-            self.state["facts"] = self.state["facts"][-self.max_entries :]
-        self._save()
+        # A fact seen before only has its count, sources and last_seen updated.
+        self._mutate([{"kind": "facts", "entry": {"fact": fact, "source": source, "ts": time.time()}}])
+
+    def add_facts(self, facts: List[str], source: Optional[str] = None) -> None:
+        # This method stores several facts as one batch.
+        if facts:
+            now = time.time()
+            self._mutate([{"kind": "facts", "entry": {"fact": fact, "source": source, "ts": now}} for fact in facts])
 
     def get_recent_context(self, limit: int = 5) -> Dict[str, List[Dict[str, str]]]:
         # This method returns the most recent conversations and facts
         # to give agents a basic contextual awareness.
-        conversations = self.state["conversations"][-limit:]
-        facts = self.state["facts"][-limit:]
+        with self._lock:
+            conversations = self.state["conversations"][-limit:]
+            facts = list(islice(reversed(self.state["facts"].values()), limit))[::-1]
         return {"conversations": conversations, "facts": facts}
+
+    def close(self) -> None:
+        # Every mutation is already written, so there is nothing to flush.
+        pass
+
+    def get_relevant_context(self, query: str, k: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the k conversations and k facts most relevant to the query
+        (BM25 over the incrementally maintained indexes), best first. Each
+        entry is a copy carrying its BM25 "score" and its "relevance".
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            return {
+                kind: [
+                    copy_entry(doc["entry"], score=score, relevance=query_relevance(terms, kind, doc["entry"]))
+                    for score, doc in self._indexes[kind].search(query, top_k=k)
+                ]
+                for kind in MEMORY_KINDS
+            }
+
+
+def shard_name(session_id: str) -> str:
+    # This function maps a session id to a safe file name.
+    # Hashed names contain ".", which safe ids cannot, so an unsafe id can
+    # never map to another session's file.
+    if SAFE_SESSION_ID.fullmatch(session_id):
+        return session_id
+    return "h." + hashlib.blake2b(session_id.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def create_memory_manager(session_id: Optional[str] = None) -> MemoryManager:
+    # This function builds the memory backend selected by MEMORY_BACKEND,
+    # either the shared store or the store of one session under
+    # MEMORY_SHARD_DIR.
+    backend = os.environ.get("MEMORY_BACKEND", "json").lower()
+    path: Optional[str] = None
+    if session_id is None and backend != "sqlite":
+        path = os.environ.get("MEMORY_FILE") or None
+    if session_id is not None:
+        shard_dir = os.environ.get("MEMORY_SHARD_DIR", MEMORY_SHARD_DIR_DEFAULT)
+        os.makedirs(shard_dir, exist_ok=True)
+        path = os.path.join(shard_dir, shard_name(session_id) + (".db" if backend == "sqlite" else ".json"))
+    if backend == "journal":
+        from memory.journaled_memory import JournaledMemoryManager
+
+        return JournaledMemoryManager(path or MEMORY_FILE_DEFAULT)
+    if backend == "sqlite":
+        from memory.sqlite_memory import SQLiteMemoryManager
+
+        return SQLiteMemoryManager(path)
+    return MemoryManager(path or MEMORY_FILE_DEFAULT)
@@ -0,0 +1,176 @@
+# This module shards memory by session.
+# Agents keep calling one memory object; ShardedMemory routes each call to
+# the store of the session active in the calling context (a contextvar set
+# by session_scope), so users never see each other's context and sessions
+# never contend on one lock or file. Only a bounded LRU of shards stays
+# open; a cold shard is flushed and closed when it falls out. Calls made
+# outside any session use the shared store, as before sharding.
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from memory.memory_manager import MemoryManager, create_memory_manager
+from utils.logger import log_info
+
+CURRENT_SESSION: ContextVar[Optional[str]] = ContextVar("memory_session", default=None)
+
+
+@contextmanager
+def session_scope(session_id: Optional[str]) -> Iterator[None]:
+    """Route memory calls made inside the block to session_id's shard."""
+    token = CURRENT_SESSION.set(session_id)
+    try:
+        yield
+    finally:
+        CURRENT_SESSION.reset(token)
+
+
+class ShardedMemory:
+    """
+    MemoryManager-compatible router over per-session shards. A shard is
+    pinned while a call uses it, so eviction only ever closes idle shards;
+    max_open is exceeded temporarily if every open shard is busy.
+    """
+
+    def __init__(
+        self,
+        max_open: Optional[int] = None,
+        factory: Callable[[Optional[str]], MemoryManager] = create_memory_manager,
+    ) -> None:
+        self.max_open = max_open or int(os.environ.get("MEMORY_MAX_OPEN_SHARDS", "64"))
+        self._factory = factory
+        self._shared: Optional[MemoryManager] = None
+        self._shards: "OrderedDict[str, MemoryManager]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        # Sessions whose shard is being opened or closed; others wait on it.
+        self._busy: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stats = {"opens": 0, "evictions": 0}
+
+    def _acquire(self, session_id: str) -> MemoryManager:
+        # This private method returns the pinned shard, opening it if needed.
+        while True:
+            with self._lock:
+                shard = self._shards.get(session_id)
+                if shard is not None:
+                    self._shards.move_to_end(session_id)
+                    self._pins[session_id] = self._pins.get(session_id, 0) + 1
+                    return shard
+                event = self._busy.get(session_id)
+                if event is None:
+                    event = self._busy[session_id] = threading.Event()
+                    break
+            event.wait()
+
+        # Opening (loading or replaying a store) happens outside the lock.
+        try:
+            shard = self._factory(session_id)
+        except BaseException:
+            with self._lock:
+                del self._busy[session_id]
+            event.set()
+            raise
+        with self._lock:
+            self._shards[session_id] = shard
+            self._pins[session_id] = self._pins.get(session_id, 0) + 1
+            self._stats["opens"] += 1
+            del self._busy[session_id]
+            cold = self._pick_cold()
+        event.set()
+        for cold_id, cold_shard, cold_event in cold:
+            self._close(cold_id, cold_shard, cold_event)
+        return shard
+
+    def _pick_cold(self) -> List[tuple]:
+        # Called under the lock: removes idle shards beyond max_open and marks
+        # them busy so they are not reopened before they are closed.
+        cold = []
+        for session_id in list(self._shards):
+            if len(self._shards) - len(cold) <= self.max_open:
+                break
+            if self._pins.get(session_id):
+                continue
+            event = self._busy[session_id] = threading.Event()
+            cold.append((session_id, self._shards[session_id], event))
+        for session_id, _, _ in cold:
+            del self._shards[session_id]
+            self._pins.pop(session_id, None)
+            self._stats["evictions"] += 1
+        return cold
+
+    def _close(self, session_id: str, shard: MemoryManager, event: threading.Event) -> None:
+        try:
+            shard.close()
+            log_info(f"Memory: closed idle session shard {session_id}")
+        finally:
+            with self._lock:
+                del self._busy[session_id]
+            event.set()
+
+    def _release(self, session_id: str) -> None:
+        with self._lock:
+            self._pins[session_id] -= 1
+            if not self._pins[session_id]:
+                del self._pins[session_id]
+            cold = self._pick_cold()
+        for cold_id, cold_shard, cold_event in cold:
+            self._close(cold_id, cold_shard, cold_event)
+
+    @contextmanager
+    def shard(self, session_id: Optional[str] = None) -> Iterator[MemoryManager]:
+        """Yield the store of session_id (default: the current session)."""
+        session_id = session_id if session_id is not None else CURRENT_SESSION.get()
+        if session_id is None:
+            if self._shared is None:
+                with self._lock:
+                    if self._shared is None:
+                        self._shared = self._factory(None)
+            yield self._shared
+            return
+        shard = self._acquire(session_id)
+        try:
+            yield shard
+        finally:
+            self._release(session_id)
+
+    # MemoryManager API, routed to the current session's shard.
+    def add_conversation(self, query: str, response: str) -> None:
+        with self.shard() as memory:
+            memory.add_conversation(query, response)
+
+    def add_fact(self, fact: str, source: Optional[str] = None) -> None:
+        with self.shard() as memory:
+            memory.add_fact(fact, source=source)
+
+    def add_facts(self, facts: List[str], source: Optional[str] = None) -> None:
+        with self.shard() as memory:
+            memory.add_facts(facts, source=source)
+
+    def get_recent_context(self, limit: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        with self.shard() as memory:
+            return memory.get_recent_context(limit)
+
+    def get_relevant_context(self, query: str, k: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        with self.shard() as memory:
+            return memory.get_relevant_context(query, k)
+
+    def close(self) -> None:
+        # This method flushes and closes every open shard.
+        with self._lock:
+            shards = list(self._shards.values()) + ([self._shared] if self._shared is not None else [])
+            self._shards.clear()
+            self._shared = None
+        for shard in shards:
+            shard.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats, open_shards=len(self._shards), max_open=self.max_open)
+        with self.shard() as memory:
+            if hasattr(memory, "get_stats"):
+                stats["current"] = memory.get_stats()
+        return stats
@@ -0,0 +1,283 @@
+# This module implements a SQLite backend for the memory manager.
+# Conversations and facts are rows in two tables of one WAL-mode database,
+# so any number of threads and worker processes can read while a single
+# writer commits. Each batch of mutations is one IMMEDIATE transaction, and
+# Conversation trimming is a DELETE on the integer primary key, which walks
+# the index instead of rewriting a list. Facts are upserted on their content
+# key and evicted through the last_seen/count indexes. FTS5 tables kept in
+# sync by triggers serve relevance queries.
+
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+import threading
+from typing import Any, Dict, List, Optional
+
+from memory.memory_manager import LFU_SAMPLE, MemoryManager, fact_key, query_relevance
+from tools.built_in.bm25_index import STOPWORDS, TOKEN_PATTERN, tokenize
+from utils.logger import log_error, log_info
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MEMORY_DB_DEFAULT = os.path.join(BASE_DIR, "db", "memory.db")
+
+# kind -> (table, entry fields stored as columns, newest-first order)
+TABLES = {
+    "conversations": ("conversations", ("query", "response"), "id DESC"),
+    "facts": ("facts", ("fact", "source", "sources", "count", "first_seen", "last_seen"), "last_seen DESC, id DESC"),
+}
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS conversations ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, query TEXT NOT NULL, response TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS facts ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, fact TEXT NOT NULL, source TEXT,"
+    " sources TEXT NOT NULL, count INTEGER NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_facts_last_seen ON facts (last_seen)",
+)
+
+# A repeated fact only bumps its count and recency and gains its source.
+UPSERT_FACT = (
+    "INSERT INTO facts (key, fact, source, sources, count, first_seen, last_seen) VALUES (?, ?, ?, ?, 1, ?, ?)"
+    " ON CONFLICT (key) DO UPDATE SET count = count + 1, last_seen = excluded.last_seen,"
+    " source = coalesce(excluded.source, source),"
+    " sources = CASE WHEN excluded.source IS NULL"
+    " OR EXISTS (SELECT 1 FROM json_each(facts.sources) WHERE value = excluded.source)"
+    " THEN sources ELSE json_insert(sources, '$[#]', excluded.source) END"
+)
+EVICT_LRU = "DELETE FROM facts WHERE id IN (SELECT id FROM facts ORDER BY last_seen, id LIMIT ?)"
+# Sampled LFU, one fact per statement: the least frequent of the
+# LFU_SAMPLE least recently seen facts.
+EVICT_LFU = (
+    "DELETE FROM facts WHERE id = (SELECT id FROM"
+    f" (SELECT id, count, last_seen FROM facts ORDER BY last_seen, id LIMIT {LFU_SAMPLE})"
+    " ORDER BY count, last_seen, id LIMIT 1)"
+)
+
+# Full-text indexes over the same rows (external content, porter stemming).
+FTS_SCHEMA = {
+    "conversations": (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5("
+        " query, response, content='conversations', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS conversations_ai AFTER INSERT ON conversations BEGIN"
+        " INSERT INTO conversations_fts (rowid, query, response) VALUES (new.id, new.query, new.response); END",
+        "CREATE TRIGGER IF NOT EXISTS conversations_ad AFTER DELETE ON conversations BEGIN"
+        " INSERT INTO conversations_fts (conversations_fts, rowid, query, response)"
+        " VALUES ('delete', old.id, old.query, old.response); END",
+    ),
+    "facts": (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS facts_fts USING fts5("
+        " fact, content='facts', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS facts_ai AFTER INSERT ON facts BEGIN"
+        " INSERT INTO facts_fts (rowid, fact) VALUES (new.id, new.fact); END",
+        "CREATE TRIGGER IF NOT EXISTS facts_ad AFTER DELETE ON facts BEGIN"
+        " INSERT INTO facts_fts (facts_fts, rowid, fact) VALUES ('delete', old.id, old.fact); END",
+    ),
+}
+
+
+class SQLiteMemoryManager(MemoryManager):
+    """
+    MemoryManager stored in SQLite. Each thread gets its own connection;
+    writes in this process are serialized by a lock and across processes by
+    SQLite's write lock (BEGIN IMMEDIATE, waiting up to `timeout` seconds).
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: int = 50,
+        timeout: float = 10.0,
+        fact_eviction: Optional[str] = None,
+    ) -> None:
+        self.db_path = db_path or os.environ.get("MEMORY_DB_PATH", MEMORY_DB_DEFAULT)
+        self.max_entries = max_entries
+        self.fact_eviction = (fact_eviction or os.environ.get("MEMORY_FACT_EVICTION", "lfu")).lower()
+        self.timeout = timeout
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._stats = {"transactions": 0, "rows_written": 0, "rows_trimmed": 0, "errors": 0}
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            legacy = self._detach_legacy_facts(conn)
+            for statement in SCHEMA:
+                conn.execute(statement)
+            if legacy:
+                # Fold the old one-row-per-mention table into distinct facts.
+                now = time.time()
+                rows = conn.execute("SELECT fact, source FROM facts_legacy ORDER BY id").fetchall()
+                conn.executemany(UPSERT_FACT, [self._fact_params(fact, source, now) for fact, source in rows])
+                conn.execute("DROP TABLE facts_legacy")
+            conn.execute("COMMIT")
+        self.fts_enabled = self._create_fts(conn)
+        log_info(f"Memory database ready at {self.db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        # This private method returns this thread's connection, opening it once.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly.
+            # Connections are only shared with close(), which may run on
+            # another thread once no caller is using the manager.
+            conn = sqlite3.connect(
+                self.db_path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _detach_legacy_facts(conn: sqlite3.Connection) -> bool:
+        # This private method renames a facts table from before facts were
+        # content-addressed, dropping its full-text index and triggers.
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(facts)")]
+        if not columns or "key" in columns:
+            return False
+        for statement in ("DROP TRIGGER IF EXISTS facts_ai", "DROP TRIGGER IF EXISTS facts_ad",
+                          "DROP TABLE IF EXISTS facts_fts", "DROP INDEX IF EXISTS idx_facts_source"):
+            conn.execute(statement)
+        conn.execute("ALTER TABLE facts RENAME TO facts_legacy")
+        return True
+
+    @staticmethod
+    def _fact_params(fact: str, source: Optional[str], ts: float) -> tuple:
+        sources = json.dumps([source] if source is not None else [], ensure_ascii=False)
+        return (fact_key(fact), fact, source, sources, ts, ts)
+
+    def _create_fts(self, conn: sqlite3.Connection) -> bool:
+        # This private method adds the full-text indexes, filling them from
+        # existing rows when a database predates them.
+        try:
+            with self._lock:
+                conn.execute("BEGIN IMMEDIATE")
+                for kind, statements in FTS_SCHEMA.items():
+                    exists = conn.execute(
+                        "SELECT 1 FROM sqlite_master WHERE name = ?", (f"{kind}_fts",)
+                    ).fetchone()
+                    for statement in statements:
+                        conn.execute(statement)
+                    if not exists:
+                        conn.execute(f"INSERT INTO {kind}_fts ({kind}_fts) VALUES ('rebuild')")
+                conn.execute("COMMIT")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            log_error(f"Memory full-text index unavailable ({e}). Relevance queries return nothing.")
+            return False
+
+    def _mutate(self, ops: List[Dict[str, Any]]) -> None:
+        conversations = [(op["entry"]["query"], op["entry"]["response"]) for op in ops if op["kind"] == "conversations"]
+        facts = [
+            self._fact_params(op["entry"]["fact"], op["entry"].get("source"), op["entry"]["ts"])
+            for op in ops if op["kind"] == "facts"
+        ]
+        conn = self._connection()
+        with self._lock:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                trimmed = 0
+                if conversations:
+                    conn.executemany("INSERT INTO conversations (query, response) VALUES (?, ?)", conversations)
+                    # Everything at or below the id of the (max_entries + 1)-th
+                    # newest row goes; both lookups use the primary key.
+                    trimmed += conn.execute(
+                        "DELETE FROM conversations WHERE id <="
+                        " (SELECT id FROM conversations ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (self.max_entries,),
+                    ).rowcount
+                if facts:
+                    conn.executemany(UPSERT_FACT, facts)
+                    excess = conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0] - self.max_entries
+                    if excess > 0 and self.fact_eviction == "lru":
+                        trimmed += conn.execute(EVICT_LRU, (excess,)).rowcount
+                    elif excess > 0:
+                        for _ in range(excess):
+                            trimmed += conn.execute(EVICT_LFU).rowcount
+                conn.execute("COMMIT")
+                self._stats["transactions"] += 1
+                self._stats["rows_written"] += len(conversations) + len(facts)
+                self._stats["rows_trimmed"] += trimmed
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                self._stats["errors"] += 1
+                log_error(f"Failed to save memory: {e}")
+
+    @staticmethod
+    def _entry(columns: tuple, row: tuple) -> Dict[str, Any]:
+        entry = dict(zip(columns, row))
+        if "sources" in entry:
+            entry["sources"] = json.loads(entry["sources"])
+        return entry
+
+    def _recent(self, kind: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+        table, columns, order = TABLES[kind]
+        query = f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order}"
+        params: tuple = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        try:
+            rows = self._connection().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            log_error(f"Failed to read memory: {e}")
+            return []
+        return [self._entry(columns, row) for row in reversed(rows)]
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        # A read-only view in the shape of the JSON store.
+        facts = self._recent("facts", None)
+        return {
+            "conversations": self._recent("conversations", None),
+            "facts": OrderedDict((fact_key(entry["fact"]), entry) for entry in facts),
+        }
+
+    def get_recent_context(self, limit: int = 5) -> Dict[str, List[Dict[str, str]]]:
+        # This method reads the newest rows without taking the write lock.
+        return {"conversations": self._recent("conversations", limit), "facts": self._recent("facts", limit)}
+
+    def get_relevant_context(self, query: str, k: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        # This method ranks rows with FTS5's bm25(); any query word may match.
+        # Entries carry the same "relevance" as the in-memory backends.
+        words = [w for w in TOKEN_PATTERN.findall(query.lower()) if len(w) > 1 and w not in STOPWORDS]
+        result: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in TABLES}
+        if not words or not self.fts_enabled:
+            return result
+        match = " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+        for kind, (table, columns, _) in TABLES.items():
+            try:
+                rows = self._connection().execute(
+                    f"SELECT {', '.join('t.' + c for c in columns)}, bm25({table}_fts) AS rank"
+                    f" FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid"
+                    f" WHERE {table}_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (match, k),
+                ).fetchall()
+            except sqlite3.Error as e:
+                log_error(f"Failed to search memory: {e}")
+                continue
+            # bm25() is lower for better matches.
+            entries = [dict(self._entry(columns, row[:-1]), score=-row[-1]) for row in rows]
+            terms = set(tokenize(query))
+            result[kind] = [dict(entry, relevance=query_relevance(terms, kind, entry)) for entry in entries]
+        return result
+
+    def close(self) -> None:
+        # This method closes every thread's connection; WAL contents are
+        # checkpointed by SQLite when the last one closes.
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,55 @@
+# This is the command-line entry point for the shared NLP service.
+# It starts a pool of processes that each load the spaCy model once and
+# serves claim extraction over a Unix socket. API workers started with
+# NLP_SERVICE_ADDRESS=<socket> send extraction there instead of loading
+# spaCy themselves.
+#
+# Usage:
+#   python src/nlp_server.py --workers 4
+#   python src/nlp_server.py --address /run/agentic/nlp.sock --workers 4
+#   python src/nlp_server.py --check
+
+import argparse
+import json
+import os
+import signal
+import sys
+
+# This block ensures that the current src directory is on sys.path
+# so that imports of "tools", "utils", etc. work when running this file directly.
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from tools.custom.nlp_service import NLP_SOCKET_DEFAULT, NLPClient, NLPServer  # type: ignore  # noqa: E402
+
+
+def main() -> None:
+    # This function parses arguments and either runs the service until
+    # interrupted or health-checks a running one.
+    parser = argparse.ArgumentParser(description="Run the shared NLP extraction service.")
+    parser.add_argument("--address", default=os.environ.get("NLP_SERVICE_ADDRESS") or NLP_SOCKET_DEFAULT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="NLP worker processes")
+    parser.add_argument("--check", action="store_true", help="Print the health of a running service and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        try:
+            print(json.dumps(NLPClient(args.address, timeout=5).health(), indent=2))
+        except Exception as e:
+            print(f"NLP service at {args.address} is unreachable: {e}")
+            sys.exit(1)
+        return
+
+    server = NLPServer(args.address, workers=args.workers).start()
+    print(f"Set NLP_SERVICE_ADDRESS={args.address} for API workers. Press Ctrl+C to stop.")
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
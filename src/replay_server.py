@@ -0,0 +1,52 @@
+# This is the command-line entry point for the DuckDuckGo stand-in server.
+# It serves a cassette recorded with SEARCH_RECORD=<cassette.json> so the
+# pipeline can be benchmarked and load-tested without the internet.
+#
+# Usage:
+#   SEARCH_RECORD=data/ddg_cassette.json python src/main.py      # record
+#   python src/replay_server.py data/ddg_cassette.json --port 8765 --latency 0.3 --error-rate 0.05
+#   DDG_ENDPOINT=http://127.0.0.1:8765 python src/main.py        # replay
+
+import argparse
+import os
+import sys
+
+# This block ensures that the current src directory is on sys.path
+# so that imports of "tools", "utils", etc. work when running this file directly.
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from tools.built_in.search_replay import Cassette, ReplayServer  # type: ignore  # noqa: E402
+
+
+def main() -> None:
+    # This function parses arguments and serves the cassette until interrupted.
+    parser = argparse.ArgumentParser(description="Serve recorded DuckDuckGo results over HTTP.")
+    parser.add_argument("cassette", help="Cassette file written in record mode")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds around --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with HTTP 503")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency and errors")
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        Cassette(args.cassette),
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ).start()
+    print(f"Set DDG_ENDPOINT={server.url} to replay searches. Press Ctrl+C to stop.")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,10 @@
 # Initializes reinforcement learning (feedback) package.
-from .feedback_loop import evaluate_response_quality, should_retry
+
+from utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "evaluate_response_quality": ".feedback_loop",
+    "should_retry": ".feedback_loop",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
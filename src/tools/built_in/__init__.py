@@ -1,4 +1,12 @@
 # Initializes built-in tools package.
-from .web_search_tool import web_search
-from .summarizer_tool import summarize_documents
-from .formatter_tool import format_markdown_response
+
+from utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "web_search": ".web_search_tool",
+    "summarize_documents": ".summarizer_tool",
+    "summarize_stream": ".stream_summary",
+    "format_markdown_response": ".formatter_tool",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
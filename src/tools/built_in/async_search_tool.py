@@ -0,0 +1,208 @@
+# This module provides an asyncio-based search path with query fan-out.
+# A research question is decomposed into several sub-queries that are sent
+# to DuckDuckGo concurrently; their rankings are merged with reciprocal rank
+# fusion, and whatever has arrived when the deadline expires is returned.
+
+import asyncio
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from tools.built_in.bm25_index import STOPWORDS
+from tools.built_in.search_replay import fetch_endpoint_results_async, record_search
+from tools.built_in.web_search_tool import (
+    DDG_BREAKER,
+    DDG_RATE_LIMITER,
+    DDG_RATE_WAIT,
+    DEFAULT_SEARCH_BACKEND,
+    ddg_enabled,
+    format_ddg_results,
+    get_ddg_endpoint,
+    reciprocal_rank_fusion,
+    web_search,
+    web_search_corpus,
+)
+from utils.logger import log_error, log_info
+from utils.resilience import OPEN
+from utils.tool_cache import cache_disabled, get_tool_cache, make_cache_key
+
+WORD_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9\-']*")
+# Question scaffolding that makes poor standalone search keywords.
+QUERY_FILLER = frozenset({"could", "should", "whether", "more", "most", "versus", "vs", "between", "there", "some", "any"})
+SUBQUERY_CACHE_TTL = 10 * 60
+
+
+def decompose_query(query: str, max_subqueries: int = 3) -> List[str]:
+    """
+    Split a research question into up to max_subqueries search queries:
+    the question itself, its keywords, then overlapping keyword windows
+    (long questions) or facet expansions (short ones).
+    """
+    query = query.strip()
+    keywords = [w for w in WORD_PATTERN.findall(query) if w.lower() not in STOPWORDS | QUERY_FILLER]
+    candidates = [query, " ".join(keywords)]
+    if len(keywords) > 3:
+        for start in range(0, len(keywords) - 2, 2):
+            candidates.append(" ".join(keywords[start : start + 3]))
+    elif keywords:
+        candidates += [" ".join(keywords) + " overview", " ".join(keywords) + " examples"]
+
+    subqueries: List[str] = []
+    for candidate in candidates:
+        if candidate and candidate.lower() not in {q.lower() for q in subqueries}:
+            subqueries.append(candidate)
+    return subqueries[: max(max_subqueries, 1)]
+
+
+async def _ddgs_text(query: str, top_k: int) -> List[Dict[str, str]]:
+    from duckduckgo_search import AsyncDDGS
+
+    ddgs = AsyncDDGS()
+    try:
+        return [r async for r in ddgs.text(query, max_results=top_k)]
+    finally:
+        # AsyncDDGS.__aexit__ forgets to await the session close in 4.1.x.
+        await ddgs._session.close()
+
+
+def _subquery_cache_key(query: str, top_k: int) -> str:
+    return make_cache_key("duckduckgo_subquery", (query, top_k), {})
+
+
+async def search_duckduckgo_async(query: str, top_k: int = 3, reserved: bool = False) -> List[Dict[str, str]]:
+    """
+    One DuckDuckGo text search; results are cached per sub-query.
+    reserved=True means the caller already took a rate-limit token for it.
+    """
+    cache = None if cache_disabled() else get_tool_cache()
+    key = _subquery_cache_key(query, top_k)
+    if cache is not None:
+        hit, cached = cache.get("duckduckgo_subquery", key)
+        if hit:
+            return cached
+    if not DDG_BREAKER.allow():
+        return []
+    if not reserved and not await DDG_RATE_LIMITER.acquire_async(DDG_RATE_WAIT):
+        return []
+    try:
+        endpoint = get_ddg_endpoint()
+        if endpoint:
+            raw = await fetch_endpoint_results_async(endpoint, query, top_k)
+        else:
+            raw = await _ddgs_text(query, top_k)
+            record_search(query, raw)
+    except Exception as e:
+        DDG_BREAKER.record_failure()
+        log_error(f"DuckDuckGo async search failed for '{query}': {e}")
+        return []
+    DDG_BREAKER.record_success()
+    results = format_ddg_results(raw)
+    if results and cache is not None:
+        cache.set("duckduckgo_subquery", key, results, SUBQUERY_CACHE_TTL)
+    return results
+
+
+async def _reserve_subqueries(
+    subqueries: List[str], top_k: int
+) -> List[Tuple[str, Optional[List[Dict[str, str]]]]]:
+    # This function pairs each sub-query that will run with its cached
+    # results (None if it must be searched), taking rate-limit tokens up
+    # front. The first uncached sub-query (the original question) may wait
+    # for a token like a plain search. The others only run on spare tokens:
+    # they never wait and never take the bucket's last token, so under load
+    # a fan-out narrows instead of pushing concurrent queries onto the corpus.
+    cache = None if cache_disabled() else get_tool_cache()
+    kept: List[Tuple[str, Optional[List[Dict[str, str]]]]] = []
+    waited = False
+    for subquery in subqueries:
+        hit, cached = (False, None)
+        if cache is not None:
+            hit, cached = cache.get("duckduckgo_subquery", _subquery_cache_key(subquery, top_k))
+        if hit:
+            kept.append((subquery, cached))
+        elif not waited:
+            waited = True
+            if await DDG_RATE_LIMITER.acquire_async(DDG_RATE_WAIT):
+                kept.append((subquery, None))
+            # Let fan-outs started alongside this one take their first token.
+            await asyncio.sleep(0)
+        elif DDG_RATE_LIMITER.try_acquire(reserve=1.0) == 0.0:
+            kept.append((subquery, None))
+    if len(kept) < len(subqueries):
+        log_info(f"Fan-out search: narrowed to {len(kept)} of {len(subqueries)} sub-queries by the rate limit")
+    return kept
+
+
+async def web_search_fanout_async(
+    query: str,
+    top_k: int = 3,
+    max_subqueries: int = 3,
+    deadline: float = 5.0,
+    backend: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """
+    Fan a query out to DuckDuckGo and merge the results.
+    Sub-queries still running at the deadline are cancelled. Falls back to
+    web_search when DuckDuckGo is unavailable, a non-web backend is selected,
+    or nothing arrived in time.
+    """
+    backend = backend or DEFAULT_SEARCH_BACKEND
+    if not ddg_enabled() or backend not in ("auto", "duckduckgo"):
+        return await asyncio.to_thread(web_search, query, top_k, True, backend)
+    if backend == "auto" and DDG_BREAKER.state == OPEN:
+        log_info("Fan-out search: circuit open, using corpus")
+        return await asyncio.to_thread(web_search_corpus, query, top_k)
+
+    reserved = await _reserve_subqueries(decompose_query(query, max_subqueries), top_k)
+    if not reserved:
+        log_info("Fan-out search: rate limit reached")
+        return [] if backend == "duckduckgo" else await asyncio.to_thread(web_search_corpus, query, top_k)
+    log_info(f"Fan-out search: {len(reserved)} sub-queries, deadline {deadline}s")
+    tasks = {
+        q: asyncio.create_task(search_duckduckgo_async(q, top_k, reserved=True))
+        for q, cached in reserved
+        if cached is None
+    }
+    done: Set[asyncio.Task] = set()
+    if tasks:
+        done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            log_info(f"Fan-out search: deadline expired with {len(pending)} sub-queries pending")
+
+    # Rankings stay in sub-query order so the original question wins ties.
+    rankings = []
+    for q, cached in reserved:
+        task = tasks.get(q)
+        if task is None:
+            rankings.append(cached)
+        elif task in done and not task.cancelled() and task.exception() is None:
+            rankings.append(task.result())
+    results = reciprocal_rank_fusion([r for r in rankings if r], top_k=top_k)
+    if results or backend == "duckduckgo":
+        log_info(f"Fan-out search: merged {len(results)} results")
+        return results
+    log_info("Fan-out search returned no results, falling back to corpus")
+    return await asyncio.to_thread(web_search_corpus, query, top_k)
+
+
+def web_search_fanout(
+    query: str,
+    top_k: int = 3,
+    max_subqueries: int = 3,
+    deadline: float = 5.0,
+    backend: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """
+    Synchronous wrapper around web_search_fanout_async. Coroutines must
+    await web_search_fanout_async instead: blocking here would stall their
+    event loop for up to the deadline.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(web_search_fanout_async(query, top_k, max_subqueries, deadline, backend))
+    raise RuntimeError(
+        "web_search_fanout() was called from a running event loop; await web_search_fanout_async() "
+        "(or run this function with asyncio.to_thread)"
+    )
@@ -0,0 +1,194 @@
+# This module implements an in-memory inverted index with BM25 ranking.
+# It backs the local corpus search so that queries only touch the postings
+# of their own terms instead of scanning every document.
+
+import heapq
+import math
+import re
+from typing import Callable, Container, Dict, Iterable, List, Optional, Protocol, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Very common English words carry no ranking signal and would produce
+# the longest postings lists, so they are dropped at tokenization time.
+STOPWORDS = frozenset(
+    {
+        "a", "about", "an", "and", "are", "as", "at", "be", "by", "can", "do",
+        "does", "for", "from", "has", "have", "how", "in", "into", "is", "it",
+        "its", "of", "on", "or", "that", "the", "their", "them", "they", "this",
+        "to", "use", "used", "was", "were", "what", "when", "where", "which",
+        "who", "why", "will", "with", "would", "you",
+    }
+)
+
+
+class Postings(Protocol):
+    # Anything mapping doc_id -> term frequency: a dict for the in-memory
+    # index, a memory-mapped view for on-disk corpora.
+    def items(self) -> Iterable[Tuple[int, int]]: ...
+
+    def get(self, doc_id: int) -> Optional[int]: ...
+
+
+def normalize_token(token: str) -> str:
+    # This function applies a light plural stripping so that "agents"
+    # and "agent" share a postings list (the old scorer matched substrings).
+    # Words ending in -ss, -us or -is ("dangerous", "analysis") are not plurals.
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and normalize."""
+    return [
+        normalize_token(tok)
+        for tok in TOKEN_PATTERN.findall(text.lower())
+        if len(tok) > 1 and tok not in STOPWORDS
+    ]
+
+
+def count_terms(text: str) -> Tuple[Dict[str, int], int]:
+    # This function returns the term frequencies and token length of a text.
+    term_freqs: Dict[str, int] = {}
+    tokens = tokenize(text)
+    for tok in tokens:
+        term_freqs[tok] = term_freqs.get(tok, 0) + 1
+    return term_freqs, len(tokens)
+
+
+def bm25_idf(num_docs: int, doc_freq: int) -> float:
+    # This function computes the (always positive) BM25+ style idf.
+    return math.log(1.0 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def bm25_term_score(tf: int, doc_len: int, avg_doc_len: float, idf: float, k1: float, b: float) -> float:
+    # This function scores one term occurrence count with document-length normalization.
+    norm = k1 * (1.0 - b + b * doc_len / avg_doc_len) if avg_doc_len > 0 else k1
+    return idf * tf * (k1 + 1.0) / (tf + norm)
+
+
+def bm25_top_k(
+    terms: List[Tuple[float, Postings]],
+    top_k: int,
+    doc_len: Callable[[int], int],
+    avg_doc_len: float,
+    k1: float,
+    b: float,
+    skip: Optional[Container[int]] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Rank documents given (idf, postings) for each query term.
+    Terms are processed rarest first; once the k-th best score exceeds
+    what the remaining terms could add, common terms only update
+    documents already in the accumulator instead of walking their postings.
+    Documents in skip (e.g. deletion tombstones) are never scored.
+    Returns up to top_k (doc_id, score) pairs with a positive score.
+    """
+    if top_k <= 0 or not terms:
+        return []
+    terms = sorted(terms, key=lambda term: term[0], reverse=True)
+
+    # Upper bound on what terms[i:] can still add to any single document.
+    remaining_bound = [0.0] * (len(terms) + 1)
+    for i in range(len(terms) - 1, -1, -1):
+        remaining_bound[i] = remaining_bound[i + 1] + terms[i][0] * (k1 + 1.0)
+
+    scores: Dict[int, float] = {}
+    for i, (idf, postings) in enumerate(terms):
+        kth_best = heapq.nlargest(top_k, scores.values())[-1] if len(scores) >= top_k else 0.0
+        if len(scores) >= top_k and kth_best >= remaining_bound[i]:
+            candidates = [(d, tf) for d, tf in ((d, postings.get(d)) for d in scores) if tf]
+        else:
+            candidates = list(postings.items())
+            if skip:
+                candidates = [(d, tf) for d, tf in candidates if d not in skip]
+        for doc_id, tf in candidates:
+            scores[doc_id] = scores.get(doc_id, 0.0) + bm25_term_score(tf, doc_len(doc_id), avg_doc_len, idf, k1, b)
+
+    best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+    return [(doc_id, score) for doc_id, score in best if score > 0]
+
+
+class BM25Index:
+    """
+    Inverted index over {title, content} documents ranked with BM25.
+    Documents can be added and removed incrementally; ids are stable ints.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {doc_id: tf}
+        self._doc_terms: Dict[int, Dict[str, int]] = {}  # doc_id -> {term: tf}, for removal
+        self._doc_len: Dict[int, int] = {}
+        self._docs: Dict[int, Dict[str, str]] = {}
+        self._total_len = 0
+        self._next_id = 0
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict[str, str]], **kwargs: float) -> "BM25Index":
+        index = cls(**kwargs)
+        for doc in documents:
+            index.add_document(doc)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def avg_doc_len(self) -> float:
+        return self._total_len / len(self._doc_len) if self._doc_len else 0.0
+
+    def add_document(self, doc: Dict[str, str], doc_id: Optional[int] = None) -> int:
+        # This method tokenizes a document and merges it into the postings lists.
+        if doc_id is None:
+            doc_id = self._next_id
+        elif doc_id in self._docs:
+            self.remove_document(doc_id)
+        self._next_id = max(self._next_id, doc_id + 1)
+
+        term_freqs, length = count_terms(doc.get("title", "") + " " + doc.get("content", ""))
+        for term, tf in term_freqs.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+        self._doc_terms[doc_id] = term_freqs
+        self._doc_len[doc_id] = length
+        self._docs[doc_id] = doc
+        self._total_len += length
+        return doc_id
+
+    def remove_document(self, doc_id: int) -> bool:
+        # This method drops a document from every postings list it appears in.
+        term_freqs = self._doc_terms.pop(doc_id, None)
+        if term_freqs is None:
+            return False
+        for term in term_freqs:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._docs[doc_id]
+        return True
+
+    def get_document(self, doc_id: int) -> Optional[Dict[str, str]]:
+        return self._docs.get(doc_id)
+
+    def documents(self) -> List[Tuple[int, Dict[str, str]]]:
+        return list(self._docs.items())
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, Dict[str, str]]]:
+        """Return up to top_k (score, doc) pairs with a positive BM25 score."""
+        if top_k <= 0 or not self._docs:
+            return []
+        num_docs = len(self._docs)
+        terms = [
+            (bm25_idf(num_docs, len(self._postings[t])), self._postings[t])
+            for t in set(tokenize(query))
+            if t in self._postings
+        ]
+        best = bm25_top_k(terms, top_k, self._doc_len.__getitem__, self.avg_doc_len, self.k1, self.b)
+        return [(score, self._docs[doc_id]) for doc_id, score in best]
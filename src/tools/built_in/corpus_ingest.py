@@ -0,0 +1,386 @@
+# This module ingests document collections (directories of .txt/.md files
+# and JSONL dumps) into an on-disk corpus directory for the local search
+# fallback. Parsing and tokenizing run across a process pool and documents
+# are streamed into the corpus writer instead of being loaded all at once.
+#
+# A corpus directory holds one or more segment files (see corpus_store) plus
+# manifest.json, which records the content hash and document range of every
+# source file. Re-running ingestion only parses new or changed files: they go
+# into one new segment, and their previous documents are tombstoned.
+# Segment files are deleted only after a manifest that no longer references
+# them has been saved, so a crash never leaves the manifest pointing at
+# missing segments; files orphaned by such a crash are swept on the next run.
+
+import glob
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from tools.built_in.bm25_index import bm25_idf, count_terms, tokenize
+from tools.built_in.corpus_store import VERSION, CorpusWriter, MmapCorpus
+from utils.logger import log_info
+
+MANIFEST_NAME = "manifest.json"
+TEXT_EXTENSIONS = (".txt", ".md")
+JSONL_EXTENSIONS = (".jsonl",)
+# JSONL dumps are split into byte ranges of this size so one large file
+# is parsed by several workers.
+JSONL_CHUNK_BYTES = 8 * 1024 * 1024
+
+# (doc, term frequencies, token length) as produced by the workers.
+ParsedDoc = Tuple[Dict[str, str], Dict[str, int], int]
+
+
+def file_sha256(path: str) -> str:
+    # This function hashes a file in 1 MiB blocks.
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash_task(path: str) -> Tuple[str, str]:
+    return path, file_sha256(path)
+
+
+def _parse_text_file(path: str) -> List[ParsedDoc]:
+    # This function turns one .txt/.md file into a single document. A leading
+    # markdown heading becomes the title, otherwise the file name does.
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    title = os.path.splitext(os.path.basename(path))[0]
+    for line in text.splitlines():
+        if line.strip():
+            if line.lstrip().startswith("#"):
+                title = line.strip().lstrip("#").strip() or title
+            break
+    doc = {"title": title, "content": text.strip(), "url": "file://" + os.path.abspath(path)}
+    term_freqs, length = count_terms(doc["title"] + " " + doc["content"])
+    return [(doc, term_freqs, length)]
+
+
+def _parse_jsonl_chunk(path: str, start: int, end: int) -> List[ParsedDoc]:
+    # This function parses the JSONL lines that start inside [start, end).
+    # A line straddling `start` belongs to the previous chunk.
+    docs: List[ParsedDoc] = []
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            content = record.get("content") or record.get("text") or record.get("body")
+            if not content:
+                continue
+            doc = {"title": str(record.get("title") or "Untitled"), "content": str(content)}
+            if record.get("url"):
+                doc["url"] = str(record["url"])
+            term_freqs, length = count_terms(doc["title"] + " " + doc["content"])
+            docs.append((doc, term_freqs, length))
+    return docs
+
+
+def _parse_task(task: Tuple[str, int, int]) -> Tuple[str, List[ParsedDoc]]:
+    path, start, end = task
+    if path.endswith(JSONL_EXTENSIONS):
+        return path, _parse_jsonl_chunk(path, start, end)
+    return path, _parse_text_file(path)
+
+
+def bounded_map(executor: Executor, fn: Callable[[Any], Any], tasks: Iterable[Any], window: int) -> Iterator[Any]:
+    """
+    Like executor.map, but pulls tasks lazily and keeps at most `window`
+    of them in flight, so results never pile up faster than they are consumed.
+    Results are yielded in task order.
+    """
+    pending: Deque[Future] = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def discover_files(inputs: Iterable[str]) -> Iterator[str]:
+    """Yield absolute paths of ingestible files under the given paths."""
+    for root in inputs:
+        if os.path.isfile(root):
+            if root.endswith(TEXT_EXTENSIONS + JSONL_EXTENSIONS):
+                yield os.path.abspath(root)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.endswith(TEXT_EXTENSIONS + JSONL_EXTENSIONS):
+                    yield os.path.abspath(os.path.join(dirpath, name))
+
+
+def _under_inputs(path: str, inputs: Iterable[str]) -> bool:
+    for root in inputs:
+        root = os.path.abspath(root)
+        if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def _file_tasks(path: str) -> Iterator[Tuple[str, int, int]]:
+    if not path.endswith(JSONL_EXTENSIONS):
+        yield path, 0, 0
+        return
+    size = os.path.getsize(path)
+    for start in range(0, max(size, 1), JSONL_CHUNK_BYTES):
+        yield path, start, min(start + JSONL_CHUNK_BYTES, size)
+
+
+def load_manifest(corpus_dir: str) -> Dict[str, Any]:
+    path = os.path.join(corpus_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return _new_manifest()
+
+
+def _new_manifest(next_segment: int = 1) -> Dict[str, Any]:
+    return {"version": VERSION, "next_segment": next_segment, "segments": {}, "sources": {}}
+
+
+def _save_manifest(corpus_dir: str, manifest: Dict[str, Any]) -> None:
+    # The manifest is replaced atomically; it is the commit point of a run.
+    path = os.path.join(corpus_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def remove_orphan_segments(corpus_dir: str, manifest: Dict[str, Any]) -> int:
+    # This function deletes segment files the saved manifest does not
+    # reference: ones it dropped, and partial ones from an interrupted run.
+    removed = 0
+    for path in glob.glob(os.path.join(corpus_dir, "segment-*.arac")):
+        if os.path.basename(path) not in manifest["segments"]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def _tombstone(manifest: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    segment = manifest["segments"].get(entry["segment"])
+    if segment is not None and entry["count"]:
+        segment["deleted"].append([entry["start"], entry["start"] + entry["count"]])
+        segment["live"] -= entry["count"]
+
+
+def _drop_dead_segments(manifest: Dict[str, Any]) -> None:
+    # Their files are removed once the manifest has been saved.
+    for name in [n for n, seg in manifest["segments"].items() if seg["live"] <= 0]:
+        del manifest["segments"][name]
+
+
+def ingest(
+    inputs: List[str],
+    corpus_dir: str,
+    workers: Optional[int] = None,
+    window: Optional[int] = None,
+    prune: bool = False,
+) -> Dict[str, int]:
+    """
+    Incrementally ingest files into corpus_dir and return run statistics.
+    Files whose size/mtime are unchanged keep their recorded hash; others
+    are re-hashed, and only files whose hash changed are parsed. Files
+    deleted from under the given inputs are removed; with prune=True,
+    every recorded file not among this run's inputs is removed.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    manifest = load_manifest(corpus_dir)
+    remove_orphan_segments(corpus_dir, manifest)
+    if manifest["version"] != VERSION:
+        # Segments from an older format or tokenizer cannot be searched;
+        # reindex. The old files go once the new manifest is saved.
+        log_info(f"Corpus {corpus_dir} is version {manifest['version']}, rebuilding")
+        manifest = _new_manifest(manifest["next_segment"])
+    sources: Dict[str, Dict[str, Any]] = manifest["sources"]
+    stats = {"scanned": 0, "unchanged": 0, "indexed_files": 0, "indexed_docs": 0, "removed": 0}
+
+    seen: Set[str] = set()
+    to_hash: List[str] = []
+    for path in discover_files(inputs):
+        seen.add(path)
+        st = os.stat(path)
+        entry = sources.get(path)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            stats["unchanged"] += 1
+        else:
+            to_hash.append(path)
+    stats["scanned"] = len(seen)
+
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        changed: List[Tuple[str, str]] = []
+        for path, digest in bounded_map(pool, _hash_task, to_hash, window):
+            entry = sources.get(path)
+            if entry and entry["sha256"] == digest:
+                st = os.stat(path)
+                entry["size"], entry["mtime"] = st.st_size, st.st_mtime
+                stats["unchanged"] += 1
+            else:
+                changed.append((path, digest))
+
+        segment_name = None
+        if changed:
+            segment_name = f"segment-{manifest['next_segment']:06d}.arac"
+            writer = CorpusWriter(os.path.join(corpus_dir, segment_name))
+            tasks = (task for path, _ in changed for task in _file_tasks(path))
+            ranges: Dict[str, List[int]] = {}
+            for path, parsed in bounded_map(pool, _parse_task, tasks, window):
+                doc_range = ranges.setdefault(path, [writer.doc_count, 0])
+                for doc, term_freqs, length in parsed:
+                    writer.add(doc, term_freqs, length)
+                    doc_range[1] += 1
+            writer.close()
+
+            manifest["segments"][segment_name] = {"deleted": [], "live": writer.doc_count}
+            manifest["next_segment"] += 1
+            for path, digest in changed:
+                if path in sources:
+                    _tombstone(manifest, sources[path])
+                st = os.stat(path)
+                start, count = ranges.get(path, [writer.doc_count, 0])
+                sources[path] = {
+                    "sha256": digest,
+                    "size": st.st_size,
+                    "mtime": st.st_mtime,
+                    "segment": segment_name,
+                    "start": start,
+                    "count": count,
+                }
+                stats["indexed_docs"] += count
+            stats["indexed_files"] = len(changed)
+
+    # Sources deleted from under the inputs (or, when pruning, every source
+    # not among them) are removed; files ingested from other roots are kept.
+    for path in [p for p in sources if p not in seen and (prune or _under_inputs(p, inputs))]:
+        _tombstone(manifest, sources.pop(path))
+        stats["removed"] += 1
+
+    _drop_dead_segments(manifest)
+    _save_manifest(corpus_dir, manifest)
+    remove_orphan_segments(corpus_dir, manifest)
+    log_info(
+        f"Ingestion into {corpus_dir}: {stats['indexed_files']} files reindexed "
+        f"({stats['indexed_docs']} docs), {stats['unchanged']} unchanged, {stats['removed']} removed"
+    )
+    return stats
+
+
+class CorpusDirectory:
+    """
+    Searches all segments of an ingested corpus directory as one collection.
+    Term statistics are summed over segments (tombstoned documents still
+    count toward document frequency until the directory is compacted).
+    """
+
+    def __init__(self, corpus_dir: str) -> None:
+        self.corpus_dir = corpus_dir
+        manifest = load_manifest(corpus_dir)
+        self._segments: List[Tuple[MmapCorpus, Set[int]]] = []
+        for name, info in sorted(manifest["segments"].items()):
+            deleted: Set[int] = set()
+            for start, end in info["deleted"]:
+                deleted.update(range(start, end))
+            self._segments.append((MmapCorpus(os.path.join(corpus_dir, name)), deleted))
+        self.doc_count = sum(len(seg) for seg, _ in self._segments)
+        total_tokens = sum(seg.total_tokens for seg, _ in self._segments)
+        self.avg_doc_len = total_tokens / self.doc_count if self.doc_count else 0.0
+
+    def __len__(self) -> int:
+        return sum(len(seg) - len(deleted) for seg, deleted in self._segments)
+
+    def close(self) -> None:
+        for seg, _ in self._segments:
+            seg.close()
+
+    def iter_documents(self) -> Iterator[Dict[str, str]]:
+        for seg, deleted in self._segments:
+            for doc_id, doc in seg.iter_documents():
+                if doc_id not in deleted:
+                    yield doc
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, Dict[str, str]]]:
+        """Return up to top_k (score, doc) pairs across all live segments."""
+        terms = set(tokenize(query))
+        doc_freq: Dict[str, int] = {}
+        for seg, _ in self._segments:
+            for term in terms:
+                postings = seg.postings(term)
+                if postings is not None:
+                    doc_freq[term] = doc_freq.get(term, 0) + len(postings.doc_ids)
+
+        def idf(term: str, postings: Any) -> float:
+            return bm25_idf(self.doc_count, doc_freq[term])
+
+        hits: List[Tuple[float, int, int]] = []
+        for i, (seg, deleted) in enumerate(self._segments):
+            for doc_id, score in seg.rank(terms, top_k, idf, self.avg_doc_len, skip=deleted):
+                hits.append((score, i, doc_id))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [(score, self._segments[i][0].get_document(doc_id)) for score, i, doc_id in hits[:top_k]]
+
+
+def compact(corpus_dir: str) -> int:
+    """Rewrite all live documents into a single segment, dropping tombstones."""
+    manifest = load_manifest(corpus_dir)
+    remove_orphan_segments(corpus_dir, manifest)
+    if not manifest["segments"]:
+        return 0
+    segment_name = f"segment-{manifest['next_segment']:06d}.arac"
+    writer = CorpusWriter(os.path.join(corpus_dir, segment_name))
+    remap: Dict[Tuple[str, int], int] = {}
+    for name, info in sorted(manifest["segments"].items()):
+        seg = MmapCorpus(os.path.join(corpus_dir, name))
+        deleted: Set[int] = set()
+        for start, end in info["deleted"]:
+            deleted.update(range(start, end))
+        for doc_id, doc in seg.iter_documents():
+            if doc_id not in deleted:
+                remap[(name, doc_id)] = writer.add(doc)
+        seg.close()
+    writer.close()
+
+    for entry in manifest["sources"].values():
+        if entry["count"]:
+            entry["start"] = remap[(entry["segment"], entry["start"])]
+        entry["segment"] = segment_name
+    manifest["segments"] = {segment_name: {"deleted": [], "live": writer.doc_count}}
+    manifest["next_segment"] += 1
+    _save_manifest(corpus_dir, manifest)
+    remove_orphan_segments(corpus_dir, manifest)
+    log_info(f"Compacted {corpus_dir} into {segment_name} ({writer.doc_count} documents)")
+    return writer.doc_count
+
+
+def open_corpus(path: str) -> Any:
+    """Open either a single corpus file or an ingested corpus directory."""
+    if os.path.isdir(path):
+        return CorpusDirectory(path)
+    return MmapCorpus(path)
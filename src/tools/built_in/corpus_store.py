@@ -0,0 +1,250 @@
+# This module implements a compact on-disk corpus format for the local search
+# fallback. A corpus file holds fixed-width tables (documents, term hashes,
+# term postings ranges, postings) followed by a UTF-8 content blob. Readers
+# open it with mmap, so every API worker shares the same pages through the OS
+# page cache and only the top-k hits of a search are ever decoded.
+#
+# Layout (little-endian, every section 8-byte aligned):
+#   header      HEADER struct, see below
+#   doc table   5 x u64 per doc: blob offset, title len, url len, content len, token len
+#   term hashes u64 per term, sorted ascending (binary searched)
+#   term info   2 x u64 per term: first postings entry, document frequency
+#   postings    u32 doc ids for all terms, then u32 term frequencies
+#   blob        title + url + content bytes for each doc
+
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Callable, Container, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tools.built_in.bm25_index import bm25_idf, bm25_top_k, count_terms, tokenize
+from utils.logger import log_info
+
+MAGIC = b"ARAC"
+# Bumped whenever the format or the tokenizer changes; older files must be rebuilt.
+VERSION = 2
+# magic, version, doc count, term count, total tokens, then section offsets:
+# doc table, term hashes, term info, postings doc ids, postings tfs, blob.
+HEADER = struct.Struct("<4sIIIQQQQQQQ")
+DOC_FIELDS = 5
+
+
+def term_hash(term: str) -> int:
+    # This function maps a term to the stable 64-bit key stored on disk.
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class CorpusWriter:
+    """
+    Streams documents into a corpus file.
+    Document bodies go straight to a temporary blob file, so only the
+    postings stay in memory while writing. close() writes the final file
+    atomically (readers never observe a half-written corpus).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._blob_path = path + ".blob.tmp"
+        self._blob = open(self._blob_path, "wb")
+        self._blob_size = 0
+        self._doc_table = array("Q")
+        self._postings: Dict[int, Tuple[array, array]] = {}  # term hash -> (doc ids, tfs)
+        self._total_tokens = 0
+        self.doc_count = 0
+
+    def add(self, doc: Dict[str, str], term_freqs: Optional[Dict[str, int]] = None, length: Optional[int] = None) -> int:
+        # This method appends one document; term_freqs/length may be
+        # precomputed (e.g. by an ingestion worker) to skip re-tokenizing.
+        title = doc.get("title", "").encode("utf-8")
+        url = doc.get("url", "").encode("utf-8")
+        content = doc.get("content", "").encode("utf-8")
+        if term_freqs is None or length is None:
+            term_freqs, length = count_terms(doc.get("title", "") + " " + doc.get("content", ""))
+
+        doc_id = self.doc_count
+        self._doc_table.extend((self._blob_size, len(title), len(url), len(content), length))
+        self._blob.write(title)
+        self._blob.write(url)
+        self._blob.write(content)
+        self._blob_size += len(title) + len(url) + len(content)
+
+        for term, tf in term_freqs.items():
+            key = term_hash(term)
+            entry = self._postings.get(key)
+            if entry is None:
+                entry = self._postings[key] = (array("I"), array("I"))
+            entry[0].append(doc_id)
+            entry[1].append(tf)
+        self._total_tokens += length
+        self.doc_count += 1
+        return doc_id
+
+    def close(self) -> None:
+        # This method lays out the tables and moves the finished file into place.
+        self._blob.close()
+        hashes = sorted(self._postings)
+        term_info = array("Q")
+        doc_ids = array("I")
+        tfs = array("I")
+        for h in hashes:
+            ids, freqs = self._postings[h]
+            term_info.extend((len(doc_ids), len(ids)))
+            doc_ids.extend(ids)
+            tfs.extend(freqs)
+
+        offsets: List[int] = []
+        position = HEADER.size
+        for size in (
+            len(self._doc_table) * 8,
+            len(hashes) * 8,
+            len(term_info) * 8,
+            len(doc_ids) * 4,
+            len(tfs) * 4,
+        ):
+            position = _align(position)
+            offsets.append(position)
+            position += size
+        offsets.append(_align(position))
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.doc_count, len(hashes), self._total_tokens, *offsets))
+            sections = (self._doc_table, array("Q", hashes), term_info, doc_ids, tfs)
+            for offset, section in zip(offsets, sections):
+                f.write(b"\0" * (offset - f.tell()))
+                section.tofile(f)
+            f.write(b"\0" * (offsets[-1] - f.tell()))
+            with open(self._blob_path, "rb") as blob:
+                shutil.copyfileobj(blob, f)
+        os.remove(self._blob_path)
+        os.replace(tmp_path, self.path)
+        log_info(f"Corpus written to {self.path}: {self.doc_count} documents, {len(hashes)} terms")
+
+
+def write_corpus(path: str, documents: Iterable[Dict[str, str]]) -> int:
+    """Write documents to a corpus file and return how many were written."""
+    writer = CorpusWriter(path)
+    for doc in documents:
+        writer.add(doc)
+    writer.close()
+    return writer.doc_count
+
+
+class _MmapPostings:
+    # Postings of one term as zero-copy slices of the mapped file.
+    __slots__ = ("doc_ids", "tfs")
+
+    def __init__(self, doc_ids: memoryview, tfs: memoryview) -> None:
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.doc_ids, self.tfs)
+
+    def get(self, doc_id: int) -> Optional[int]:
+        # Doc ids are written in increasing order, so lookups are binary searches.
+        i = bisect_left(self.doc_ids, doc_id)
+        if i < len(self.doc_ids) and self.doc_ids[i] == doc_id:
+            return self.tfs[i]
+        return None
+
+
+class MmapCorpus:
+    """
+    Read-only, memory-mapped corpus with BM25 search.
+    Opening costs one header read regardless of corpus size.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75) -> None:
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._mmap)
+        magic, version, self.doc_count, self.term_count, total_tokens, *offsets = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} corpus file")
+        doc_off, hash_off, info_off, ids_off, tfs_off, self._blob_off = offsets
+        self.total_tokens = total_tokens
+        self.avg_doc_len = total_tokens / self.doc_count if self.doc_count else 0.0
+        self._docs = view[doc_off : doc_off + self.doc_count * DOC_FIELDS * 8].cast("Q")
+        self._hashes = view[hash_off : hash_off + self.term_count * 8].cast("Q")
+        self._term_info = view[info_off : info_off + self.term_count * 16].cast("Q")
+        # Both postings arrays may carry one trailing alignment entry; it is
+        # never addressed because term info holds explicit (start, df) ranges.
+        self._doc_ids = view[ids_off:tfs_off].cast("I")
+        self._tfs = view[tfs_off : self._blob_off].cast("I")
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def close(self) -> None:
+        for view in (self._docs, self._hashes, self._term_info, self._doc_ids, self._tfs, self._view):
+            view.release()
+        self._mmap.close()
+
+    def doc_len(self, doc_id: int) -> int:
+        return self._docs[doc_id * DOC_FIELDS + 4]
+
+    def postings(self, term: str) -> Optional[_MmapPostings]:
+        # This method binary searches the sorted term hashes for a term.
+        h = term_hash(term)
+        i = bisect_left(self._hashes, h)
+        if i == self.term_count or self._hashes[i] != h:
+            return None
+        start, df = self._term_info[2 * i], self._term_info[2 * i + 1]
+        return _MmapPostings(self._doc_ids[start : start + df], self._tfs[start : start + df])
+
+    def get_document(self, doc_id: int) -> Dict[str, str]:
+        # This method decodes one document from the blob on demand.
+        base = doc_id * DOC_FIELDS
+        offset, title_len, url_len, content_len = self._docs[base : base + 4]
+        start = self._blob_off + offset
+        title = self._mmap[start : start + title_len].decode("utf-8")
+        start += title_len
+        url = self._mmap[start : start + url_len].decode("utf-8")
+        start += url_len
+        doc = {"title": title, "content": self._mmap[start : start + content_len].decode("utf-8")}
+        if url:
+            doc["url"] = url
+        return doc
+
+    def iter_documents(self) -> Iterator[Tuple[int, Dict[str, str]]]:
+        for doc_id in range(self.doc_count):
+            yield doc_id, self.get_document(doc_id)
+
+    def rank(
+        self,
+        terms: Iterable[str],
+        top_k: int,
+        idf: Callable[[str, _MmapPostings], float],
+        avg_doc_len: float,
+        skip: Optional[Container[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        # This method ranks doc ids with caller-supplied statistics, so that
+        # several corpus files can be scored as one collection.
+        weighted = []
+        for term in terms:
+            postings = self.postings(term)
+            if postings is not None:
+                weighted.append((idf(term, postings), postings))
+        return bm25_top_k(weighted, top_k, self.doc_len, avg_doc_len, self.k1, self.b, skip=skip)
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, Dict[str, str]]]:
+        """Return up to top_k (score, doc) pairs; only the hits are materialized."""
+        best = self.rank(
+            set(tokenize(query)),
+            top_k,
+            lambda term, postings: bm25_idf(self.doc_count, len(postings.doc_ids)),
+            self.avg_doc_len,
+        )
+        return [(score, self.get_document(doc_id)) for doc_id, score in best]
@@ -0,0 +1,64 @@
+# This module collapses near-duplicate search results before analysis.
+# Mirrored and syndicated pages share most of their word shingles, so each
+# source gets a MinHash signature over its 3-word shingles; MinHash LSH
+# finds earlier sources with similar signatures, and a source whose exact
+# shingle Jaccard similarity reaches the threshold is merged into the
+# better-ranked copy, whose "urls" list keeps every merged URL.
+
+import re
+from typing import Dict, List, Set
+
+from utils.fingerprint import MinHasher, MinHashLSH, jaccard
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+SHINGLE_SIZE = 3
+
+_HASHER = MinHasher()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    # This function returns the set of word n-grams in normalized text.
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def dedupe_sources(sources: List[Dict[str, str]], threshold: float = 0.7) -> List[Dict]:
+    """
+    Return sources in rank order without near-duplicates. Sources are
+    compared on title + content; a later source is dropped when it shares
+    its URL with a kept one or its shingle similarity reaches threshold.
+    """
+    kept: List[Dict] = []
+    kept_shingles: List[Set[str]] = []
+    kept_by_url: Dict[str, int] = {}
+    lsh = MinHashLSH(num_perm=_HASHER.num_perm)
+
+    for source in sources:
+        url = source.get("url", "")
+        features = shingles(f"{source.get('title', '')} {source.get('content', '')}")
+        signature = _HASHER.signature(features) if features else None
+        match = kept_by_url.get(url) if url else None
+        if match is None and signature is not None:
+            best = 0.0
+            for candidate in lsh.query(signature):
+                score = jaccard(features, kept_shingles[candidate])
+                if score >= threshold and score > best:
+                    match, best = candidate, score
+
+        if match is not None:
+            urls = kept[match]["urls"]
+            if url and url not in urls:
+                urls.append(url)
+                kept_by_url[url] = match
+            continue
+
+        index = len(kept)
+        kept.append(dict(source, urls=[url] if url else []))
+        kept_shingles.append(features)
+        if url:
+            kept_by_url[url] = index
+        if signature is not None:
+            lsh.insert(index, signature)
+    return kept
@@ -0,0 +1,242 @@
+# This module implements an offline dense retrieval index.
+# Documents are embedded with hashed TF-IDF features (words plus character
+# trigrams, so paraphrases and inflections still overlap) and kept in one
+# contiguous float32 NumPy matrix that is scored with matrix products.
+# On large corpora, random-projection LSH buckets prune the candidate rows.
+
+import heapq
+import math
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from tools.built_in.bm25_index import tokenize
+from utils.logger import log_error
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    log_error("NumPy not installed. Dense retrieval is disabled.")
+
+
+def _feature_hash(feature: str) -> int:
+    # This function uses crc32 instead of hash() so vectors stay identical
+    # across processes (hash() is salted per interpreter).
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+def hashed_features(text: str, dim: int, trigrams: bool = True) -> Dict[int, float]:
+    """Map text to {column: signed sublinear tf} using feature hashing."""
+    counts: Dict[int, float] = {}
+    for tok in tokenize(text):
+        grams = [tok]
+        if trigrams:
+            grams += ["#" + tok[i : i + 3] for i in range(max(len(tok) - 2, 1))]
+        for j, gram in enumerate(grams):
+            h = _feature_hash(gram)
+            col = h % dim
+            sign = 1.0 if (h >> 31) & 1 == 0 else -1.0
+            # Whole words weigh more than their trigrams.
+            weight = 1.0 if j == 0 else 0.5
+            counts[col] = counts.get(col, 0.0) + sign * weight
+    return {col: math.copysign(1.0 + math.log(abs(v)), v) for col, v in counts.items() if v != 0.0}
+
+
+class DenseIndex:
+    """
+    Dense vector index with incremental add/remove.
+    Rows [0, len) of the matrix are always live; removal moves the last
+    row into the freed slot so scoring never has to mask dead rows.
+    Below lsh_min_docs every row is scored exactly; above it, only rows
+    sharing an LSH bucket (or a 1-bit neighbour) with the query are scored.
+    Adds, removes and searches are serialized by one lock, so a search
+    never sees norms, rows and ids from different index states.
+    """
+
+    def __init__(
+        self,
+        dim: int = 512,
+        lsh_bits: int = 12,
+        lsh_tables: int = 16,
+        lsh_min_docs: int = 50000,
+        seed: int = 13,
+    ) -> None:
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("DenseIndex requires numpy")
+        self.dim = dim
+        self.lsh_bits = lsh_bits
+        self.lsh_tables = lsh_tables
+        self.lsh_min_docs = lsh_min_docs
+        self._matrix = np.zeros((64, dim), dtype=np.float32)
+        self._signatures = np.zeros((64, lsh_tables), dtype=np.int64)
+        self._size = 0
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._norms: Optional["np.ndarray"] = None  # cached tf-idf row norms, None when stale
+        self._row_ids: List[int] = []               # row -> doc_id
+        self._id_rows: Dict[int, int] = {}          # doc_id -> row
+        self._docs: Dict[int, Dict[str, str]] = {}
+        self._next_id = 0
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((lsh_tables, lsh_bits, dim)).astype(np.float32)
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in range(lsh_tables)]
+        self._bit_weights = (1 << np.arange(lsh_bits, dtype=np.int64))
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict[str, str]], **kwargs: int) -> "DenseIndex":
+        index = cls(**kwargs)
+        for doc in documents:
+            index.add_document(doc)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _embed(self, text: str, trigrams: bool = True) -> "np.ndarray":
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for col, value in hashed_features(text, self.dim, trigrams=trigrams).items():
+            vec[col] = value
+        return vec
+
+    def _signature(self, text: str) -> "np.ndarray":
+        # This method returns one integer bucket key per LSH table. Only word
+        # features are projected: trigrams are shared by most documents and
+        # would push nearly everything into the same few buckets.
+        bits = (self._planes @ self._embed(text, trigrams=False)) > 0  # (tables, bits)
+        return bits.astype(np.int64) @ self._bit_weights
+
+    def _idf(self) -> "np.ndarray":
+        return np.log1p((self._size + 1.0) / (self._doc_freq + 1.0)).astype(np.float32)
+
+    def add_document(self, doc: Dict[str, str], doc_id: Optional[int] = None) -> int:
+        # This method embeds a document and appends it as a new matrix row.
+        text = doc.get("title", "") + " " + doc.get("content", "")
+        vec = self._embed(text)
+        sig = self._signature(text)
+        with self._lock:
+            return self._add_row(doc, doc_id, vec, sig)
+
+    def _add_row(self, doc: Dict[str, str], doc_id: Optional[int], vec: "np.ndarray", sig: "np.ndarray") -> int:
+        if doc_id is None:
+            doc_id = self._next_id
+        elif doc_id in self._docs:
+            self._remove_row(doc_id)
+        self._next_id = max(self._next_id, doc_id + 1)
+
+        if self._size == self._matrix.shape[0]:
+            self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)])
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+
+        row = self._size
+        self._matrix[row] = vec
+        self._doc_freq += vec != 0
+        self._signatures[row] = sig
+        for table, key in enumerate(sig.tolist()):
+            self._buckets[table].setdefault(key, set()).add(row)
+
+        self._row_ids.append(doc_id)
+        self._id_rows[doc_id] = row
+        self._docs[doc_id] = doc
+        self._size += 1
+        self._norms = None
+        return doc_id
+
+    def _unbucket(self, row: int) -> None:
+        for table, key in enumerate(self._signatures[row].tolist()):
+            bucket = self._buckets[table].get(key)
+            if bucket is not None:
+                bucket.discard(row)
+                if not bucket:
+                    del self._buckets[table][key]
+
+    def remove_document(self, doc_id: int) -> bool:
+        with self._lock:
+            return self._remove_row(doc_id)
+
+    def _remove_row(self, doc_id: int) -> bool:
+        # This method removes a row by swapping the last row into its slot.
+        row = self._id_rows.pop(doc_id, None)
+        if row is None:
+            return False
+        last = self._size - 1
+        self._doc_freq -= self._matrix[row] != 0
+        self._unbucket(row)
+        if row != last:
+            self._unbucket(last)
+            self._matrix[row] = self._matrix[last]
+            self._signatures[row] = self._signatures[last]
+            for table, key in enumerate(self._signatures[row].tolist()):
+                self._buckets[table].setdefault(key, set()).add(row)
+            moved_id = self._row_ids[last]
+            self._row_ids[row] = moved_id
+            self._id_rows[moved_id] = row
+        self._row_ids.pop()
+        self._matrix[last] = 0.0
+        self._size -= 1
+        del self._docs[doc_id]
+        self._norms = None
+        return True
+
+    def _candidate_rows(self, query: str, top_k: int) -> Optional["np.ndarray"]:
+        # This method collects LSH candidates (exact bucket plus 1-bit probes).
+        # None means "score every row", used for small corpora or thin buckets.
+        if self._size < self.lsh_min_docs:
+            return None
+        rows: Set[int] = set()
+        for table, key in enumerate(self._signature(query).tolist()):
+            buckets = self._buckets[table]
+            rows.update(buckets.get(key, ()))
+            for bit in range(self.lsh_bits):
+                rows.update(buckets.get(key ^ (1 << bit), ()))
+        if len(rows) < top_k:
+            return None
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+    def search_batch(self, queries: List[str], top_k: int = 3) -> List[List[Tuple[float, Dict[str, str]]]]:
+        """
+        Score several queries against the matrix in one pass.
+        Returns per-query lists of (cosine score, doc) with positive scores.
+        """
+        raw = np.stack([self._embed(q) for q in queries]) if queries else None  # (q, dim)
+        with self._lock:
+            return self._search_rows(queries, raw, top_k)
+
+    def _search_rows(
+        self, queries: List[str], raw: Optional["np.ndarray"], top_k: int
+    ) -> List[List[Tuple[float, Dict[str, str]]]]:
+        if not queries or top_k <= 0 or self._size == 0:
+            return [[] for _ in queries]
+
+        idf = self._idf()
+        if self._norms is None:
+            live = self._matrix[: self._size]
+            self._norms = np.sqrt((live * live) @ (idf * idf))
+            self._norms[self._norms == 0] = 1.0
+
+        weighted = raw * idf
+        q_norms = np.linalg.norm(weighted, axis=1)
+        q_norms[q_norms == 0] = 1.0
+        # Folding idf into the query gives tf-idf cosine without a weighted copy of the matrix.
+        projected = (weighted * idf / q_norms[:, None]).T        # (dim, q)
+
+        full_scores: Optional["np.ndarray"] = None
+        results: List[List[Tuple[float, Dict[str, str]]]] = []
+        for i in range(len(queries)):
+            rows = self._candidate_rows(queries[i], top_k)
+            if rows is None:
+                if full_scores is None:
+                    full_scores = (self._matrix[: self._size] @ projected) / self._norms[:, None]
+                scores = full_scores[:, i]
+                rows = np.arange(self._size)
+            else:
+                scores = (self._matrix[rows] @ projected[:, i]) / self._norms[rows]
+            k = min(top_k, len(rows))
+            best = np.argpartition(-scores, k - 1)[:k]
+            ranked = heapq.nlargest(k, ((float(scores[j]), int(rows[j])) for j in best))
+            results.append([(s, self._docs[self._row_ids[r]]) for s, r in ranked if s > 0])
+        return results
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, Dict[str, str]]]:
+        return self.search_batch([query], top_k=top_k)[0]
@@ -0,0 +1,105 @@
+# This module implements query-focused extractive summarization.
+# Every candidate sentence becomes a sparse TF-IDF row (kept as flat NumPy
+# coordinate arrays); relevance to the query and centrality (similarity to
+# the centroid of all sentences) are computed for all rows at once with
+# np.bincount over the non-zeros, and sentences are then chosen greedily
+# with maximal marginal relevance (MMR) so near-repeats are skipped. Every
+# step is linear in the number of non-zeros, so there is no per-pair loop.
+
+from typing import Dict, List, Tuple
+
+from tools.built_in.bm25_index import normalize_token, STOPWORDS, tokenize
+from tools.built_in.parsed_document import ParsedDocument
+from utils.logger import log_error
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    log_error("NumPy not installed. Extractive summarization is disabled.")
+
+
+def _sentence_terms(doc: ParsedDocument, i: int) -> List[str]:
+    # The stored tokens are reused; they only need the search normalization.
+    return [
+        normalize_token(w)
+        for w in (word.lower() for word in doc.words(i))
+        if len(w) > 1 and w not in STOPWORDS
+    ]
+
+
+def _dot(rows, cols, vals, vector, num_rows: int):
+    # This function multiplies the sparse sentence matrix by a dense vector.
+    return np.bincount(rows, weights=vals * vector[cols], minlength=num_rows)
+
+
+def select_sentences(
+    parsed: List[ParsedDocument],
+    query: str,
+    max_sentences: int = 4,
+    query_weight: float = 0.7,
+    diversity: float = 0.3,
+) -> List[Tuple[int, int]]:
+    """
+    Return up to max_sentences (source index, sentence index) pairs, in
+    document order. Relevance blends query similarity (query_weight) with
+    centrality; diversity is the MMR penalty for similarity to sentences
+    already chosen.
+    """
+    candidates: List[Tuple[int, int]] = []
+    vocab: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for source, doc in enumerate(parsed):
+        for i in range(len(doc)):
+            terms = _sentence_terms(doc, i)
+            if not terms:
+                continue
+            row = len(candidates)
+            candidates.append((source, i))
+            for term in terms:
+                rows.append(row)
+                cols.append(vocab.setdefault(term, len(vocab)))
+    if not candidates:
+        return []
+
+    n, v = len(candidates), len(vocab)
+    # Collapse repeated (row, col) coordinates into term counts.
+    flat, tf = np.unique(np.asarray(rows, dtype=np.int64) * v + np.asarray(cols, dtype=np.int64), return_counts=True)
+    r, c = flat // v, flat % v
+    df = np.bincount(c, minlength=v)
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    vals = (1.0 + np.log(tf)) * idf[c]
+    norms = np.sqrt(np.bincount(r, weights=vals * vals, minlength=n))
+    vals = vals / norms[r]
+
+    centroid = np.bincount(c, weights=vals, minlength=v) / n
+    centrality = _dot(r, c, vals, centroid, n)
+    centrality /= centrality.max() or 1.0
+
+    q = np.zeros(v)
+    for term in tokenize(query):
+        if term in vocab:
+            q[vocab[term]] += 1.0
+    if q.any():
+        q *= idf
+        q /= np.linalg.norm(q)
+        relevance = query_weight * _dot(r, c, vals, q, n) + (1.0 - query_weight) * centrality
+    else:
+        relevance = centrality
+
+    # Greedy MMR: each pick costs one sparse mat-vec to update redundancy.
+    chosen: List[int] = []
+    redundancy = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    for _ in range(min(max_sentences, n)):
+        scores = np.where(available, (1.0 - diversity) * relevance - diversity * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        chosen.append(best)
+        available[best] = False
+        picked = np.zeros(v)
+        mask = r == best
+        picked[c[mask]] = vals[mask]
+        redundancy = np.maximum(redundancy, _dot(r, c, vals, picked, n))
+    return sorted(candidates[row] for row in chosen)
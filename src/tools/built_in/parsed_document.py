@@ -0,0 +1,120 @@
+# This module defines the parsed-document model shared by the analysis tools.
+# A source text is segmented into sentences and word tokens once; the
+# character offsets are kept in compact unsigned-int arrays, and parsed
+# documents are cached by content hash because corpus documents recur across
+# queries. The summarizer picks sentences by (source, sentence) index and the
+# extractor classifies those same sentences without re-tokenizing them.
+
+import hashlib
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+(?:'[a-z]+)?")
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+def content_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ParsedDocument:
+    """
+    Sentence and token offsets of one text. sent_bounds and token_bounds hold
+    flattened (start, end) character offsets; sent_tokens[i] is the index of
+    sentence i's first token, with a final entry equal to the token count.
+    """
+
+    __slots__ = ("text", "digest", "sent_bounds", "token_bounds", "sent_tokens")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.digest = content_digest(text)
+        self.sent_bounds = array("I")
+        self.token_bounds = array("I")
+        self.sent_tokens = array("I")
+
+        start = 0
+        for boundary in list(SENTENCE_BOUNDARY.finditer(text)) + [None]:
+            end = boundary.start() if boundary is not None else len(text)
+            chunk = text[start:end]
+            stripped = chunk.strip()
+            if stripped:
+                sent_start = start + (len(chunk) - len(chunk.lstrip()))
+                self.sent_bounds.extend((sent_start, sent_start + len(stripped)))
+                self.sent_tokens.append(len(self.token_bounds) // 2)
+                for word in WORD_PATTERN.finditer(text, sent_start, sent_start + len(stripped)):
+                    self.token_bounds.extend(word.span())
+            if boundary is not None:
+                start = boundary.end()
+        self.sent_tokens.append(len(self.token_bounds) // 2)
+
+    def __len__(self) -> int:
+        return len(self.sent_bounds) // 2
+
+    def sentence(self, i: int) -> str:
+        return self.text[self.sent_bounds[2 * i] : self.sent_bounds[2 * i + 1]]
+
+    def sentences(self) -> List[str]:
+        return [self.sentence(i) for i in range(len(self))]
+
+    def words(self, i: int) -> List[str]:
+        # This method returns the word tokens of sentence i.
+        bounds = self.token_bounds
+        return [self.text[bounds[2 * t] : bounds[2 * t + 1]] for t in range(self.sent_tokens[i], self.sent_tokens[i + 1])]
+
+
+class ParseCache:
+    """Bounded LRU of ParsedDocuments keyed by content digest."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def parse(self, text: str) -> ParsedDocument:
+        digest = content_digest(text)
+        with self._lock:
+            parsed = self._entries.get(digest)
+            if parsed is not None:
+                self._entries.move_to_end(digest)
+                self._stats["hits"] += 1
+                return parsed
+            self._stats["misses"] += 1
+        parsed = ParsedDocument(text)
+        with self._lock:
+            self._entries[digest] = parsed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return parsed
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+_PARSE_CACHE: Optional[ParseCache] = None
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    global _PARSE_CACHE
+    if _PARSE_CACHE is None:
+        with _PARSE_CACHE_LOCK:
+            if _PARSE_CACHE is None:
+                _PARSE_CACHE = ParseCache(int(os.environ.get("PARSE_CACHE_SIZE", "4096")))
+    return _PARSE_CACHE
+
+
+def parse_documents(documents: List[Dict[str, str]]) -> List[ParsedDocument]:
+    """Parse the content of each source; index i of the result is source i."""
+    cache = get_parse_cache()
+    return [cache.parse(doc.get("content", "") or "") for doc in documents]
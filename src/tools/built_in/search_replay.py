@@ -0,0 +1,211 @@
+# This module provides record/replay support for web search.
+# In record mode (SEARCH_RECORD=<cassette.json>) every live DuckDuckGo
+# response is saved to a cassette file. ReplayServer serves a cassette over
+# a small local HTTP API with injected latency and errors; pointing
+# DDG_ENDPOINT at it sends the DuckDuckGo search path there instead of the
+# internet, so the pipeline can be benchmarked offline and reproducibly.
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional
+
+from utils.logger import log_info
+
+RawResult = Dict[str, Optional[str]]
+
+
+def cassette_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class Cassette:
+    """A JSON file of recorded raw DuckDuckGo results, keyed by query."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[RawResult]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f).get("entries", {})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, query: str, max_results: int) -> Optional[List[RawResult]]:
+        # This method returns the recorded results for a query, or None.
+        with self._lock:
+            results = self._entries.get(cassette_key(query))
+        return None if results is None else results[:max_results]
+
+    def record(self, query: str, results: List[RawResult]) -> None:
+        # This method stores a response, keeping the longest one per query,
+        # and rewrites the cassette file.
+        key = cassette_key(query)
+        with self._lock:
+            if len(results) < len(self._entries.get(key, [])):
+                return
+            self._entries[key] = list(results)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": self._entries}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+_RECORDER: Optional[Cassette] = None
+_RECORDER_LOCK = threading.Lock()
+
+
+def record_search(query: str, results: List[RawResult]) -> None:
+    """Append a live response to the SEARCH_RECORD cassette, if recording."""
+    global _RECORDER
+    path = os.environ.get("SEARCH_RECORD")
+    if not path:
+        return
+    with _RECORDER_LOCK:
+        if _RECORDER is None or _RECORDER.path != path:
+            _RECORDER = Cassette(path)
+    _RECORDER.record(query, results)
+
+
+def _search_url(endpoint: str, query: str, max_results: int) -> str:
+    params = urllib.parse.urlencode({"q": query, "max_results": max_results})
+    return f"{endpoint.rstrip('/')}/search?{params}"
+
+
+def fetch_endpoint_results(endpoint: str, query: str, max_results: int, timeout: float = 10.0) -> List[RawResult]:
+    """Query a stand-in search endpoint; raises on HTTP and network errors."""
+    with urllib.request.urlopen(_search_url(endpoint, query, max_results), timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))["results"]
+
+
+async def fetch_endpoint_results_async(
+    endpoint: str, query: str, max_results: int, timeout: float = 10.0
+) -> List[RawResult]:
+    """
+    fetch_endpoint_results on the event loop: a plain-HTTP GET over an
+    asyncio stream, so waiting requests hold no thread. https endpoints
+    use the threaded client.
+    """
+    url = urllib.parse.urlsplit(_search_url(endpoint, query, max_results))
+    if url.scheme != "http":
+        return await asyncio.to_thread(fetch_endpoint_results, endpoint, query, max_results, timeout)
+
+    async def get() -> bytes:
+        reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        try:
+            writer.write(
+                f"GET {url.path}?{url.query} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: close\r\n\r\n".encode("ascii")
+            )
+            await writer.drain()
+            return await reader.read()
+        finally:
+            writer.close()
+
+    response = await asyncio.wait_for(get(), timeout)
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    if status != 200:
+        raise urllib.error.HTTPError(urllib.parse.urlunsplit(url), status, head.decode("latin-1"), None, None)
+    return json.loads(body.decode("utf-8"))["results"]
+
+
+class ReplayServer:
+    """
+    Local HTTP stand-in for DuckDuckGo serving a cassette.
+    GET /search?q=...&max_results=N returns {"results": [...]}; each request
+    first sleeps latency +/- jitter seconds and fails with HTTP 503 with
+    probability error_rate. Unrecorded queries return an empty list.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "misses": 0}
+        # http.server is imported here so that search paths which only
+        # record or fetch do not pay for it at startup.
+        from http.server import ThreadingHTTPServer
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self) -> tuple:
+        # This method picks a delay and an error decision for one request.
+        with self._rng_lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            return delay, self._rng.random() < self.error_rate
+
+    def _make_handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                url = urllib.parse.urlparse(self.path)
+                if url.path != "/search":
+                    self.send_error(404)
+                    return
+                params = urllib.parse.parse_qs(url.query)
+                query = params.get("q", [""])[0]
+                max_results = int(params.get("max_results", ["10"])[0])
+
+                delay, fail = server._draw()
+                server.stats["requests"] += 1
+                time.sleep(delay)
+                if fail:
+                    server.stats["errors"] += 1
+                    self.send_error(503, "Injected error")
+                    return
+                results = server.cassette.lookup(query, max_results)
+                if results is None:
+                    server.stats["misses"] += 1
+                body = json.dumps({"results": results or []}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        log_info(f"Replay server: serving {len(self.cassette)} queries at {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,144 @@
+# This module summarizes documents that arrive as streams.
+# Full page bodies can be large, so content is read chunk by chunk from a
+# string, a file-like object or any iterable of strings; sentences are
+# segmented on the fly and only a bounded heap of the best candidates is
+# kept. Reading stops as soon as the summary budget cannot improve, so peak
+# memory is proportional to the summary, not to the documents.
+
+import heapq
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from tools.built_in.bm25_index import tokenize
+from tools.built_in.parsed_document import SENTENCE_BOUNDARY
+
+StreamSource = Union[str, Iterable[str]]
+
+CHUNK_SIZE = 8192
+# Longer "sentences" (tables, unpunctuated text) are cut at this length.
+MAX_SENTENCE_CHARS = 2000
+
+
+def iter_chunks(source: StreamSource, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    # This function yields the text of a string, file-like object or iterable.
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+def iter_sentences(chunks: Iterable[str], max_chars: int = MAX_SENTENCE_CHARS) -> Iterator[str]:
+    """
+    Segment a stream of text chunks into sentences with the same boundary
+    rule as ParsedDocument. Only the current, unfinished sentence is buffered;
+    one longer than max_chars is yielded truncated and the rest is skipped.
+    """
+    buffer = ""
+    skipping = False
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(buffer):
+            sentence = buffer[start : boundary.start()].strip()
+            if sentence and not skipping:
+                yield sentence
+            skipping = False
+            start = boundary.end()
+        buffer = buffer[start:]
+        if len(buffer) > max_chars:
+            if not skipping:
+                yield buffer[:max_chars].strip()
+                skipping = True
+            # The last character is kept so a boundary right after it is seen.
+            buffer = buffer[-1:]
+    sentence = buffer.strip()
+    if sentence and not skipping:
+        yield sentence
+
+
+def is_streamed(documents: Iterable[object]) -> bool:
+    # This function reports whether any document (or its "content") is a
+    # file-like object or iterator rather than an in-memory string.
+    for document in documents:
+        content = document.get("content", "") if isinstance(document, dict) else document
+        if content is not None and not isinstance(content, str):
+            return True
+    return False
+
+
+def select_stream_sentences(
+    sources: Iterable[Union[StreamSource, Dict[str, StreamSource]]],
+    max_sentences: int = 4,
+    query: str = "",
+    per_source: int = 2,
+) -> List[Tuple[int, int, str]]:
+    """
+    Pick summary sentences from streamed sources (or dicts whose "content"
+    is a stream) as (source index, sentence index, sentence), in order.
+    Without a query these are the lead sentences: the first per_source of
+    each source, up to max_sentences. With a query, sentences are ranked by
+    the share of query terms they contain, earlier sentences winning ties,
+    and reading stops once max_sentences sentences cover the whole query.
+    """
+    query_terms = set(tokenize(query))
+    # Min-heap of (score, -order, source, index, sentence); the root is the
+    # weakest candidate and is the one replaced.
+    heap: List[Tuple[float, int, int, int, str]] = []
+    lead: List[Tuple[int, int, str]] = []
+    order = 0
+    for source_index, source in enumerate(sources):
+        if isinstance(source, dict):
+            source = source.get("content", "") or ""
+        for i, sentence in enumerate(iter_sentences(iter_chunks(source))):
+            if len(lead) < max_sentences and i < per_source:
+                lead.append((source_index, i, sentence))
+            if not query_terms:
+                if i + 1 >= per_source or len(lead) >= max_sentences:
+                    break
+                continue
+            score = len(query_terms.intersection(tokenize(sentence))) / len(query_terms)
+            order += 1
+            if score > 0:
+                entry = (score, -order, source_index, i, sentence)
+                if len(heap) < max_sentences:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+            if len(heap) >= max_sentences and heap[0][0] >= 1.0:
+                break
+        if not query_terms and len(lead) >= max_sentences:
+            break
+        if query_terms and len(heap) >= max_sentences and heap[0][0] >= 1.0:
+            break
+
+    return sorted((s, i, sentence) for _, _, s, i, sentence in heap) if heap else lead
+
+
+def join_summary(picks: List[Tuple[int, int, str]]) -> str:
+    if not picks:
+        return "No relevant documents were found to summarize."
+    summary = " ".join(sentence for _, _, sentence in picks)
+    if not summary.endswith((".", "!", "?")):
+        summary += "."
+    return summary
+
+
+def summarize_stream(
+    sources: Iterable[Union[StreamSource, Dict[str, StreamSource]]],
+    max_sentences: int = 4,
+    query: str = "",
+    per_source: int = 2,
+) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Summarize streamed sources (see select_stream_sentences). Returns the
+    summary and the (source index, sentence index) picks.
+    """
+    picks = select_stream_sentences(sources, max_sentences, query, per_source)
+    return join_summary(picks), [(s, i) for s, i, _ in picks]
+
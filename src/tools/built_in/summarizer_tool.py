@@ -1,26 +1,69 @@
 # This module provides a simple summarization tool.
 # It compresses a list of documents into a short textual summary.
 
-from typing import List, Dict
+import os
+from typing import List, Dict, Optional, Tuple
 
+from tools.built_in.parsed_document import ParsedDocument, parse_documents
+from tools.built_in.stream_summary import is_streamed, summarize_stream
+from utils.tool_cache import cached_tool
 
-def summarize_documents(documents: List[Dict[str, str]], max_sentences: int = 4) -> str:
+# Summaries are a deterministic function of the documents.
+SUMMARY_CACHE_TTL = 7 * 24 * 3600
+
+
+def summarize_documents(
+    documents: List[Dict[str, object]], max_sentences: int = 4, query: str = "", mode: Optional[str] = None
+) -> str:
     # This function summarizes multiple documents by joining key sentences.
-    # For simplicity, we just take the first couple of sentences from each document.
-    if not documents:
-        return "No relevant documents were found to summarize."
-
-    sentences: List[str] = []
-    for doc in documents:
-        content = doc.get("content", "")
-        # Naive sentence splitting on period.
-        raw_sentences = [s.strip() for s in content.split(".") if s.strip()]
+    # Documents whose content is a file-like object or iterator are read
+    # incrementally by the streaming summarizer (and not cached).
+    if is_streamed(documents):
+        summary, _ = summarize_stream(documents, max_sentences, query=query)
+        return summary
+    return _summarize_texts(documents, max_sentences, query, mode or get_summary_mode())
+
+
+@cached_tool("summarize_documents", ttl=SUMMARY_CACHE_TTL)
+def _summarize_texts(documents: List[Dict[str, str]], max_sentences: int, query: str, mode: str) -> str:
+    if mode == "stream":
+        summary, _ = summarize_stream(documents, max_sentences, query=query)
+    else:
+        summary, _ = summarize_parsed(parse_documents(documents), max_sentences, query=query, mode=mode)
+    return summary
+
+
+def get_summary_mode() -> str:
+    # "lead" takes the first sentences of each document; "extractive" ranks
+    # every sentence by TF-IDF relevance to the query and centrality;
+    # "stream" reads each document incrementally and stops early.
+    return os.environ.get("SUMMARY_MODE", "lead").lower()
+
+
+def summarize_parsed(
+    parsed: List[ParsedDocument], max_sentences: int = 4, query: str = "", mode: Optional[str] = None
+) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Summarize already-parsed sources. Returns the summary and the
+    (source index, sentence index) of every sentence it contains.
+    """
+    if not parsed:
+        return "No relevant documents were found to summarize.", []
+
+    picked: List[Tuple[int, int]] = []
+    if (mode or get_summary_mode()) == "extractive":
+        # Imported here so that the lead mode never loads NumPy.
+        from tools.built_in.extractive_summary import NUMPY_AVAILABLE, select_sentences
+
+        if NUMPY_AVAILABLE:
+            picked = select_sentences(parsed, query, max_sentences)
+    if not picked:
         # Take up to 2 sentences from each document.
-        sentences.extend(raw_sentences[:2])
+        picked = [(source, i) for source, doc in enumerate(parsed) for i in range(min(len(doc), 2))]
 
-    # Truncate to the global limit of sentences in the final summary.
-    sentences = sentences[:max_sentences]
-    summary = ". ".join(sentences)
-    if not summary.endswith("."):
+        # Truncate to the global limit of sentences in the final summary.
+        picked = picked[:max_sentences]
+    summary = " ".join(parsed[source].sentence(i) for source, i in picked)
+    if not summary.endswith((".", "!", "?")):
         summary += "."
-    return summary
+    return summary, picked
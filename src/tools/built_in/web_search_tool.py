@@ -1,16 +1,32 @@
-from typing import List, Dict
+import importlib.util
+import os
+import threading
+from typing import List, Dict, Optional
 from utils.logger import log_info, log_error
+from tools.built_in.bm25_index import BM25Index
+from utils.tool_cache import cached_tool
+from utils.resilience import CircuitBreaker, TokenBucket
+from tools.built_in.search_replay import fetch_endpoint_results, record_search
 
-# Try to import DuckDuckGo, fallback to corpus
-try:
-    from duckduckgo_search import DDGS
-    DDGS_AVAILABLE = True
+# Check for DuckDuckGo without importing it (the client pulls in curl_cffi
+# and lxml); it is imported on the first web search. Fallback is the corpus.
+DDGS_AVAILABLE = importlib.util.find_spec("duckduckgo_search") is not None
+if DDGS_AVAILABLE:
     log_info("DuckDuckGo search available")
-except ImportError:
-    DDGS_AVAILABLE = False
+else:
     log_error("DuckDuckGo not installed. Using fallback corpus search.")
 
 
+def get_ddg_endpoint() -> str:
+    # DDG_ENDPOINT points DuckDuckGo searches at a stand-in server
+    # (see search_replay.ReplayServer) instead of duckduckgo.com.
+    return os.environ.get("DDG_ENDPOINT", "")
+
+
+def ddg_enabled() -> bool:
+    return DDGS_AVAILABLE or bool(get_ddg_endpoint())
+
+
 # Keep the original corpus for fallback
 CORPUS: List[Dict[str, str]] = [
     {
@@ -43,28 +59,178 @@ CORPUS: List[Dict[str, str]] = [
     },
 ]
 
+# Lexical and dense indexes over CORPUS. Use add_corpus_document /
+# remove_corpus_document to change the fallback corpus at runtime (not
+# possible while a corpus store is loaded; re-ingest it instead). The dense
+# index (and numpy) is only loaded by the first dense or hybrid search.
+CORPUS_INDEX = BM25Index.from_documents(CORPUS)
+CORPUS_DENSE_INDEX = None
+_DENSE_INDEX_BUILT = False
+_CORPUS_LOCK = threading.RLock()
+
+# Optional on-disk corpus: a corpus file (see corpus_store) or an ingested
+# corpus directory (see corpus_ingest). When loaded, corpus searches use it
+# instead of the in-memory CORPUS_INDEX.
+CORPUS_STORE = None
+
+# The dense index is held in RAM, so it is only built for corpus stores of
+# at most DENSE_CORPUS_MAX_DOCS documents; larger ones use BM25 only.
+DENSE_CORPUS_MAX_DOCS = int(os.environ.get("DENSE_CORPUS_MAX_DOCS", "100000"))
+
+# Backends accepted by web_search: "auto" (DuckDuckGo, then corpus),
+# "duckduckgo", "corpus" (BM25), "dense" and "hybrid" (BM25 + dense fusion).
+SEARCH_BACKENDS = ("auto", "duckduckgo", "corpus", "dense", "hybrid")
+DEFAULT_SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "auto")
+
+
+def load_corpus_file(path: str):
+    """
+    Memory-map a corpus file or directory and use it for corpus searches.
+    When the default backend is dense or hybrid, the dense index is built
+    here rather than by the first search.
+    """
+    global CORPUS_STORE, CORPUS_DENSE_INDEX, _DENSE_INDEX_BUILT
+    from tools.built_in.corpus_ingest import open_corpus
+
+    with _CORPUS_LOCK:
+        CORPUS_STORE = open_corpus(path)
+        # The dense index covers whichever corpus is active.
+        CORPUS_DENSE_INDEX = None
+        _DENSE_INDEX_BUILT = False
+    log_info(f"Corpus file loaded from {path} ({len(CORPUS_STORE)} documents)")
+    if DEFAULT_SEARCH_BACKEND in ("dense", "hybrid"):
+        get_corpus_dense_index()
+    return CORPUS_STORE
+
+# Live DuckDuckGo results go stale quickly; keep them for a few minutes only.
+WEB_SEARCH_CACHE_TTL = 10 * 60
+
+# Process-wide guards around DuckDuckGo. While the breaker is open, searches
+# go straight to the corpus instead of paying for calls that will fail; the
+# token bucket keeps us under the provider's rate limit.
+DDG_BREAKER = CircuitBreaker(
+    "duckduckgo",
+    failure_threshold=int(os.environ.get("DDG_BREAKER_FAILURES", "5")),
+    window=float(os.environ.get("DDG_BREAKER_WINDOW", "60")),
+    reset_timeout=float(os.environ.get("DDG_BREAKER_RESET", "30")),
+)
+DDG_RATE_LIMITER = TokenBucket(
+    rate=float(os.environ.get("DDG_RATE_LIMIT", "1.0")),
+    capacity=float(os.environ.get("DDG_RATE_BURST", "3")),
+)
+# Seconds a search may wait for a rate-limit token before using the corpus.
+DDG_RATE_WAIT = float(os.environ.get("DDG_RATE_WAIT", "1.0"))
+
+
+def get_corpus_dense_index():
+    """
+    Return the dense index over the active corpus (the loaded corpus store,
+    else CORPUS), building it on first use; None without numpy or when the
+    corpus store exceeds DENSE_CORPUS_MAX_DOCS.
+    """
+    global CORPUS_DENSE_INDEX, _DENSE_INDEX_BUILT
+    if not _DENSE_INDEX_BUILT:
+        with _CORPUS_LOCK:
+            if not _DENSE_INDEX_BUILT:
+                from tools.built_in.dense_index import DenseIndex, NUMPY_AVAILABLE
+
+                if CORPUS_STORE is not None and len(CORPUS_STORE) > DENSE_CORPUS_MAX_DOCS:
+                    log_error(
+                        f"Corpus store has {len(CORPUS_STORE)} documents, more than DENSE_CORPUS_MAX_DOCS="
+                        f"{DENSE_CORPUS_MAX_DOCS}; dense search disabled, using BM25 only."
+                    )
+                elif NUMPY_AVAILABLE:
+                    index = DenseIndex()
+                    if CORPUS_STORE is not None:
+                        # Corpus files yield (id, doc) pairs, corpus directories docs.
+                        for item in CORPUS_STORE.iter_documents():
+                            index.add_document(item[1] if isinstance(item, tuple) else item)
+                    else:
+                        for doc_id, doc in CORPUS_INDEX.documents():
+                            index.add_document(doc, doc_id=doc_id)
+                    CORPUS_DENSE_INDEX = index
+                _DENSE_INDEX_BUILT = True
+    return CORPUS_DENSE_INDEX
+
+
+def _check_corpus_writable() -> None:
+    # Searches read a loaded corpus store, which is immutable, so changes to
+    # the in-memory indexes would never be seen.
+    if CORPUS_STORE is not None:
+        raise RuntimeError("A corpus store is loaded; update it with corpus ingestion instead")
+
+
+def add_corpus_document(doc: Dict[str, str]) -> int:
+    """Add a document to every local corpus index under one shared id."""
+    with _CORPUS_LOCK:
+        _check_corpus_writable()
+        doc_id = CORPUS_INDEX.add_document(doc)
+        if CORPUS_DENSE_INDEX is not None:
+            CORPUS_DENSE_INDEX.add_document(doc, doc_id=doc_id)
+    return doc_id
+
+
+def remove_corpus_document(doc_id: int) -> bool:
+    """Remove a document from every local corpus index."""
+    with _CORPUS_LOCK:
+        _check_corpus_writable()
+        removed = CORPUS_INDEX.remove_document(doc_id)
+        if CORPUS_DENSE_INDEX is not None:
+            CORPUS_DENSE_INDEX.remove_document(doc_id)
+    return removed
+
+
+if os.environ.get("CORPUS_PATH"):
+    load_corpus_file(os.environ["CORPUS_PATH"])
+
+
+def format_ddg_results(results: List[Dict[str, Optional[str]]]) -> List[Dict[str, str]]:
+    """Format raw DuckDuckGo results to match our schema."""
+    return [
+        {
+            "title": r.get("title") or "Untitled",
+            "content": r.get("body") or "No content available.",
+            "url": r.get("href") or "",
+        }
+        for r in results
+    ]
+
+
+def get_search_guard_stats() -> Dict[str, Dict]:
+    """Circuit breaker and rate limiter counters for DuckDuckGo."""
+    return {"breaker": DDG_BREAKER.get_stats(), "rate_limiter": DDG_RATE_LIMITER.get_stats()}
+
 
 def web_search_duckduckgo(query: str, top_k: int = 3) -> List[Dict[str, str]]:
     """Search using DuckDuckGo (real web search)."""
+    if not DDG_BREAKER.allow():
+        log_info("DuckDuckGo: circuit open, skipping web search")
+        return []
+    if not DDG_RATE_LIMITER.acquire(DDG_RATE_WAIT):
+        log_info("DuckDuckGo: rate limit reached, skipping web search")
+        return []
+
     try:
         log_info(f"DuckDuckGo: searching for '{query}'")
         
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=top_k))
+        endpoint = get_ddg_endpoint()
+        if endpoint:
+            results = fetch_endpoint_results(endpoint, query, top_k)
+        else:
+            from duckduckgo_search import DDGS
+
+            with DDGS() as ddgs:
+                results = list(ddgs.text(query, max_results=top_k))
+            record_search(query, results)
         
-        # Format results to match our schema
-        formatted_results = []
-        for r in results:
-            formatted_results.append({
-                "title": r.get("title", "Untitled"),
-                "content": r.get("body", "No content available."),
-                "url": r.get("href", "")
-            })
+        formatted_results = format_ddg_results(results)
+        DDG_BREAKER.record_success()
         
         log_info(f"DuckDuckGo: found {len(formatted_results)} results")
         return formatted_results
     
     except Exception as e:
+        DDG_BREAKER.record_failure()
         log_error(f"DuckDuckGo search failed: {e}")
         return []
 
@@ -77,26 +243,88 @@ def simple_keyword_score(query: str, text: str) -> int:
 
 
 def web_search_corpus(query: str, top_k: int = 3) -> List[Dict[str, str]]:
-    """Fallback: search in local corpus."""
+    """Fallback: search in local corpus using the BM25 inverted index."""
     log_info(f"Corpus search: searching for '{query}'")
-    scored_docs = []
-    for doc in CORPUS:
-        score = simple_keyword_score(query, doc["content"] + " " + doc["title"])
-        scored_docs.append((score, doc))
-    
-    scored_docs.sort(key=lambda x: x[0], reverse=True)
-    results = [doc for score, doc in scored_docs if score > 0][:top_k]
+    index = CORPUS_STORE if CORPUS_STORE is not None else CORPUS_INDEX
+    results = [doc for score, doc in index.search(query, top_k=top_k)]
     log_info(f"Corpus search: found {len(results)} documents")
     return results
 
 
-def web_search(query: str, top_k: int = 3, use_real_search: bool = True) -> List[Dict[str, str]]:
+def web_search_dense(query: str, top_k: int = 3) -> List[Dict[str, str]]:
+    """Offline dense retrieval over the local corpus (hashed TF-IDF vectors)."""
+    index = get_corpus_dense_index()
+    if index is None:
+        log_error("Dense search unavailable (numpy missing or corpus too large). Using corpus search.")
+        return web_search_corpus(query, top_k)
+    log_info(f"Dense search: searching for '{query}'")
+    results = [doc for score, doc in index.search(query, top_k=top_k)]
+    log_info(f"Dense search: found {len(results)} documents")
+    return results
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Dict[str, str]]], top_k: int = 3, k: int = 60
+) -> List[Dict[str, str]]:
+    """Merge ranked result lists; documents are identified by url, else title."""
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Dict[str, str]] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc.get("url") or doc.get("title", "")
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+            docs.setdefault(key, doc)
+    ordered = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [docs[key] for key in ordered[:top_k]]
+
+
+def web_search_hybrid(query: str, top_k: int = 3) -> List[Dict[str, str]]:
+    """Fuse BM25 and dense rankings over the local corpus."""
+    # Each ranker contributes a deeper list than top_k so fusion has room to reorder.
+    depth = top_k * 3
+    lexical = web_search_corpus(query, depth)
+    dense = web_search_dense(query, depth) if get_corpus_dense_index() is not None else []
+    return reciprocal_rank_fusion([lexical, dense], top_k=top_k)
+
+
+def web_search(
+    query: str,
+    top_k: int = 3,
+    use_real_search: bool = True,
+    backend: Optional[str] = None,
+) -> List[Dict[str, str]]:
     """
     Main web search function.
-    Tries DuckDuckGo first, falls back to corpus if unavailable or fails.
+    With the default "auto" backend, tries DuckDuckGo first and falls back
+    to corpus if unavailable or fails. See SEARCH_BACKENDS for the others.
     """
-    if use_real_search and DDGS_AVAILABLE:
-        results = web_search_duckduckgo(query, top_k)
+    backend = backend or DEFAULT_SEARCH_BACKEND
+    if backend not in SEARCH_BACKENDS:
+        log_error(f"Unknown search backend '{backend}'. Using 'auto'.")
+        backend = "auto"
+    return _web_search(query, top_k, use_real_search, backend)
+
+
+# Only non-empty DuckDuckGo answers are cached. An empty list also stands for
+# a failure, an open breaker or a rate-limit rejection, and corpus fallbacks
+# are local and cheap, so neither is replayed once DuckDuckGo is back.
+@cached_tool("web_search", ttl=WEB_SEARCH_CACHE_TTL, cache_if=bool)
+def _web_search_live(query: str, top_k: int) -> List[Dict[str, str]]:
+    return web_search_duckduckgo(query, top_k)
+
+
+def _web_search(query: str, top_k: int, use_real_search: bool, backend: str) -> List[Dict[str, str]]:
+    if backend == "corpus":
+        return web_search_corpus(query, top_k)
+    if backend == "dense":
+        return web_search_dense(query, top_k)
+    if backend == "hybrid":
+        return web_search_hybrid(query, top_k)
+    if backend == "duckduckgo":
+        return _web_search_live(query, top_k) if ddg_enabled() else []
+
+    if use_real_search and ddg_enabled():
+        results = _web_search_live(query, top_k)
         if results:  # If we got results, return them
             return results
         else:
@@ -1,2 +1,9 @@
 # Initializes custom tools package.
-from .claim_evidence_extractor import extract_claims_and_evidence
+
+from utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "extract_claims_and_evidence": ".claim_evidence_extractor",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,18 +1,192 @@
-from typing import Dict, List
-import spacy
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
 from utils.logger import log_info, log_error
+from utils.micro_batcher import MicroBatcher
+from tools.custom.nlp_service import get_nlp_address, get_nlp_client
+from tools.custom.rule_classifier import CITATION_WORDS, classify_sentence, split_sentences
+from tools.built_in.parsed_document import ParsedDocument
+from utils.tool_cache import cached_tool, get_tool_cache, make_cache_key
 
-# Load spaCy model (do this once at module level)
-try:
-    nlp = spacy.load("en_core_web_sm")
-    SPACY_AVAILABLE = True
-    log_info("SpaCy model loaded successfully")
-except Exception as e:
-    log_error(f"SpaCy not available: {e}. Falling back to keyword-based extraction.")
-    SPACY_AVAILABLE = False
+# Extraction is a deterministic function of the text, the mode and the
+# backend. Only spaCy results are cached; keyword-fallback output (spaCy or
+# its model missing, or the service down) is recomputed on every call.
+EXTRACTION_CACHE_TTL = 7 * 24 * 3600
 
+# The spaCy model is loaded once, on first local use, so processes that
+# send extraction to the NLP service (NLP_SERVICE_ADDRESS) never import it.
+# Only the components the classifier reads are loaded: sentence splits,
+# dependencies (parser), POS tags (tok2vec, tagger, attribute_ruler) and the
+# root lemma (lemmatizer). Named entities are never used.
+SPACY_EXCLUDE = ["ner"]
+_NLP = None
+_NLP_LOADED = False
+_NLP_LOCK = threading.Lock()
 
-def extract_claims_and_evidence_advanced(text: str) -> Dict[str, object]:
+
+def get_nlp():
+    """Return the shared spaCy pipeline, or None if spaCy is unavailable."""
+    global _NLP, _NLP_LOADED
+    if not _NLP_LOADED:
+        with _NLP_LOCK:
+            if not _NLP_LOADED:
+                try:
+                    import spacy
+
+                    _NLP = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDE)
+                    log_info("SpaCy model loaded successfully")
+                except Exception as e:
+                    log_error(f"SpaCy not available: {e}. Falling back to keyword-based extraction.")
+                _NLP_LOADED = True
+    return _NLP
+
+
+# Claim indicators: root verb is assertive
+ASSERTIVE_VERBS = {"is", "are", "was", "were", "can", "will", "should",
+                   "must", "demonstrates", "shows", "indicates", "suggests"}
+
+# Batch settings for nlp.pipe; NLP_N_PROCESS > 1 parses in worker processes.
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", "64"))
+NLP_N_PROCESS = int(os.environ.get("NLP_N_PROCESS", "1"))
+
+# EXTRACTION_MODE=tiered classifies sentences with rules first and parses
+# only those below EXTRACTION_TIER_THRESHOLD certainty; "full" parses all.
+EXTRACTION_MODE = os.environ.get("EXTRACTION_MODE", "tiered")
+EXTRACTION_TIER_THRESHOLD = float(os.environ.get("EXTRACTION_TIER_THRESHOLD", "0.8"))
+
+_TIER_STATS = {"sentences": 0, "rule_decided": 0, "escalated": 0}
+_TIER_STATS_LOCK = threading.Lock()
+
+
+def _classify_sentence(sent) -> Optional[str]:
+    """Classify one spaCy sentence span as "claim", "evidence" or None."""
+    if len(sent.text.strip()) < 10:  # Skip very short sentences
+        return None
+
+    # Extract root verb and check for assertive patterns
+    root = sent.root
+    is_claim = False
+    is_evidence = False
+
+    if root.lemma_ in ASSERTIVE_VERBS or root.pos_ == "VERB":
+        # Check for modal verbs (claims)
+        has_modal = any(token.pos_ == "AUX" for token in sent)
+        has_subject = any(token.dep_ in ["nsubj", "nsubjpass"] for token in sent)
+
+        if has_modal or has_subject:
+            is_claim = True
+
+    # Evidence indicators: contains numbers, citations, or references
+    has_numbers = any(token.like_num or token.pos_ == "NUM" for token in sent)
+    has_citation = any(token.text.lower() in CITATION_WORDS for token in sent)
+
+    if has_numbers or has_citation:
+        is_evidence = True
+
+    # Categorize: evidence wins when a sentence is both
+    if is_evidence:
+        return "evidence"
+    return "claim" if is_claim else None
+
+
+def _build_result(labelled: List[Tuple[Optional[str], str]]) -> Dict[str, object]:
+    # This function turns (label, sentence) pairs into the extractor's
+    # output; unlabelled sentences still count towards the total.
+    claims = [text for label, text in labelled if label == "claim"]
+    evidence = [text for label, text in labelled if label == "evidence"]
+    total_sents = len(labelled)
+
+    # Calculate confidence based on extraction quality
+    classified = len(claims) + len(evidence)
+    confidence = min(classified / total_sents if total_sents > 0 else 0.0, 1.0)
+
+    # Boost confidence if we found good distribution
+    if len(claims) > 0 and len(evidence) > 0:
+        confidence = min(confidence + 0.2, 1.0)
+
+    log_info(f"Advanced extraction: {len(claims)} claims, {len(evidence)} evidence, confidence={confidence:.2f}")
+
+    return {
+        "claims": claims,
+        "evidence": evidence,
+        "confidence": round(confidence, 2),
+        "backend": "spacy",
+    }
+
+
+def _label_doc(doc) -> List[Tuple[Optional[str], str]]:
+    return [(_classify_sentence(sent), sent.text.strip()) for sent in doc.sents]
+
+
+def _classify_doc(doc) -> Dict[str, object]:
+    """Classify the sentences of a parsed spaCy Doc in a single pass."""
+    return _build_result(_label_doc(doc))
+
+
+def _classify_tiered(nlp, texts: List[str], batch_size: int, n_process: int) -> List[Dict[str, object]]:
+    # This function decides confident sentences with the rule classifier and
+    # parses the rest of every text with a single nlp.pipe call.
+    plans: List[List[object]] = []
+    pending: List[str] = []
+    for text in texts:
+        plan: List[object] = []
+        for sentence in split_sentences(text):
+            label, certainty = classify_sentence(sentence)
+            if certainty >= EXTRACTION_TIER_THRESHOLD:
+                plan.append((label, sentence))
+            else:
+                plan.append(len(pending))
+                pending.append(sentence)
+        plans.append(plan)
+
+    docs = list(nlp.pipe(pending, batch_size=batch_size, n_process=n_process)) if pending else []
+    with _TIER_STATS_LOCK:
+        _TIER_STATS["sentences"] += sum(len(plan) for plan in plans)
+        _TIER_STATS["escalated"] += len(pending)
+        _TIER_STATS["rule_decided"] += sum(len(plan) for plan in plans) - len(pending)
+
+    results = []
+    for plan in plans:
+        labelled: List[Tuple[Optional[str], str]] = []
+        for step in plan:
+            if isinstance(step, int):
+                labelled.extend(_label_doc(docs[step]))
+            else:
+                labelled.append(step)
+        results.append(_build_result(labelled))
+    return results
+
+
+def extraction_backend() -> str:
+    # This function names where uncached extraction runs, for cache keys.
+    address = get_nlp_address()
+    return f"service:{address}" if address else "local"
+
+
+def parsed_by_spacy(result: Dict[str, object]) -> bool:
+    # Results of the keyword fallback (and of empty texts) are not cached.
+    return result.get("backend") == "spacy"
+
+
+def _extraction_key(text: str) -> str:
+    # This is the cache key of _extract_cached(text, ...) for the current settings.
+    return make_cache_key(
+        "extract_claims_and_evidence", (text, EXTRACTION_MODE, EXTRACTION_TIER_THRESHOLD, extraction_backend()), {}
+    )
+
+
+def get_extraction_stats() -> Dict[str, object]:
+    """Sentence counts of the tiered extractor and its escalation rate."""
+    with _TIER_STATS_LOCK:
+        sentences, escalated = _TIER_STATS["sentences"], _TIER_STATS["escalated"]
+        stats: Dict[str, object] = dict(_TIER_STATS)
+    stats["escalation_rate"] = round(escalated / sentences, 3) if sentences else 0.0
+    stats["mode"] = EXTRACTION_MODE
+    stats["threshold"] = EXTRACTION_TIER_THRESHOLD
+    return stats
+
+
+def extract_claims_and_evidence_advanced(text: str, mode: Optional[str] = None) -> Dict[str, object]:
     """
     Advanced claim and evidence extraction using spaCy NLP.
     Falls back to keyword-based if spaCy unavailable.
@@ -20,75 +194,209 @@ def extract_claims_and_evidence_advanced(text: str) -> Dict[str, object]:
     if not text or not isinstance(text, str):
         return {"claims": [], "evidence": [], "confidence": 0.0}
 
-    if not SPACY_AVAILABLE:
+    nlp = get_nlp()
+    if nlp is None:
         return extract_claims_and_evidence_fallback(text)
 
     try:
-        doc = nlp(text)
-        claims: List[str] = []
-        evidence: List[str] = []
-        
-        # Analyze each sentence
-        for sent in doc.sents:
-            sent_text = sent.text.strip()
-            if len(sent_text) < 10:  # Skip very short sentences
-                continue
-            
-            # Extract root verb and check for assertive patterns
-            root = sent.root
-            is_claim = False
-            is_evidence = False
-            
-            # Claim indicators: root verb is assertive
-            assertive_verbs = {"is", "are", "was", "were", "can", "will", "should", 
-                             "must", "demonstrates", "shows", "indicates", "suggests"}
-            
-            if root.lemma_ in assertive_verbs or root.pos_ == "VERB":
-                # Check for modal verbs (claims)
-                has_modal = any(token.pos_ == "AUX" for token in sent)
-                has_subject = any(token.dep_ in ["nsubj", "nsubjpass"] for token in sent)
-                
-                if has_modal or has_subject:
-                    is_claim = True
-            
-            # Evidence indicators: contains numbers, citations, or references
-            has_numbers = any(token.like_num or token.pos_ == "NUM" for token in sent)
-            has_citation = any(token.text.lower() in ["study", "research", "according", "found"] 
-                             for token in sent)
-            
-            if has_numbers or has_citation:
-                is_evidence = True
-            
-            # Categorize
-            if is_claim and not is_evidence:
-                claims.append(sent_text)
-            elif is_evidence:
-                evidence.append(sent_text)
-            elif is_claim:  # Both claim and evidence
-                claims.append(sent_text)
-        
-        # Calculate confidence based on extraction quality
-        total_sents = len(list(doc.sents))
-        classified = len(claims) + len(evidence)
-        confidence = min(classified / total_sents if total_sents > 0 else 0.0, 1.0)
-        
-        # Boost confidence if we found good distribution
-        if len(claims) > 0 and len(evidence) > 0:
-            confidence = min(confidence + 0.2, 1.0)
-        
-        log_info(f"Advanced extraction: {len(claims)} claims, {len(evidence)} evidence, confidence={confidence:.2f}")
-        
-        return {
-            "claims": claims,
-            "evidence": evidence,
-            "confidence": round(confidence, 2)
-        }
-    
+        if (mode or EXTRACTION_MODE) == "tiered":
+            return _classify_tiered(nlp, [text], NLP_BATCH_SIZE, 1)[0]
+        return _classify_doc(nlp(text))
     except Exception as e:
         log_error(f"Advanced extraction failed: {e}. Using fallback.")
         return extract_claims_and_evidence_fallback(text)
 
 
+def extract_local_batch(
+    texts: List[str], batch_size: Optional[int] = None, n_process: Optional[int] = None, mode: Optional[str] = None
+) -> List[Dict[str, object]]:
+    """
+    Parse all valid texts in this process with one nlp.pipe call and
+    return one result per input text, in order. mode overrides
+    EXTRACTION_MODE ("full" parses every sentence).
+    """
+    mode = mode or EXTRACTION_MODE
+    results: List[Dict[str, object]] = [{"claims": [], "evidence": [], "confidence": 0.0} for _ in texts]
+    valid = [i for i, t in enumerate(texts) if t and isinstance(t, str)]
+
+    nlp = get_nlp()
+    if nlp is None:
+        for i in valid:
+            results[i] = extract_claims_and_evidence_fallback(texts[i])
+        return results
+
+    batch_size = batch_size or NLP_BATCH_SIZE
+    n_process = n_process or NLP_N_PROCESS
+    try:
+        if mode == "tiered":
+            for i, result in zip(valid, _classify_tiered(nlp, [texts[i] for i in valid], batch_size, n_process)):
+                results[i] = result
+        else:
+            docs = nlp.pipe((texts[i] for i in valid), batch_size=batch_size, n_process=n_process)
+            for i, doc in zip(valid, docs):
+                results[i] = _classify_doc(doc)
+    except Exception as e:
+        log_error(f"Batched extraction failed: {e}. Extracting one text at a time.")
+        for i in valid:
+            results[i] = extract_claims_and_evidence_advanced(texts[i], mode)
+    return results
+
+
+def extract_claims_and_evidence_parsed(
+    parsed: List[ParsedDocument], picked: List[Tuple[int, int]]
+) -> Dict[str, object]:
+    """
+    Extract claims and evidence from sentences of parsed sources, given as
+    (source index, sentence index) pairs. Rule-certain sentences are decided
+    from their stored tokens; the rest are fully parsed, through the
+    micro-batcher when it is enabled and otherwise in one
+    _extract_uncached_batch call (NLP service or local spaCy). Besides the
+    usual fields, the result maps every claim and evidence sentence back to
+    its source index. It is cached only if no escalated sentence fell back
+    to keyword extraction.
+    """
+    cache = get_tool_cache()
+    key = make_cache_key(
+        "extract_claims_and_evidence_parsed",
+        (
+            [(source, parsed[source].digest, i) for source, i in picked],
+            EXTRACTION_MODE,
+            EXTRACTION_TIER_THRESHOLD,
+            extraction_backend(),
+        ),
+        {},
+    )
+    hit, cached = cache.get("extract_claims_and_evidence_parsed", key)
+    if hit:
+        return cached
+
+    # plan holds (label, sentence, source, index into pending or -1).
+    plan: List[Tuple[Optional[str], str, int, int]] = []
+    pending: List[str] = []
+    for source, i in picked:
+        sentence = parsed[source].sentence(i)
+        label, certainty = classify_sentence(sentence, parsed[source].words(i))
+        if EXTRACTION_MODE == "tiered" and certainty >= EXTRACTION_TIER_THRESHOLD:
+            plan.append((label, sentence, source, -1))
+        else:
+            plan.append((None, sentence, source, len(pending)))
+            pending.append(sentence)
+    # Escalated sentences are parsed in "full" mode so the rules are not
+    # applied (and counted) a second time.
+    with _TIER_STATS_LOCK:
+        _TIER_STATS["sentences"] += len(plan)
+        _TIER_STATS["escalated"] += len(pending)
+        _TIER_STATS["rule_decided"] += len(plan) - len(pending)
+
+    if not pending:
+        escalated: List[Dict[str, object]] = []
+    elif _BATCHER is not None:
+        escalated = _BATCHER.submit_many([(sentence, "full") for sentence in pending])
+    else:
+        escalated = _extract_uncached_batch(pending, mode="full")
+    labelled: List[Tuple[Optional[str], str, int]] = []
+    for label, sentence, source, index in plan:
+        if index < 0:
+            labelled.append((label, sentence, source))
+            continue
+        found = escalated[index]
+        labelled.extend(("claim", c, source) for c in found["claims"])
+        labelled.extend(("evidence", e, source) for e in found["evidence"])
+        if not found["claims"] and not found["evidence"]:
+            labelled.append((None, sentence, source))
+
+    result = _build_result([(label, text) for label, text, _ in labelled])
+    result["claim_sources"] = [source for label, _, source in labelled if label == "claim"]
+    result["evidence_sources"] = [source for label, _, source in labelled if label == "evidence"]
+    # "rules" means every sentence was decided without a parse.
+    if not all(parsed_by_spacy(found) for found in escalated):
+        result["backend"] = "keywords"
+    elif not pending:
+        result["backend"] = "rules"
+    if result["backend"] != "keywords":
+        cache.set("extract_claims_and_evidence_parsed", key, result, EXTRACTION_CACHE_TTL)
+    return result
+
+
+def _extract_uncached_batch(
+    texts: List[str], batch_size: Optional[int] = None, n_process: Optional[int] = None, mode: Optional[str] = None
+) -> List[Dict[str, object]]:
+    # This function sends the batch to the NLP service when one is
+    # configured, and extracts locally otherwise or if the service fails.
+    if get_nlp_address():
+        try:
+            return get_nlp_client().extract_batch(texts, mode)
+        except Exception as e:
+            log_error(f"NLP service unavailable: {e}. Extracting locally.")
+    return extract_local_batch(texts, batch_size, n_process, mode)
+
+
+def _extract_batched_items(items: List[Tuple[str, Optional[str]]]) -> List[Dict[str, object]]:
+    # This function runs one micro-batch of (text, mode) items with one
+    # extraction call per mode, returning results in item order.
+    results: List[Optional[Dict[str, object]]] = [None] * len(items)
+    by_mode: Dict[Optional[str], List[int]] = {}
+    for i, (_, mode) in enumerate(items):
+        by_mode.setdefault(mode, []).append(i)
+    for mode, indexes in by_mode.items():
+        for i, result in zip(indexes, _extract_uncached_batch([items[i][0] for i in indexes], mode=mode)):
+            results[i] = result
+    return results  # type: ignore[return-value]
+
+
+def extract_claims_and_evidence_batch(
+    texts: List[str], batch_size: Optional[int] = None, n_process: Optional[int] = None
+) -> List[Dict[str, object]]:
+    """
+    Extract claims and evidence from many texts with one nlp.pipe pass.
+    Results are returned in input order and share the per-text tool cache
+    with extract_claims_and_evidence.
+    """
+    cache = get_tool_cache()
+    results: List[Optional[Dict[str, object]]] = [None] * len(texts)
+    misses: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        hit, value = cache.get("extract_claims_and_evidence", _extraction_key(text))
+        if hit:
+            results[i] = value
+        else:
+            misses.setdefault(text, []).append(i)
+
+    unique = list(misses)
+    for text, result in zip(unique, _extract_uncached_batch(unique, batch_size, n_process)):
+        if parsed_by_spacy(result):
+            cache.set("extract_claims_and_evidence", _extraction_key(text), result, EXTRACTION_CACHE_TTL)
+        for i in misses[text]:
+            results[i] = result
+    return results  # type: ignore[return-value]
+
+
+# Micro-batching lets concurrent requests share one nlp.pipe call; it is
+# off by default and switched on by long-running servers (see api/main.py).
+# Queued items are (text, mode) pairs, mode None meaning EXTRACTION_MODE.
+_BATCHER: Optional[MicroBatcher] = None
+
+
+def enable_micro_batching(max_batch: Optional[int] = None, window_ms: Optional[float] = None) -> MicroBatcher:
+    """
+    Route extract_claims_and_evidence and the escalated sentences of
+    extract_claims_and_evidence_parsed through a shared micro-batching queue.
+    """
+    global _BATCHER
+    if _BATCHER is None:
+        _BATCHER = MicroBatcher(
+            _extract_batched_items,
+            max_batch=max_batch or NLP_BATCH_SIZE,
+            max_wait=(window_ms if window_ms is not None else float(os.environ.get("NLP_BATCH_WINDOW_MS", "5"))) / 1000.0,
+        )
+        log_info("Claim extraction micro-batching enabled")
+    return _BATCHER
+
+
+def get_batching_stats() -> Optional[Dict[str, object]]:
+    return _BATCHER.get_stats() if _BATCHER is not None else None
+
+
 def extract_claims_and_evidence_fallback(text: str) -> Dict[str, object]:
     """Fallback keyword-based extraction (original implementation)."""
     if not text or not isinstance(text, str):
@@ -109,7 +417,7 @@ def extract_claims_and_evidence_fallback(text: str) -> Dict[str, object]:
     classified = len(claims) + len(evidence)
     confidence = classified / total if total > 0 else 0.0
 
-    return {"claims": claims, "evidence": evidence, "confidence": round(confidence, 2)}
+    return {"claims": claims, "evidence": evidence, "confidence": round(confidence, 2), "backend": "keywords"}
 
 
 def extract_claims_and_evidence(text: str) -> Dict[str, object]:
@@ -117,4 +425,14 @@ def extract_claims_and_evidence(text: str) -> Dict[str, object]:
     Extract claims and evidence from text using advanced NLP.
     Automatically falls back to keyword-based if needed.
     """
-    return extract_claims_and_evidence_advanced(text)
\ No newline at end of file
+    return _extract_cached(text, EXTRACTION_MODE, EXTRACTION_TIER_THRESHOLD, extraction_backend())
+
+
+@cached_tool("extract_claims_and_evidence", ttl=EXTRACTION_CACHE_TTL, cache_if=parsed_by_spacy)
+def _extract_cached(text: str, mode: str, threshold: float, backend: str) -> Dict[str, object]:
+    # The threshold and backend only key the cache; see _extraction_key.
+    if _BATCHER is not None:
+        return _BATCHER.submit((text, mode))
+    if get_nlp_address():
+        return _extract_uncached_batch([text], mode=mode)[0]
+    return extract_claims_and_evidence_advanced(text, mode)
\ No newline at end of file
@@ -0,0 +1,252 @@
+# This module provides an out-of-process NLP service for claim extraction.
+# NLPServer listens on a Unix socket (multiprocessing.connection) and runs
+# extraction batches on a process pool whose workers each load the spaCy
+# model once. NLPClient is what API workers use: it only speaks the socket
+# protocol, so those processes never import spaCy. Requests are dicts:
+#   {"op": "extract", "texts": [...], "mode": None}  -> {"ok": True, "results": [...]}
+#   {"op": "health"}                   -> {"ok": True, "status": "ok", ...}
+#
+# Messages are pickled, so only the owner may reach the socket: it is
+# created 0600 (by default inside a private 0700 directory), and clients
+# must know the auth key. That is NLP_SERVICE_AUTHKEY when set; otherwise
+# the server generates a random key per run and writes it next to the
+# socket in an owner-only "<socket>.key" file that clients read.
+
+import os
+import secrets
+import stat
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional
+
+from utils.logger import log_error, log_info
+
+NLP_SOCKET_DIR = os.path.join(tempfile.gettempdir(), f"agentic_nlp-{os.getuid()}")
+NLP_SOCKET_DEFAULT = os.path.join(NLP_SOCKET_DIR, "nlp.sock")
+
+
+def get_nlp_address() -> str:
+    # NLP_SERVICE_ADDRESS is the server's Unix socket; unset means local NLP.
+    return os.environ.get("NLP_SERVICE_ADDRESS", "")
+
+
+def _key_path(address: str) -> str:
+    return address + ".key"
+
+
+def _authkey(address: str) -> bytes:
+    # This function returns the key clients authenticate with.
+    key = os.environ.get("NLP_SERVICE_AUTHKEY")
+    if key:
+        return key.encode("utf-8")
+    try:
+        with open(_key_path(address), "rb") as f:
+            return f.read()
+    except OSError as e:
+        raise PermissionError(f"NLP service key unavailable (set NLP_SERVICE_AUTHKEY): {e}") from e
+
+
+def _create_authkey(address: str) -> bytes:
+    # This function returns the server's key, generating and publishing a
+    # random one (readable by the owner only) unless NLP_SERVICE_AUTHKEY is set.
+    key = os.environ.get("NLP_SERVICE_AUTHKEY")
+    if key:
+        return key.encode("utf-8")
+    key_bytes = secrets.token_hex(32).encode("ascii")
+    path = _key_path(address)
+    if os.path.lexists(path):
+        os.unlink(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key_bytes)
+    return key_bytes
+
+
+def _prepare_socket_dir(address: str) -> None:
+    # The default directory is created private (0700) and must belong to us;
+    # a directory an attacker created first is refused.
+    directory = os.path.dirname(address)
+    if directory != NLP_SOCKET_DIR:
+        return
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{directory} is not a directory owned by this user")
+    os.chmod(directory, 0o700)
+
+
+def _init_worker() -> None:
+    # This function loads the model once when a pool worker starts. The
+    # worker must extract locally even if it inherited NLP_SERVICE_ADDRESS.
+    os.environ.pop("NLP_SERVICE_ADDRESS", None)
+    from tools.custom.claim_evidence_extractor import get_nlp
+
+    get_nlp()
+
+
+def _extract_in_worker(texts: List[str], mode: Optional[str] = None) -> List[Dict[str, object]]:
+    from tools.custom.claim_evidence_extractor import extract_local_batch
+
+    return extract_local_batch(texts, mode=mode)
+
+
+class NLPServer:
+    """Serves extraction requests from a pool of model-holding processes."""
+
+    def __init__(self, address: str = NLP_SOCKET_DEFAULT, workers: int = 2) -> None:
+        self.address = address
+        self.workers = workers
+        self._pool = None
+        self._listener: Optional[Listener] = None
+        self._lock = threading.Lock()
+        self._started_at = 0.0
+        self._stats = {"requests": 0, "texts": 0, "errors": 0, "queue_depth": 0, "max_queue_depth": 0}
+
+    def start(self) -> "NLPServer":
+        # This method starts the worker pool and accepts connections on a
+        # background thread.
+        from concurrent.futures import ProcessPoolExecutor
+
+        _prepare_socket_dir(self.address)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        authkey = _create_authkey(self.address)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        # The socket is created owner-only; connecting needs write permission.
+        umask = os.umask(0o177)
+        try:
+            self._listener = Listener(self.address, family="AF_UNIX", authkey=authkey)
+        finally:
+            os.umask(umask)
+        self._started_at = time.time()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        log_info(f"NLP service: {self.workers} workers listening on {self.address}")
+        return self
+
+    def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for path in (self.address, _key_path(self.address)):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def _accept_loop(self) -> None:
+        while self._listener is not None:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                # The listener was closed by stop(), or a client failed the
+                # authentication handshake.
+                if self._listener is None:
+                    return
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if self._listener is None:
+                    return  # stopped: drop the connection instead of answering
+                conn.send(self._handle(request))
+
+    def _handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "health":
+            return dict(self.get_stats(), ok=True, status="ok")
+        if op != "extract":
+            return {"ok": False, "error": f"unknown op {op!r}"}
+
+        texts = request.get("texts", [])
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["texts"] += len(texts)
+            self._stats["queue_depth"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._stats["queue_depth"])
+        try:
+            return {"ok": True, "results": self._pool.submit(_extract_in_worker, texts, request.get("mode")).result()}
+        except Exception as e:
+            log_error(f"NLP service: extraction failed: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            return {"ok": False, "error": str(e)}
+        finally:
+            with self._lock:
+                self._stats["queue_depth"] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        # queue_depth counts requests submitted to the pool and not yet
+        # answered, i.e. running or waiting for a free worker.
+        with self._lock:
+            return dict(self._stats, workers=self.workers, uptime=round(time.time() - self._started_at, 1))
+
+
+class NLPClient:
+    """Thread-safe client for NLPServer; keeps one connection per thread."""
+
+    def __init__(self, address: str, timeout: float = 30.0) -> None:
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, family="AF_UNIX", authkey=_authkey(self.address))
+        try:
+            conn.send(request)
+            if not conn.poll(self.timeout):
+                raise TimeoutError(f"no reply from NLP service within {self.timeout}s")
+            reply = conn.recv()
+        except Exception:
+            # The connection state is unknown now; reconnect on the next call.
+            self._local.conn = None
+            conn.close()
+            raise
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "NLP service error"))
+        return reply
+
+    def extract_batch(self, texts: List[str], mode: Optional[str] = None) -> List[Dict[str, object]]:
+        # mode None lets the server use its own EXTRACTION_MODE.
+        return self._call({"op": "extract", "texts": list(texts), "mode": mode})["results"]
+
+    def health(self) -> Dict[str, Any]:
+        """Server status and counters; raises if the service is unreachable."""
+        reply = self._call({"op": "health"})
+        reply.pop("ok", None)
+        return reply
+
+
+_CLIENT: Optional[NLPClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_nlp_client() -> NLPClient:
+    """Return the process-wide client for NLP_SERVICE_ADDRESS."""
+    global _CLIENT
+    address = get_nlp_address()
+    with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT.address != address:
+            _CLIENT = NLPClient(address, timeout=float(os.environ.get("NLP_SERVICE_TIMEOUT", "30")))
+    return _CLIENT
+
+
+def get_nlp_service_stats() -> Optional[Dict[str, Any]]:
+    # This function reports the service health for /metrics, or None when
+    # extraction runs locally.
+    if not get_nlp_address():
+        return None
+    try:
+        return get_nlp_client().health()
+    except Exception as e:
+        return {"status": "unreachable", "error": str(e)}
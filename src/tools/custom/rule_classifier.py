@@ -0,0 +1,48 @@
+# This module is the fast tier of claim/evidence extraction.
+# Sentences (split as in parsed_document) are classified from compiled
+# patterns and small lexicons. Each decision carries a certainty; the extractor sends only
+# sentences below its threshold to the spaCy dependency parse.
+
+import re
+from typing import List, Optional, Tuple
+
+from tools.built_in.parsed_document import WORD_PATTERN, split_sentences  # noqa: F401
+
+# Same cue words the spaCy classifier treats as evidence.
+CITATION_WORDS = frozenset({"study", "research", "according", "found"})
+NUMBER_WORDS = frozenset({
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "twenty", "thirty", "forty", "fifty", "hundred", "thousand",
+    "million", "billion", "trillion", "dozen",
+})
+AUXILIARIES = frozenset({
+    "is", "are", "was", "were", "be", "been", "am", "can", "could", "will", "would",
+    "shall", "should", "may", "might", "must", "has", "have", "had", "does", "do", "did",
+})
+
+DIGIT_PATTERN = re.compile(r"\d")
+
+# Certainty of each kind of rule decision.
+CERTAIN = 1.0
+SUBJECT_AUX_CLAIM = 0.9
+NEEDS_PARSE = 0.4
+
+
+def classify_sentence(sentence: str, words: Optional[List[str]] = None) -> Tuple[Optional[str], float]:
+    """
+    Return ("claim" | "evidence" | None, certainty) for one sentence.
+    Numbers and citation cues make evidence; a subject followed by an
+    auxiliary or modal makes a claim; anything else needs the parser.
+    Pass the sentence's word tokens, if already known, to skip tokenizing.
+    """
+    if len(sentence) < 10:
+        return None, CERTAIN  # too short to classify, as in the spaCy path
+    words = [w.lower() for w in (words if words is not None else WORD_PATTERN.findall(sentence))]
+    if DIGIT_PATTERN.search(sentence) or any(w in NUMBER_WORDS or w in CITATION_WORDS for w in words):
+        return "evidence", CERTAIN
+    if sentence.endswith("?"):
+        return None, NEEDS_PARSE
+    first_aux = next((i for i, w in enumerate(words) if w in AUXILIARIES), None)
+    if first_aux is not None and first_aux >= 1 and len(words) >= 4:
+        return "claim", SUBJECT_AUX_CLAIM
+    return None, NEEDS_PARSE
@@ -0,0 +1,35 @@
+# This module holds helpers for the asyncio pipeline.
+# CPU-bound steps (spaCy parsing, summarization) run on a bounded thread
+# pool of their own, so they cannot exhaust the loop's default executor
+# that blocking I/O relies on. Work is submitted with a copy of the
+# caller's context, so contextvars such as the memory session carry over.
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_CPU_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_CPU_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool for CPU-bound steps (CPU_WORKERS threads)."""
+    global _CPU_EXECUTOR
+    if _CPU_EXECUTOR is None:
+        with _CPU_EXECUTOR_LOCK:
+            if _CPU_EXECUTOR is None:
+                workers = int(os.environ.get("CPU_WORKERS", str(os.cpu_count() or 4)))
+                _CPU_EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu")
+    return _CPU_EXECUTOR
+
+
+async def run_cpu_bound(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    # This function awaits fn(*args, **kwargs) run on the CPU pool.
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_cpu_executor(), call)
@@ -0,0 +1,21 @@
+# This module provides lazy package exports.
+# A package __init__ maps each exported name to the submodule defining it,
+# and the submodule is imported on first attribute access, so importing one
+# submodule does not load its siblings.
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(module_name: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    # This function returns the module-level __getattr__ and __dir__ for module_name.
+    def __getattr__(name: str) -> Any:
+        if name in exports:
+            return getattr(importlib.import_module(exports[name], module_name), name)
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    def __dir__() -> List[str]:
+        module_globals = vars(importlib.import_module(module_name))
+        return sorted(set(module_globals) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,85 @@
+# This module implements a micro-batching queue.
+# Concurrent callers submit single items; a worker thread gathers the items
+# that arrive within a short window (or until max_batch is reached), runs
+# them through one batch function call, and hands each caller its own
+# result. This lets concurrent requests share a batched NLP pass.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class MicroBatcher:
+    """Groups concurrent submit() calls into batches for batch_fn."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch: int = 64,
+        max_wait: float = 0.005,
+    ) -> None:
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "items": 0, "largest_batch": 0}
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Any:
+        # This method blocks until the batch containing item has been processed.
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def submit_many(self, items: List[Any]) -> List[Any]:
+        # This method queues all items at once, so they can share batches with
+        # each other and with concurrent callers, and returns their results in order.
+        futures: List[Future] = []
+        for item in items:
+            future: Future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def _collect(self) -> List[Tuple[Any, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(items)} items")
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(batch)
+                self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["avg_batch"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["queued"] = self._queue.qsize()
+        return stats
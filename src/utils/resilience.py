@@ -0,0 +1,161 @@
+# This module provides resilience primitives for calls to external services.
+# CircuitBreaker stops calling a failing backend for a while and lets a few
+# trial calls through before trusting it again; TokenBucket keeps the call
+# rate under a provider's limit. Both are thread-safe and keep counters
+# for the /metrics endpoint.
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Trips OPEN after failure_threshold failures within window seconds.
+    After reset_timeout seconds it turns HALF_OPEN and admits up to
+    half_open_max_calls trial calls: a success closes it, a failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        window: float = 60.0,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures: Deque[float] = deque()
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+        self._stats = {"successes": 0, "failures": 0, "rejections": 0, "trips": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def _refresh(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trials = 0
+            self._opened_at = now
+        elif self._state == HALF_OPEN and now - self._opened_at >= self.reset_timeout:
+            # Trial calls that never reported back (e.g. cancelled) must not
+            # keep the breaker half-open forever.
+            self._trials = 0
+            self._opened_at = now
+
+    def _trip(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._failures.clear()
+        self._stats["trips"] += 1
+
+    def allow(self) -> bool:
+        # This method reports whether a call may go ahead right now.
+        with self._lock:
+            self._refresh(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return True
+            self._stats["rejections"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._failures.clear()
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._stats["failures"] += 1
+            if self._state == HALF_OPEN:
+                self._trip(now)
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if self._state == CLOSED and len(self._failures) >= self.failure_threshold:
+                self._trip(now)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh(time.monotonic())
+            return dict(self._stats, state=self._state, recent_failures=len(self._failures))
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {"granted": 0, "rejections": 0}
+
+    def try_acquire(self, reserve: float = 0.0) -> float:
+        # This method takes a token and returns 0.0, or returns the seconds
+        # until the next token is available without taking one. With a
+        # reserve, it only takes one if that many tokens would remain.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0 + reserve:
+                self._tokens -= 1.0
+                self._stats["granted"] += 1
+                return 0.0
+            return (1.0 + reserve - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def _reject(self) -> bool:
+        with self._lock:
+            self._stats["rejections"] += 1
+        return False
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """Wait up to timeout seconds for a token; False if none came."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return self._reject()
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout: float = 0.0) -> bool:
+        """Like acquire, but waits without blocking the event loop."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return self._reject()
+            await asyncio.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, rate=self.rate, capacity=self.capacity)
@@ -0,0 +1,190 @@
+# This module implements a two-tier cache for tool calls: a bounded
+# in-process LRU in front of a persistent SQLite table that survives
+# restarts and is shared by every worker process on the machine.
+# Entries are keyed by a content hash of the tool name and its arguments,
+# expire after a per-tool TTL, and hits/misses are counted per tool.
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.logger import log_error
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_DB_DEFAULT = os.path.join(BASE_DIR, "db", "tool_cache.db")
+
+
+def make_cache_key(tool: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    # This function hashes the canonical JSON form of a call.
+    payload = json.dumps([tool, list(args), kwargs], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolCache:
+    """
+    LRU + SQLite cache. Values must be JSON-serializable; both tiers hold
+    the JSON text, so every hit returns a fresh object callers may mutate.
+    """
+
+    def __init__(self, db_path: Optional[str] = CACHE_DB_DEFAULT, max_entries: int = 1024) -> None:
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires_at, json)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            try:
+                self._conn = sqlite3.connect(db_path, timeout=10.0, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tool_cache ("
+                    " key TEXT PRIMARY KEY, tool TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                log_error(f"Tool cache disk tier unavailable ({e}). Using memory only.")
+                self._conn = None
+
+    def _count(self, tool: str, field: str) -> None:
+        counters = self._stats.setdefault(tool, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, tool: str, key: str) -> Tuple[bool, Any]:
+        # This method checks the LRU first, then SQLite (promoting disk hits).
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._lru.move_to_end(key)
+                    self._count(tool, "memory_hits")
+                    return True, json.loads(entry[1])
+                del self._lru[key]
+
+        row = None
+        if self._conn is not None:
+            try:
+                with self._db_lock:
+                    row = self._conn.execute(
+                        "SELECT value, expires_at FROM tool_cache WHERE key = ? AND expires_at > ?", (key, now)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                log_error(f"Tool cache read failed: {e}")
+
+        with self._lock:
+            if row is None:
+                self._count(tool, "misses")
+                return False, None
+            self._remember(key, row[1], row[0])
+            self._count(tool, "disk_hits")
+        return True, json.loads(row[0])
+
+    def _remember(self, key: str, expires_at: float, value_json: str) -> None:
+        self._lru[key] = (expires_at, value_json)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def set(self, tool: str, key: str, value: Any, ttl: float) -> None:
+        # This method writes through to both tiers.
+        expires_at = time.time() + ttl
+        value_json = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, expires_at, value_json)
+        if self._conn is not None:
+            try:
+                with self._db_lock:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO tool_cache (key, tool, value, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, tool, value_json, expires_at),
+                    )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                log_error(f"Tool cache write failed: {e}")
+
+    def clear(self, tool: Optional[str] = None) -> None:
+        # This method drops every entry (or only one tool's) from both tiers.
+        with self._lock:
+            self._lru.clear()
+        if self._conn is not None:
+            with self._db_lock:
+                if tool is None:
+                    self._conn.execute("DELETE FROM tool_cache")
+                else:
+                    self._conn.execute("DELETE FROM tool_cache WHERE tool = ?", (tool,))
+                self._conn.commit()
+
+    def purge_expired(self) -> int:
+        # This method deletes expired rows from the disk tier.
+        if self._conn is None:
+            return 0
+        with self._db_lock:
+            deleted = self._conn.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {name: dict(counters) for name, counters in self._stats.items()}
+            size = len(self._lru)
+        return {"memory_entries": size, "max_entries": self.max_entries, "tools": tools}
+
+
+_TOOL_CACHE: Optional[ToolCache] = None
+_TOOL_CACHE_LOCK = threading.Lock()
+
+
+def get_tool_cache() -> ToolCache:
+    """Return the process-wide cache, created on first use."""
+    global _TOOL_CACHE
+    if _TOOL_CACHE is None:
+        with _TOOL_CACHE_LOCK:
+            if _TOOL_CACHE is None:
+                _TOOL_CACHE = ToolCache(
+                    db_path=os.environ.get("TOOL_CACHE_PATH", CACHE_DB_DEFAULT),
+                    max_entries=int(os.environ.get("TOOL_CACHE_SIZE", "1024")),
+                )
+    return _TOOL_CACHE
+
+
+def cache_disabled() -> bool:
+    # TOOL_CACHE_DISABLED=1 bypasses the cache for every tool.
+    return os.environ.get("TOOL_CACHE_DISABLED") == "1"
+
+
+def cached_tool(
+    name: str, ttl: float, cache_if: Optional[Callable[[Any], bool]] = None
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator caching a tool function's result for `ttl` seconds.
+    Results for which cache_if returns False are returned but not stored.
+    Set TOOL_CACHE_DISABLED=1 to bypass the cache entirely.
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if cache_disabled():
+                return fn(*args, **kwargs)
+            cache = get_tool_cache()
+            key = make_cache_key(name, args, kwargs)
+            hit, value = cache.get(name, key)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            if cache_if is None or cache_if(value):
+                cache.set(name, key, value, ttl)
+            return value
+
+        wrapper.uncached = fn  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
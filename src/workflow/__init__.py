@@ -1,2 +1,10 @@
 # Initializes workflow package.
-from .orchestrator import Orchestrator
+
+from utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "Orchestrator": ".orchestrator",
+    "StagedPipeline": ".staged_pipeline",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,19 +1,33 @@
 # This module defines the Orchestrator, which wires together
 # memory, agents, and controller for a single end-to-end workflow.
 
-from memory.memory_manager import MemoryManager
-from agents.research_agent import ResearchAgent
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+from memory.session_memory import ShardedMemory, session_scope
+from agents.research_agent import MEMORY_SOURCE_TITLE, ResearchAgent
 from agents.analysis_agent import AnalysisAgent
 from agents.writer_agent import WriterAgent
 from controller.controller import Controller
+from controller.protocol import QueryResult
 from utils.logger import log_info
+from utils.validators import validate_query
+from utils.tool_cache import get_tool_cache
+from tools.built_in.web_search_tool import get_search_guard_stats
+from tools.custom.claim_evidence_extractor import get_batching_stats, get_extraction_stats
+from tools.custom.nlp_service import get_nlp_service_stats
+from workflow.response_cache import ResponseCache, query_key
+from workflow.single_flight import SingleFlight
+from workflow.staged_pipeline import StagedPipeline
 
 
 class Orchestrator:
     # This class is a simple façade that sets up and runs the agentic workflow.
-    def __init__(self) -> None:
-        # This builds shared memory and agent instances.
-        self.memory = MemoryManager()
+    def __init__(self, response_cache: Optional[ResponseCache] = None) -> None:
+        # This builds memory and agent instances; memory is sharded by the
+        # session of each run, and runs without one use the shared store.
+        self.memory = ShardedMemory()
         self.research_agent = ResearchAgent(memory=self.memory)
         self.analysis_agent = AnalysisAgent(memory=self.memory)
         self.writer_agent = WriterAgent(memory=self.memory)
@@ -22,10 +36,112 @@ class Orchestrator:
             analysis_agent=self.analysis_agent,
             writer_agent=self.writer_agent,
         )
+        # This cache returns earlier reports for near-identical queries.
+        # RESPONSE_CACHE_TTL=0 disables it.
+        if response_cache is None and float(os.environ.get("RESPONSE_CACHE_TTL", "3600")) > 0:
+            response_cache = ResponseCache(
+                threshold=float(os.environ.get("RESPONSE_CACHE_THRESHOLD", "0.6")),
+                max_age=float(os.environ.get("RESPONSE_CACHE_TTL", "3600")),
+            )
+        self.response_cache = response_cache
+        # This coalesces concurrent runs of the same normalized query.
+        self.single_flight = SingleFlight()
+        # QUERY_PIPELINE=staged runs queries through shared per-stage worker
+        # pools instead of one thread (or task) per query.
+        self.pipeline: Optional[StagedPipeline] = None
+        if os.environ.get("QUERY_PIPELINE", "direct").lower() == "staged":
+            self.pipeline = StagedPipeline(self.controller)
+
+    def run(self, query: str, use_cache: bool = True, session_id: Optional[str] = None) -> str:
+        # This method executes the full pipeline for a given user query,
+        # unless a cached report for a near-identical query can be reused.
+        # Memory reads and writes go to session_id's shard.
+        if use_cache and self.response_cache is not None:
+            cached = self.response_cache.lookup(query)
+            if cached is not None:
+                log_info("Orchestrator: served from response cache")
+                return cached
+
+        key = self._flight_key(query, session_id)
+        return self.single_flight.do(key, lambda: self._run_pipeline(query, session_id))
+
+    async def run_async(self, query: str, use_cache: bool = True, session_id: Optional[str] = None) -> str:
+        # This method is run() on the asyncio pipeline: network waits and
+        # retry back-off are awaited, so concurrent queries share the loop
+        # instead of each holding a worker thread.
+        if use_cache and self.response_cache is not None:
+            cached = self.response_cache.lookup(query)
+            if cached is not None:
+                log_info("Orchestrator: served from response cache")
+                return cached
+
+        key = self._flight_key(query, session_id)
+        return await self.single_flight.do_async(key, lambda: self._run_pipeline_async(query, session_id))
+
+    @staticmethod
+    def _flight_key(query: str, session_id: Optional[str]) -> str:
+        # Queries made only of stopwords normalize to nothing; those fall
+        # back to their raw text so unrelated questions are never merged.
+        key = query_key(query) or query.strip().lower()
+        if session_id is not None:
+            # Runs only coalesce within a session, so each one's memory is updated.
+            key = f"{session_id}\x00{key}"
+        return key
 
-    def run(self, query: str) -> str:
-        # This method executes the full pipeline for a given user query.
+    def _run_pipeline(self, query: str, session_id: Optional[str] = None) -> str:
         log_info("Orchestrator: starting pipeline")
-        response = self.controller.handle_query(query)
+        with session_scope(session_id):
+            if self.pipeline is not None:
+                result = self.pipeline.submit_result(query).result()
+            else:
+                result = self.controller.run_query(query)
         log_info("Orchestrator: pipeline finished")
-        return response
+        return self._finish(query, result)
+
+    async def _run_pipeline_async(self, query: str, session_id: Optional[str] = None) -> str:
+        log_info("Orchestrator: starting async pipeline")
+        # The session is set in this task's context; threads the agents hand
+        # work to receive a copy of it.
+        with session_scope(session_id):
+            if self.pipeline is not None:
+                # Submitting may block on backpressure, so it happens off the loop.
+                future = await asyncio.to_thread(self.pipeline.submit_result, query)
+                result = await asyncio.wrap_future(future)
+            else:
+                result = await self.controller.run_query_async(query)
+        log_info("Orchestrator: pipeline finished")
+        return self._finish(query, result)
+
+    def _finish(self, query: str, result: QueryResult) -> str:
+        if self.response_cache is not None and self._is_cacheable(query, result):
+            self.response_cache.store(query, result.response)
+        return result.response
+
+    @staticmethod
+    def _is_cacheable(query: str, result: QueryResult) -> bool:
+        # Validation messages, errors and reports built from fallback output
+        # (e.g. during a search outage) must not be replayed to later
+        # queries, and the cache is shared by all sessions, so neither must
+        # reports built from one session's memory.
+        return (
+            validate_query(query)
+            and not result.degraded
+            and MEMORY_SOURCE_TITLE not in result.response
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        # This method collects runtime counters for the /metrics endpoint.
+        metrics: Dict[str, Any] = {
+            "tool_cache": get_tool_cache().get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "web_search": get_search_guard_stats(),
+            "extraction": get_extraction_stats(),
+        }
+        optional = {"nlp_service": get_nlp_service_stats(), "nlp_batching": get_batching_stats()}
+        metrics.update({name: stats for name, stats in optional.items() if stats is not None})
+        metrics["memory"] = self.memory.get_stats()
+        if self.pipeline is not None:
+            metrics["pipeline"] = self.pipeline.get_stats()
+        if self.response_cache is not None:
+            metrics["response_cache"] = self.response_cache.get_stats()
+        return metrics
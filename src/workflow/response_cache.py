@@ -0,0 +1,127 @@
+# This module implements a response-level cache in front of the pipeline.
+# Queries are normalized (case, stopwords, plural/lemma folding) into term
+# sets; a MinHash LSH index finds earlier queries with similar term sets,
+# and a cached report is reused when their Jaccard similarity reaches the
+# threshold, the cached query covers the new query's terms, and the entry is
+# not older than max_age seconds. Short queries have only two or three terms,
+# so one extra topical term ("risks of agentic AI") must be a miss; only
+# queries of five or more terms may leave one term in five uncovered.
+# Generic head nouns ("agentic AI systems") never need to be covered, so
+# such pairs match whichever of the two was cached first.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from tools.built_in.bm25_index import tokenize
+from utils.fingerprint import MinHasher, MinHashLSH, jaccard
+
+# Words that only shape the question, not its topic.
+QUESTION_WORDS = frozenset({"explain", "describe", "tell", "me", "please", "give", "overview", "define", "definition"})
+
+
+# Generic head nouns that name the kind of thing asked about, not a new topic
+# (normalized forms, as produced by normalize_query).
+GENERIC_TERMS = frozenset({
+    "system", "concept", "approach", "approache", "technology", "basic", "fundamental",
+    "example", "idea", "meaning", "type", "kind",
+})
+
+
+def normalize_query(query: str) -> FrozenSet[str]:
+    """Map a query to its set of normalized content terms."""
+    terms = set()
+    for tok in tokenize(query):
+        if tok in QUESTION_WORDS:
+            continue
+        if len(tok) > 4 and tok.endswith("ie"):
+            tok = tok[:-2] + "y"  # "strategies" -> "strategie" -> "strategy"
+        terms.add(tok)
+    return frozenset(terms)
+
+
+def uncovered_allowance(terms: FrozenSet[str]) -> int:
+    # This function returns how many query terms a cached query may miss.
+    return len(terms) // 5
+
+
+def uncovered_terms(terms: FrozenSet[str], cached_terms: FrozenSet[str]) -> FrozenSet[str]:
+    # This function returns the topical query terms the cached query lacks.
+    return terms - cached_terms - GENERIC_TERMS
+
+
+def query_key(query: str) -> str:
+    # This function returns a canonical string for exact-match lookups.
+    return " ".join(sorted(normalize_query(query)))
+
+
+class ResponseCache:
+    """Thread-safe near-duplicate cache of final pipeline responses."""
+
+    def __init__(self, threshold: float = 0.6, max_age: float = 3600.0, max_entries: int = 1024) -> None:
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._hasher = MinHasher()
+        self._lsh = MinHashLSH(num_perm=self._hasher.num_perm)
+        self._entries: "OrderedDict[str, Tuple[FrozenSet[str], float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "near_hits": 0, "misses": 0, "stores": 0}
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._lsh.remove(key)
+
+    def lookup(self, query: str) -> Optional[str]:
+        # This method returns a fresh cached response for the same or a
+        # sufficiently similar query, or None.
+        terms = normalize_query(query)
+        if not terms:
+            return None
+        key = " ".join(sorted(terms))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] <= self.max_age:
+                self._stats["hits"] += 1
+                return entry[2]
+
+            best_key, best_score = None, 0.0
+            for candidate in self._lsh.query(self._hasher.signature(terms)):
+                cand_terms, stored_at, _ = self._entries[candidate]
+                if now - stored_at > self.max_age:
+                    self._drop(candidate)
+                    continue
+                if len(uncovered_terms(terms, cand_terms)) > uncovered_allowance(terms):
+                    continue
+                score = jaccard(terms, cand_terms)
+                if score > best_score:
+                    best_key, best_score = candidate, score
+            if best_key is not None and best_score >= self.threshold:
+                self._stats["near_hits"] += 1
+                return self._entries[best_key][2]
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, query: str, response: str) -> None:
+        terms = normalize_query(query)
+        if not terms:
+            return
+        key = " ".join(sorted(terms))
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (terms, time.time(), response)
+            self._lsh.insert(key, self._hasher.signature(terms))
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
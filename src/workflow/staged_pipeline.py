@@ -0,0 +1,197 @@
+# This module implements a staged execution engine for queries.
+# Controller.handle_query runs research, analysis and writing back to back,
+# so one query's network wait and another's spaCy parse never overlap. Here
+# each agent step is a stage with a bounded queue and its own worker pool,
+# and queries flow through research -> analysis -> writing like an assembly
+# line: searches for new queries run while earlier ones are being analyzed.
+# A full queue blocks the stage before it, so a slow stage pushes back on
+# submitters instead of letting work pile up in memory.
+
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from controller.controller import INVALID_QUERY_MESSAGE, Controller, is_degraded, system_error
+from controller.protocol import AgentMessage, QueryResult
+from rl.feedback_loop import evaluate_response_quality, should_retry
+from tools.custom.claim_evidence_extractor import enable_micro_batching
+from utils.logger import log_error, log_info
+from utils.validators import validate_query
+
+_STOP = object()
+
+
+@dataclass
+class PipelineJob:
+    # This dataclass carries one query, and its partial results, through the stages.
+    query: str
+    # The submitter's context, so the memory session follows the query.
+    context: contextvars.Context
+    # Resolves to the run's QueryResult.
+    future: Future = field(default_factory=Future)
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    analysis: Dict[str, Any] = field(default_factory=dict)
+    enqueued_at: float = 0.0
+
+
+class Stage:
+    """A bounded queue drained by a fixed pool of worker threads."""
+
+    def __init__(self, name: str, work: Callable[[PipelineJob], None], workers: int, queue_size: int) -> None:
+        self.name = name
+        self.work = work
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self.next: Optional["Stage"] = None
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stats = {"processed": 0, "failed": 0, "busy": 0, "max_queued": 0}
+        self._wait = 0.0
+        self._service = 0.0
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, job: PipelineJob) -> None:
+        # This method blocks while the queue is full (backpressure).
+        job.enqueued_at = time.perf_counter()
+        self.queue.put(job)
+        depth = self.queue.qsize()
+        with self._lock:
+            self._stats["max_queued"] = max(self._stats["max_queued"], depth)
+
+    def stop(self) -> None:
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _worker(self) -> None:
+        while True:
+            job = self.queue.get()
+            if job is _STOP:
+                return
+            started = time.perf_counter()
+            with self._lock:
+                self._stats["busy"] += 1
+                self._wait += started - job.enqueued_at
+            failed = False
+            try:
+                job.context.run(self.work, job)
+            except Exception as e:
+                # Stages use the controller's retries and fallbacks, so this
+                # is the equivalent of handle_query's critical-error path.
+                log_error(f"Critical error in {self.name} stage: {str(e)}")
+                failed = True
+                job.future.set_result(QueryResult(system_error(e), degraded=True))
+            with self._lock:
+                self._stats["busy"] -= 1
+                self._stats["processed"] += 1
+                self._stats["failed"] += failed
+                self._service += time.perf_counter() - started
+            if not job.future.done() and self.next is not None:
+                self.next.put(job)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats, workers=self.workers, queued=self.queue.qsize())
+            processed = self._stats["processed"]
+            stats["avg_wait_ms"] = round(1000 * self._wait / processed, 2) if processed else 0.0
+            stats["avg_service_ms"] = round(1000 * self._service / processed, 2) if processed else 0.0
+        return stats
+
+
+class StagedPipeline:
+    """
+    Runs the controller's research, analysis and writer steps (with their
+    retries and fallbacks) as pipelined stages shared by all queries.
+    """
+
+    def __init__(
+        self,
+        controller: Controller,
+        research_workers: Optional[int] = None,
+        analysis_workers: Optional[int] = None,
+        writer_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        self.controller = controller
+        queue_size = queue_size or int(os.environ.get("PIPELINE_QUEUE_SIZE", "32"))
+        # Research waits on the network, so it gets many threads. Analysis
+        # threads hand the sentences that need a spaCy parse to the shared
+        # micro-batcher, so concurrent analyses share one nlp.pipe call on the
+        # batcher's thread (or one NLP service request) instead of parsing in
+        # parallel under the GIL; only the cheap rule pass runs per thread.
+        enable_micro_batching()
+        self.stages = [
+            Stage("research", self._research,
+                  research_workers or int(os.environ.get("PIPELINE_RESEARCH_WORKERS", "16")), queue_size),
+            Stage("analysis", self._analyze,
+                  analysis_workers or int(os.environ.get("PIPELINE_ANALYSIS_WORKERS", str(os.cpu_count() or 4))),
+                  queue_size),
+            Stage("writer", self._write,
+                  writer_workers or int(os.environ.get("PIPELINE_WRITER_WORKERS", "2")), queue_size),
+        ]
+        for stage, next_stage in zip(self.stages, self.stages[1:]):
+            stage.next = next_stage
+        for stage in self.stages:
+            stage.start()
+
+    def submit(self, query: str) -> Future:
+        """Queue query and return a future for its report; blocks while the pipeline is full."""
+        report: Future = Future()
+        self.submit_result(query).add_done_callback(lambda done: report.set_result(done.result().response))
+        return report
+
+    def submit_result(self, query: str) -> Future:
+        # This method is submit() with a future for the whole QueryResult.
+        log_info(f"Pipeline: received query: {query}")
+        if not validate_query(query):
+            log_error("Pipeline: invalid query provided")
+            future: Future = Future()
+            future.set_result(QueryResult(INVALID_QUERY_MESSAGE))
+            return future
+        job = PipelineJob(query=query, context=contextvars.copy_context())
+        self.stages[0].put(job)
+        return job.future
+
+    def run(self, query: str) -> str:
+        return self.submit(query).result()
+
+    def _message(self, receiver: str, task_type: str, job: PipelineJob) -> AgentMessage:
+        payload: Dict[str, Any] = {"query": job.query, "sources": job.sources, "analysis": job.analysis}
+        return AgentMessage(sender="pipeline", receiver=receiver, task_type=task_type, payload=payload)
+
+    def _research(self, job: PipelineJob) -> None:
+        job.sources = self.controller._handle_research_with_retry(self._message("research_agent", "research", job))
+
+    def _analyze(self, job: PipelineJob) -> None:
+        job.analysis = self.controller._handle_analysis_with_retry(self._message("analysis_agent", "analysis", job))
+
+    def _write(self, job: PipelineJob) -> None:
+        response = self.controller._handle_writer_with_retry(self._message("writer_agent", "write", job))
+        if should_retry(evaluate_response_quality(job.analysis, response)):
+            # The one refinement pass runs here rather than re-entering the
+            # analysis queue, which could deadlock two full stages.
+            log_info("Pipeline: Low quality detected, attempting improvement")
+            self._analyze(job)
+            response = self.controller._handle_writer_with_retry(self._message("writer_agent", "write", job))
+        log_info("Pipeline: Successfully completed query")
+        job.future.set_result(QueryResult(response, is_degraded(job.sources, job.analysis, response)))
+
+    def close(self) -> None:
+        # This method lets queued queries finish, then stops the workers.
+        for stage in self.stages:
+            stage.stop()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.get_stats() for stage in self.stages}
@@ -0,0 +1,85 @@
+# ---------------------------------------------------------
+# benchmark_startup.py
+# This script measures cold-start time: each run is a fresh
+# interpreter that imports the API app (orchestrator, agents,
+# tools and database module) and builds the Orchestrator.
+#
+# "lazy" is the normal startup. "eager" additionally performs
+# everything that used to happen at import time (spaCy model,
+# DuckDuckGo client, numpy dense index, database init), which
+# is the cost now deferred to first use.
+#
+# Usage:
+#   python tests/benchmark_startup.py --runs 5
+# ---------------------------------------------------------
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+HEAVY_MODULES = ["spacy", "duckduckgo_search", "numpy", "http.server", "concurrent.futures.process"]
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path[:0] = [{root!r}, {src!r}]
+import api.main
+if {eager}:
+    import duckduckgo_search
+    from tools.custom.claim_evidence_extractor import get_nlp
+    from tools.built_in.web_search_tool import get_corpus_dense_index
+    from db.database import ensure_db
+    get_nlp()
+    get_corpus_dense_index()
+    ensure_db()
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(eager: bool) -> dict:
+    # This function times one cold start in a fresh interpreter. Every file
+    # the app writes (history, tool cache, memory) goes to a temp dir, so
+    # the benchmark never touches the repository's databases.
+    script = STARTUP_SCRIPT.format(
+        root=PROJECT_ROOT, src=os.path.join(PROJECT_ROOT, "src"), eager=eager, heavy=HEAVY_MODULES
+    )
+    with tempfile.TemporaryDirectory(prefix="agentic-bench-") as tmp:
+        env = dict(
+            os.environ,
+            TOOL_CACHE_DISABLED="1",
+            TOOL_CACHE_PATH=os.path.join(tmp, "tool_cache.db"),
+            HISTORY_DB_PATH=os.path.join(tmp, "history.db"),
+            MEMORY_FILE=os.path.join(tmp, "memory_store.json"),
+            MEMORY_DB_PATH=os.path.join(tmp, "memory.db"),
+            MEMORY_SHARD_DIR=os.path.join(tmp, "memory_shards"),
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True, env=env, cwd=tmp,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the API process.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("\n==================== STARTUP BENCHMARK ====================\n")
+    for mode in ("lazy", "eager"):
+        results = [measure(mode == "eager") for _ in range(args.runs)]
+        times = [r["seconds"] for r in results]
+        print(f"{mode:>5}: median {statistics.median(times) * 1000:7.1f} ms  "
+              f"(min {min(times) * 1000:.1f}, max {max(times) * 1000:.1f})  "
+              f"heavy modules loaded: {', '.join(results[-1]['loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+# Test session setup: every file the app writes (history database, tool
+# cache, memory stores) goes to a temp dir instead of the repository.
+# Paths are set before any test module imports the app, since some of them
+# are read at import time; subprocesses started by tests inherit them.
+
+import os
+import shutil
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="agentic-tests-")
+
+os.environ["TOOL_CACHE_PATH"] = os.path.join(_TMP_DIR, "tool_cache.db")
+os.environ["HISTORY_DB_PATH"] = os.path.join(_TMP_DIR, "history.db")
+os.environ["MEMORY_FILE"] = os.path.join(_TMP_DIR, "memory_store.json")
+os.environ["MEMORY_DB_PATH"] = os.path.join(_TMP_DIR, "memory.db")
+os.environ["MEMORY_SHARD_DIR"] = os.path.join(_TMP_DIR, "memory_shards")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
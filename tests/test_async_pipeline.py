@@ -0,0 +1,112 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+import urllib.error
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_async_endpoint_fetch(tmp_path):
+    """Test the event-loop HTTP client against the replay server."""
+    log_info("=== Testing Async Endpoint Fetch ===")
+    from tools.built_in.search_replay import Cassette, ReplayServer, fetch_endpoint_results_async
+
+    path = str(tmp_path / "cassette.json")
+    raw = [{"title": "Agentic AI", "href": "https://example.com/a", "body": "Agents plan and act."}]
+    Cassette(path).record("agentic ai", raw)
+    server = ReplayServer(Cassette(path), latency=0.01).start()
+    try:
+        assert asyncio.run(fetch_endpoint_results_async(server.url, "agentic AI", 3)) == raw
+        server.error_rate = 1.0
+        try:
+            asyncio.run(fetch_endpoint_results_async(server.url, "agentic AI", 3))
+            assert False, "expected an HTTP error"
+        except urllib.error.HTTPError as e:
+            assert e.code >= 500
+    finally:
+        server.stop()
+    log_info("✅ Async endpoint fetch works")
+
+
+def test_async_controller_retries_without_threads():
+    """Test that concurrent async queries back off on the loop, not in threads."""
+    log_info("=== Testing Async Controller ===")
+    from controller.controller import Controller
+    from memory.session_memory import CURRENT_SESSION, session_scope
+    from utils.async_utils import run_cpu_bound
+
+    attempts = {}
+    sessions = []
+
+    class FlakyResearch:
+        async def run_async(self, query, top_k=3):
+            attempts[query] = attempts.get(query, 0) + 1
+            await asyncio.sleep(0.05)
+            if attempts[query] == 1:
+                raise ConnectionError("search unavailable")
+            return [{"title": "Doc", "url": "https://example.com", "content": f"About {query}."}]
+
+    class Analysis:
+        async def run_async(self, query, sources):
+            def analyze():
+                # The session set by the caller is visible on the CPU pool.
+                sessions.append(CURRENT_SESSION.get())
+                return {"summary": f"Summary of {query}.", "claims": ["c"], "evidence": ["e"], "confidence": 0.9}
+            return await run_cpu_bound(analyze)
+
+    class Writer:
+        async def run_async(self, query, analysis, sources):
+            return f"# Report\n\n{analysis['summary']} " + "Details. " * 10
+
+    controller = Controller(FlakyResearch(), Analysis(), Writer(), retry_delay=0.3)
+    threads_before = threading.active_count()
+
+    async def one(i):
+        with session_scope(f"s{i}"):
+            return await controller.handle_query_async(f"question number {i}")
+
+    async def main():
+        peak = 0
+        task = asyncio.gather(*(one(i) for i in range(50)))
+        while not task.done():
+            peak = max(peak, threading.active_count())
+            await asyncio.sleep(0.02)
+        return await task, peak
+
+    start = time.perf_counter()
+    responses, peak_threads = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+
+    assert all(r.startswith("# Report") for r in responses)
+    assert all(count == 2 for count in attempts.values()) and len(attempts) == 50
+    assert set(sessions) == {f"s{i}" for i in range(50)}
+    # 50 retry back-offs overlap instead of serializing or holding 50 threads.
+    assert elapsed < 3.0
+    assert peak_threads - threads_before <= (os.cpu_count() or 4) + 2
+    assert asyncio.run(controller.handle_query_async("   ")).startswith("Your query appears to be empty")
+    log_info("✅ Async controller works")
+
+
+def test_single_flight_async():
+    """Test that concurrent async runs of one key share a single execution."""
+    log_info("=== Testing Async Single-Flight ===")
+    from workflow.single_flight import SingleFlight
+
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "report"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", work) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["report"] * 10
+    assert calls == [1]
+    assert flight.get_stats() == {"executions": 1, "coalesced": 9, "in_flight": 0}
+    log_info("✅ Async single-flight works")
@@ -0,0 +1,63 @@
+import sys
+import os
+import json
+import sqlite3
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_fact_store(tmp_path):
+    """Test content-addressed facts with counts, sources and eviction."""
+    log_info("=== Testing Fact Store ===")
+    from memory.journaled_memory import JournaledMemoryManager
+    from memory.memory_manager import MemoryManager
+    from memory.sqlite_memory import SQLiteMemoryManager
+
+    backends = [
+        lambda **kw: MemoryManager(str(tmp_path / "m.json"), max_entries=3, **kw),
+        lambda **kw: JournaledMemoryManager(str(tmp_path / "j.json"), max_entries=3, **kw),
+        lambda **kw: SQLiteMemoryManager(str(tmp_path / "m.db"), max_entries=3, **kw),
+    ]
+    for make in backends:
+        memory = make(fact_eviction="lfu")
+        for _ in range(3):
+            memory.add_fact("Consulted source: Agents 101", source="Agents 101")
+        memory.add_fact("Consulted  source: Agents 101", source="Mirror")
+        memory.add_facts(["Claim A", "Claim B"], source="analysis_summary")
+        # The repeated fact is one entry with a count and both sources.
+        facts = list(memory.state["facts"].values())
+        assert len(facts) == 3
+        repeated = next(f for f in facts if f["fact"].startswith("Consulted"))
+        assert repeated["count"] == 4
+        assert repeated["sources"] == ["Agents 101", "Mirror"]
+        assert repeated["first_seen"] <= repeated["last_seen"]
+
+        # LFU keeps the frequent fact although it is the least recently seen.
+        memory.add_fact("Claim C", source="analysis_summary")
+        kept = [f["fact"] for f in memory.state["facts"].values()]
+        assert "Consulted source: Agents 101" in kept and "Claim A" not in kept, type(memory).__name__
+        if hasattr(memory, "close"):
+            memory.close()
+
+    # LRU evicts the least recently seen fact regardless of its count.
+    memory = MemoryManager(str(tmp_path / "lru.json"), max_entries=2, fact_eviction="lru")
+    memory.add_facts(["x", "x", "y", "z"])
+    assert [f["fact"] for f in memory.state["facts"].values()] == ["y", "z"]
+
+    # Stores written before deduplication are folded on load.
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({"conversations": [], "facts": [{"fact": "f", "source": "a"}, {"fact": "f", "source": "b"}]}))
+    facts = MemoryManager(str(legacy)).state["facts"]
+    assert [(f["count"], f["sources"]) for f in facts.values()] == [(2, ["a", "b"])]
+
+    legacy_db = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(legacy_db)
+    conn.execute("CREATE TABLE facts (id INTEGER PRIMARY KEY AUTOINCREMENT, fact TEXT NOT NULL, source TEXT)")
+    conn.executemany("INSERT INTO facts (fact, source) VALUES (?, ?)", [("alpha", "a"), ("alpha", "b"), ("beta", None)])
+    conn.commit()
+    conn.close()
+    memory = SQLiteMemoryManager(legacy_db)
+    assert [(f["fact"], f["count"]) for f in memory.state["facts"].values()] == [("alpha", 2), ("beta", 1)]
+    assert memory.get_relevant_context("beta", k=5)["facts"][0]["fact"] == "beta"
+    log_info("✅ Facts are deduplicated and evicted by use")
@@ -2,9 +2,41 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from contextlib import contextmanager
+
 from workflow.orchestrator import Orchestrator
 from utils.logger import log_info
 
+CASSETTE = os.path.join(os.path.dirname(__file__), 'fixtures', 'ddg_cassette.json')
+
+
+@contextmanager
+def replayed_search():
+    """Serve DuckDuckGo searches from the recorded cassette, not the internet."""
+    from tools.built_in import async_search_tool, web_search_tool
+    from tools.built_in.search_replay import Cassette, ReplayServer
+    from utils.resilience import CircuitBreaker, TokenBucket
+
+    server = ReplayServer(Cassette(CASSETTE), latency=0.01).start()
+    guards = {"DDG_BREAKER": CircuitBreaker("duckduckgo"), "DDG_RATE_LIMITER": TokenBucket(rate=100, capacity=10)}
+    saved_env = {name: os.environ.get(name) for name in ("DDG_ENDPOINT", "TOOL_CACHE_DISABLED")}
+    saved_guards = {(m, n): getattr(m, n) for m in (web_search_tool, async_search_tool) for n in guards}
+    os.environ["DDG_ENDPOINT"] = server.url
+    os.environ["TOOL_CACHE_DISABLED"] = "1"
+    for (module, name) in saved_guards:
+        setattr(module, name, guards[name])
+    try:
+        yield server
+    finally:
+        server.stop()
+        for (module, name), value in saved_guards.items():
+            setattr(module, name, value)
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
 def test_error_handling():
     """Test that system handles errors gracefully."""
     log_info("=== Testing Error Handling ===")
@@ -16,7 +48,8 @@ def test_error_handling():
     log_info("✅ Empty query handled correctly")
     
     # Test normal query
-    result = orchestrator.run("What is agentic AI?")
+    with replayed_search():
+        result = orchestrator.run("What is agentic AI?", use_cache=False)
     assert len(result) > 100
     log_info("✅ Normal query works")
 
@@ -33,21 +66,25 @@ def test_nlp_extraction():
     log_info(f"✅ NLP extraction works: {len(result['claims'])} claims found")
 
 def test_web_search():
-    """Test real web search."""
+    """Test web search against recorded DuckDuckGo results."""
     log_info("=== Testing Web Search ===")
     from tools.built_in.web_search_tool import web_search
-    
-    results = web_search("agentic AI", top_k=3)
-    assert len(results) > 0
-    assert "title" in results[0]
+
+    with replayed_search() as server:
+        results = web_search("agentic AI", top_k=3, backend="duckduckgo")
+    assert len(results) == 3
+    assert results[0]["title"] == "What Is Agentic AI? An Overview"
+    assert results[0]["url"] == "https://example.com/agentic-ai-overview"
+    assert server.stats["requests"] == 1
     log_info(f"✅ Web search works: {len(results)} results found")
 
 def test_database_recovery():
     """Test database corruption handling."""
     log_info("=== Testing Database Recovery ===")
-    from db.database import verify_database_integrity, backup_database
-    
-    backup_database()
+    from db.database import ensure_db, verify_database_integrity, backup_database
+
+    ensure_db()
+    assert backup_database()
     is_ok = verify_database_integrity()
     assert is_ok
     log_info("✅ Database integrity verified")
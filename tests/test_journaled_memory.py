@@ -0,0 +1,51 @@
+import sys
+import os
+import json
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_journaled_memory(tmp_path):
+    """Test journal appends, replay, batched fsync and compaction."""
+    log_info("=== Testing Journaled Memory ===")
+    from memory.journaled_memory import JournaledMemoryManager
+    from memory.memory_manager import MemoryManager
+
+    store = str(tmp_path / "memory_store.json")
+    memory = JournaledMemoryManager(store, max_entries=3, fsync_every=4, fsync_interval=60, compact_threshold=1000)
+    for i in range(5):
+        memory.add_fact(f"fact {i}", source="test")
+    memory.add_conversation("q", "r")
+
+    # Nothing rewrote the snapshot; the journal holds one line per mutation.
+    assert not os.path.exists(store)
+    with open(store + ".journal", encoding="utf-8") as f:
+        assert len(f.readlines()) == 6
+    assert memory.get_stats()["fsyncs"] == 1
+
+    # A torn last line (crash mid-write) is ignored on replay.
+    with open(store + ".journal", "a", encoding="utf-8") as f:
+        f.write('{"kind": "facts", "ent')
+    memory = JournaledMemoryManager(store, max_entries=3, compact_threshold=8)
+    assert [f["fact"] for f in memory.state["facts"].values()] == ["fact 2", "fact 3", "fact 4"]
+    assert memory.get_stats()["journal_entries"] == 6
+
+    # Compaction folds the journal into a snapshot the plain manager can read.
+    for i in range(5, 8):
+        memory.add_fact(f"fact {i}")
+    deadline = time.time() + 5
+    while memory.get_stats()["compactions"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert memory.get_stats()["compactions"] == 1
+    memory.add_fact("fact 8")
+    memory.flush()
+
+    with open(store, encoding="utf-8") as f:
+        assert json.load(f)["journal_seq"] >= 8
+    assert [f["fact"] for f in MemoryManager(store, max_entries=3).state["facts"].values()][-1] in ("fact 7", "fact 8")
+    reloaded = JournaledMemoryManager(store, max_entries=3)
+    assert [f["fact"] for f in reloaded.state["facts"].values()] == ["fact 6", "fact 7", "fact 8"]
+    assert reloaded.state["conversations"] == [{"query": "q", "response": "r"}]
+    log_info("✅ Journaled memory replays and compacts")
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_memory_relevant_context(tmp_path, monkeypatch):
+    """Test relevance retrieval over memory and its use by ResearchAgent."""
+    log_info("=== Testing Memory Retrieval ===")
+    import agents.research_agent as research_agent
+    from memory.journaled_memory import JournaledMemoryManager
+    from memory.memory_manager import ANALYSIS_FACT_SOURCE, MemoryManager
+    from memory.sqlite_memory import SQLiteMemoryManager
+
+    claims = [
+        "Retrieval augmented generation grounds answers in documents.",
+        "Retrieval quality limits generation accuracy.",
+        "Vector databases store document embeddings for retrieval.",
+    ]
+    backends = [
+        MemoryManager(str(tmp_path / "memory.json"), max_entries=4),
+        JournaledMemoryManager(str(tmp_path / "journal.json"), max_entries=4),
+        SQLiteMemoryManager(str(tmp_path / "memory.db"), max_entries=4),
+    ]
+    for memory in backends:
+        memory.add_fact("Old fact about retrieval pipelines.", source="x")
+        memory.add_facts(claims, source=ANALYSIS_FACT_SOURCE)
+        memory.add_fact("Transformers use attention.", source=ANALYSIS_FACT_SOURCE)
+        memory.add_conversation("What is retrieval augmented generation?", "A report.")
+
+        context = memory.get_relevant_context("retrieval augmented generation", k=2)
+        facts = [f["fact"] for f in context["facts"]]
+        assert facts[0] == claims[0], type(memory).__name__
+        assert len(facts) == 2
+        assert context["facts"][0]["score"] >= context["facts"][1]["score"]
+        assert context["conversations"][0]["query"] == "What is retrieval augmented generation?"
+        # The trimmed fact is no longer retrievable.
+        assert all("Old fact" not in f["fact"] for f in memory.get_relevant_context("pipelines", k=5)["facts"])
+
+    # Replay after a restart rebuilds the index.
+    reloaded = JournaledMemoryManager(str(tmp_path / "journal.json"), max_entries=4)
+    assert reloaded.get_relevant_context("attention", k=1)["facts"][0]["fact"] == "Transformers use attention."
+
+    # With enough relevant claims in memory, research skips the fan-out.
+    searches = []
+    monkeypatch.setattr(research_agent, "web_search", lambda q, top_k: searches.append(top_k) or [
+        {"title": "Web", "url": "https://example.com", "content": "RAG overview."}
+    ])
+    monkeypatch.setattr(research_agent, "web_search_fanout", lambda *a, **kw: 1 / 0)
+    # The default MEMORY_RECALL_MIN_SCORE means the same on every backend:
+    # a claim with one of the three query terms is not a strong match.
+    for memory in (MemoryManager(str(tmp_path / "recall.json")), SQLiteMemoryManager(str(tmp_path / "recall.db"))):
+        memory.add_facts(claims, source=ANALYSIS_FACT_SOURCE)
+        relevance = {f["fact"]: f["relevance"] for f in memory.get_relevant_context("retrieval augmented generation")["facts"]}
+        assert relevance == {claims[0]: 1.0, claims[1]: 0.667, claims[2]: 0.333}, type(memory).__name__
+        agent = research_agent.ResearchAgent(memory=memory, memory_recall=5)
+        assert agent.recall("retrieval augmented generation") is None
+
+        memory.add_fact("Augmented generation with retrieval cuts hallucinations.", source=ANALYSIS_FACT_SOURCE)
+        searches.clear()
+        results = agent.run("retrieval augmented generation", top_k=3)
+        assert results[0]["title"] == "Memory: earlier research"
+        assert claims[0] in results[0]["content"] and claims[2] not in results[0]["content"]
+        assert searches == [2]
+    log_info("✅ Memory serves relevant context")
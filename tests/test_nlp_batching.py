@@ -0,0 +1,161 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+from utils.micro_batcher import MicroBatcher
+
+
+def test_micro_batcher():
+    """Test that concurrent submits share batches and keep their results."""
+    log_info("=== Testing Micro-Batching ===")
+    batcher = MicroBatcher(lambda items: [i * 2 for i in items], max_batch=8, max_wait=0.05)
+    results = {}
+    threads = [threading.Thread(target=lambda n=n: results.update({n: batcher.submit(n)})) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {n: n * 2 for n in range(8)}
+    stats = batcher.get_stats()
+    assert stats["items"] == 8 and stats["batches"] < 8
+    log_info(f"✅ Micro-batching works: {stats['batches']} batches for 8 items")
+
+
+def test_batch_extraction():
+    """Test that batch extraction matches per-text extraction, in order."""
+    log_info("=== Testing Batch Extraction ===")
+    from tools.custom.claim_evidence_extractor import (
+        extract_claims_and_evidence_advanced,
+        extract_claims_and_evidence_batch,
+    )
+
+    texts = [
+        "AI systems are becoming more sophisticated. Research shows that 80% of companies use AI.",
+        "",
+        "Agents can plan tasks. A controller delegates work to them.",
+        "AI systems are becoming more sophisticated. Research shows that 80% of companies use AI.",
+    ]
+    results = extract_claims_and_evidence_batch(texts, batch_size=2)
+    assert results == [extract_claims_and_evidence_advanced(t) for t in texts]
+    log_info("✅ Batch extraction works")
+
+
+def test_tiered_extraction():
+    """Test that only uncertain sentences are escalated to the spaCy parse."""
+    log_info("=== Testing Tiered Extraction ===")
+    import spacy
+    from tools.custom.claim_evidence_extractor import _classify_tiered, get_extraction_stats
+    from tools.custom.rule_classifier import classify_sentence
+
+    assert classify_sentence("Research shows that 80% of companies use AI.")[0] == "evidence"
+    assert classify_sentence("Agents can plan tasks.")[0] == "claim"
+    assert classify_sentence("A controller delegates work.")[1] < 0.8
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    before = get_extraction_stats()
+    texts = [
+        "AI systems are becoming more sophisticated. Research shows that 80% of companies use AI.",
+        "A controller delegates work to agents. Agents can plan tasks.",
+    ]
+    results = _classify_tiered(nlp, texts, batch_size=8, n_process=1)
+    assert results[0]["claims"] == ["AI systems are becoming more sophisticated."]
+    assert results[0]["evidence"] == ["Research shows that 80% of companies use AI."]
+    assert "Agents can plan tasks." in results[1]["claims"]
+    stats = get_extraction_stats()
+    assert stats["sentences"] - before["sentences"] == 4
+    assert stats["escalated"] - before["escalated"] == 1
+    log_info("✅ Tiered extraction escalates only uncertain sentences")
+
+
+def test_parsed_escalations_use_batcher(monkeypatch):
+    """Test that escalated sentences of parsed sources are batched and counted."""
+    log_info("=== Testing Parsed Escalations ===")
+    from tools.built_in.parsed_document import parse_documents
+    from tools.custom import claim_evidence_extractor as extractor
+
+    received = []
+
+    def batch_fn(items):
+        received.extend(items)
+        return extractor._extract_batched_items(items)
+
+    monkeypatch.setattr(extractor, "_BATCHER", MicroBatcher(batch_fn, max_batch=8, max_wait=0.01))
+    parsed = parse_documents([{"content": "A supervisor hands reviews to agents. Research shows that 70% of agents retry."}])
+    before = extractor.get_extraction_stats()
+    extraction = extractor.extract_claims_and_evidence_parsed(parsed, [(0, 0), (0, 1)])
+    stats = extractor.get_extraction_stats()
+    assert received == [("A supervisor hands reviews to agents.", "full")]
+    assert "Research shows that 70% of agents retry." in extraction["evidence"]
+    assert stats["sentences"] - before["sentences"] == 2
+    assert stats["escalated"] - before["escalated"] == 1
+    assert stats["escalation_rate"] > 0
+
+    # In full mode every sentence is escalated.
+    monkeypatch.setattr(extractor, "EXTRACTION_MODE", "full")
+    received.clear()
+    extractor.extract_claims_and_evidence_parsed(parsed, [(0, 0), (0, 1)])
+    assert [mode for _, mode in received] == ["full", "full"]
+    assert extractor.get_extraction_stats()["escalated"] - stats["escalated"] == 2
+    log_info("✅ Parsed escalations go through the micro-batcher")
+
+
+def test_extraction_cache_keys(monkeypatch):
+    """Test that extraction caching depends on the mode and skips fallback output."""
+    log_info("=== Testing Extraction Cache ===")
+    from tools.custom import claim_evidence_extractor as extractor
+
+    monkeypatch.delenv("TOOL_CACHE_DISABLED", raising=False)
+    monkeypatch.setattr(extractor, "_BATCHER", None)
+    calls = []
+    monkeypatch.setattr(extractor, "get_nlp", lambda: None)
+    monkeypatch.setattr(extractor, "extract_claims_and_evidence_fallback",
+                        lambda text: calls.append(text) or {"claims": [text], "evidence": [], "confidence": 1.0,
+                                                            "backend": "keywords"})
+    text = "Fallback output must not outlive an outage of spaCy."
+    extractor.extract_claims_and_evidence(text)
+    extractor.extract_claims_and_evidence_batch([text])
+    assert len(calls) == 2
+
+    # A spaCy result is cached per mode and threshold.
+    monkeypatch.setattr(extractor, "extract_claims_and_evidence_advanced",
+                        lambda text, mode=None: calls.append(mode) or {"claims": [], "evidence": [], "confidence": 0.0,
+                                                                       "backend": "spacy"})
+    calls.clear()
+    for mode in ("tiered", "tiered", "full", "full"):
+        monkeypatch.setattr(extractor, "EXTRACTION_MODE", mode)
+        extractor.extract_claims_and_evidence(text)
+    monkeypatch.setattr(extractor, "EXTRACTION_TIER_THRESHOLD", 0.5)
+    extractor.extract_claims_and_evidence(text)
+    assert calls == ["tiered", "full", "full"]
+    log_info("✅ Extraction cache keys include mode, threshold and backend")
+
+
+def test_parsed_extraction_cache_skips_fallback(monkeypatch):
+    """Test that parsed extraction is cached only when escalations ran spaCy."""
+    log_info("=== Testing Parsed Extraction Cache ===")
+    from tools.built_in.parsed_document import parse_documents
+    from tools.custom import claim_evidence_extractor as extractor
+
+    monkeypatch.delenv("TOOL_CACHE_DISABLED", raising=False)
+    monkeypatch.setattr(extractor, "_BATCHER", None)
+    backend = ["keywords"]
+    batches = []
+
+    def fake_batch(texts, batch_size=None, n_process=None, mode=None):
+        batches.append(texts)
+        return [{"claims": [t], "evidence": [], "confidence": 1.0, "backend": backend[0]} for t in texts]
+
+    monkeypatch.setattr(extractor, "_extract_uncached_batch", fake_batch)
+    parsed = parse_documents([{"content": "A curator files the orphaned drafts away."}])
+    for _ in range(2):
+        assert extractor.extract_claims_and_evidence_parsed(parsed, [(0, 0)])["backend"] == "keywords"
+    assert len(batches) == 2
+
+    backend[0] = "spacy"
+    for _ in range(2):
+        assert extractor.extract_claims_and_evidence_parsed(parsed, [(0, 0)])["backend"] == "spacy"
+    assert len(batches) == 3
+    log_info("✅ Parsed extraction caches only spaCy results")
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_nlp_service(tmp_path, monkeypatch):
+    """Test that extraction is served by the out-of-process NLP service."""
+    log_info("=== Testing NLP Service ===")
+    from tools.custom.claim_evidence_extractor import _extract_uncached_batch, extract_local_batch
+    import stat
+    from multiprocessing import AuthenticationError
+    from tools.custom import nlp_service
+    from tools.custom.nlp_service import NLPClient, NLPServer, get_nlp_client, get_nlp_service_stats
+
+    # The default socket lives in a private directory created by the server.
+    monkeypatch.setattr(nlp_service, "NLP_SOCKET_DIR", str(tmp_path / "private"))
+    monkeypatch.delenv("NLP_SERVICE_AUTHKEY", raising=False)
+    address = str(tmp_path / "private" / "nlp.sock")
+    server = NLPServer(address, workers=1).start()
+    monkeypatch.setenv("NLP_SERVICE_ADDRESS", address)
+    try:
+        assert stat.S_IMODE(os.stat(tmp_path / "private").st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(address).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(address + ".key").st_mode) == 0o600
+        # Without the per-run key, a client cannot talk to the service.
+        monkeypatch.setenv("NLP_SERVICE_AUTHKEY", "agentic-nlp")
+        try:
+            NLPClient(address, timeout=5).health()
+            assert False, "expected the handshake to be refused"
+        except AuthenticationError:
+            pass
+        monkeypatch.delenv("NLP_SERVICE_AUTHKEY")
+
+        texts = ["Agents can plan tasks. Research shows that 80% of teams use agents.", ""]
+        assert _extract_uncached_batch(texts) == extract_local_batch(texts)
+        health = get_nlp_client().health()
+        assert health["status"] == "ok" and health["requests"] == 1 and health["texts"] == 2
+        assert health["queue_depth"] == 0
+    finally:
+        server.stop()
+    assert get_nlp_service_stats()["status"] == "unreachable"
+    log_info("✅ NLP service works")
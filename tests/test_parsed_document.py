@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_parsed_document_pipeline():
+    """Test that the summarizer and extractor share one parse per source."""
+    log_info("=== Testing Parsed Documents ===")
+    from tools.built_in.parsed_document import get_parse_cache, parse_documents
+    from tools.built_in.summarizer_tool import summarize_parsed
+    from tools.custom.claim_evidence_extractor import extract_claims_and_evidence_parsed
+
+    sources = [
+        {"title": "A", "content": "Agentic systems can plan tasks. Research shows that 80% of teams use agents. Extra."},
+        {"title": "B", "content": "Memory is shared between agents.  Tools are called by agents."},
+    ]
+    parsed = parse_documents(sources)
+    assert parsed[0].sentences() == [
+        "Agentic systems can plan tasks.",
+        "Research shows that 80% of teams use agents.",
+        "Extra.",
+    ]
+    assert parsed[1].words(0) == ["Memory", "is", "shared", "between", "agents"]
+
+    hits = get_parse_cache().get_stats()["hits"]
+    assert parse_documents(sources[:1])[0] is parsed[0]
+    assert get_parse_cache().get_stats()["hits"] == hits + 1
+
+    summary, picked = summarize_parsed(parsed, max_sentences=3)
+    assert picked == [(0, 0), (0, 1), (1, 0)]
+    assert summary == "Agentic systems can plan tasks. Research shows that 80% of teams use agents. Memory is shared between agents."
+
+    extraction = extract_claims_and_evidence_parsed(parsed, picked)
+    assert extraction["evidence"] == ["Research shows that 80% of teams use agents."]
+    assert extraction["evidence_sources"] == [0]
+    assert extraction["claim_sources"] == [0, 1]
+    assert 0.0 < extraction["confidence"] <= 1.0
+    log_info("✅ Parsed documents are shared across tools")
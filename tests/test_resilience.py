@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+from utils.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, TokenBucket
+
+
+def test_circuit_breaker():
+    """Test that the breaker trips, rejects, and closes after a trial call."""
+    log_info("=== Testing Circuit Breaker ===")
+    breaker = CircuitBreaker("test", failure_threshold=2, window=60, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and not breaker.allow()  # a single trial call
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    stats = breaker.get_stats()
+    assert stats["state"] == CLOSED and stats["trips"] == 2 and stats["rejections"] == 2
+    log_info("✅ Circuit breaker works")
+
+
+def test_token_bucket():
+    """Test that the bucket allows bursts and then throttles."""
+    log_info("=== Testing Token Bucket ===")
+    bucket = TokenBucket(rate=50, capacity=2)
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire()  # burst spent, no waiting allowed
+    assert bucket.acquire(timeout=0.5)  # refills at 50 tokens/s
+    stats = bucket.get_stats()
+    assert stats["granted"] == 3 and stats["rejections"] == 1
+    log_info("✅ Token bucket works")
+
+
+def test_open_breaker_uses_corpus(monkeypatch):
+    """Test that web_search skips DuckDuckGo while the breaker is open."""
+    log_info("=== Testing Breaker Fallback ===")
+    from tools.built_in import web_search_tool
+
+    breaker = CircuitBreaker("duckduckgo", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(web_search_tool, "DDG_BREAKER", breaker)
+    monkeypatch.setenv("TOOL_CACHE_DISABLED", "1")
+
+    results = web_search_tool.web_search("multi-agent orchestration", top_k=1, backend="auto")
+    assert results[0]["title"] == "Multi-Agent Orchestration Basics"
+    assert breaker.get_stats()["rejections"] == 1
+    log_info("✅ Open breaker falls back to the corpus")
+
+
+def test_fallback_results_not_cached(tmp_path, monkeypatch):
+    """Test that corpus fallbacks during an outage are not served after recovery."""
+    log_info("=== Testing Outage Fallback Caching ===")
+    from tools.built_in import web_search_tool
+    from utils import tool_cache
+
+    monkeypatch.delenv("TOOL_CACHE_DISABLED", raising=False)
+    monkeypatch.setattr(tool_cache, "_TOOL_CACHE", tool_cache.ToolCache(db_path=str(tmp_path / "cache.db")))
+    monkeypatch.setattr(web_search_tool, "ddg_enabled", lambda: True)
+    live = [{"title": "Live Result", "content": "From the web.", "url": "https://example.com/live"}]
+    outage = {"down": True, "calls": 0}
+
+    def fake_ddg(query, top_k=3):
+        outage["calls"] += 1
+        return [] if outage["down"] else live
+
+    monkeypatch.setattr(web_search_tool, "web_search_duckduckgo", fake_ddg)
+    query = "multi-agent orchestration"
+    assert web_search_tool.web_search(query, top_k=1, backend="auto")[0]["title"] == "Multi-Agent Orchestration Basics"
+    assert web_search_tool.web_search(query, top_k=1, backend="duckduckgo") == []
+
+    outage["down"] = False
+    assert web_search_tool.web_search(query, top_k=1, backend="auto") == live
+    assert web_search_tool.web_search(query, top_k=1, backend="duckduckgo") == live
+    # The live answer is cached once DuckDuckGo has returned it.
+    assert outage["calls"] == 3
+    log_info("✅ Only live DuckDuckGo results are cached")
@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_near_duplicate_response_cache():
+    """Test that paraphrased queries reuse a cached report."""
+    log_info("=== Testing Response Cache ===")
+    from workflow.response_cache import ResponseCache, normalize_query
+
+    assert normalize_query("What are agentic AI systems?") == {"agentic", "ai", "system"}
+    assert normalize_query("Is agentic AI dangerous?") == {"agentic", "ai", "dangerous"}
+
+    cache = ResponseCache(threshold=0.6, max_age=60)
+    cache.store("What are agentic AI systems?", "# Report on agentic AI")
+    assert cache.lookup("what are agentic AI systems") == "# Report on agentic AI"
+    assert cache.lookup("Explain agentic AI") == "# Report on agentic AI"
+    assert cache.lookup("How does reinforcement learning work?") is None
+    # One extra topical term changes the question.
+    for query in ("What are the risks of agentic AI?", "agentic AI security", "Is agentic AI dangerous?"):
+        assert cache.lookup(query) is None, query
+
+    # The motivating pair matches in both orders.
+    for cached, asked in (("What is agentic AI?", "What are agentic AI systems?"),
+                          ("What are agentic AI systems?", "What is agentic AI?")):
+        pair = ResponseCache(threshold=0.6, max_age=60)
+        pair.store(cached, "# Report")
+        assert pair.lookup(asked) == "# Report", (cached, asked)
+        assert pair.lookup("What are the risks of agentic AI?") is None
+
+    stale = ResponseCache(max_age=-1)
+    stale.store("What is agentic AI?", "# Old report")
+    assert stale.lookup("What is agentic AI?") is None
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["near_hits"] == 1
+    log_info("✅ Response cache matches near-duplicate queries")
+
+
+def test_single_flight_coalescing():
+    """Test that concurrent identical calls share one execution."""
+    log_info("=== Testing Single-Flight Coalescing ===")
+    import threading
+    import time
+    from workflow.single_flight import SingleFlight
+
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_pipeline():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "# Shared report"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("agentic ai", slow_pipeline)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("agentic ai", slow_pipeline))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    while flight.get_stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+
+    assert results == ["# Shared report"] * 5
+    assert len(calls) == 1
+    assert flight.get_stats() == {"executions": 1, "coalesced": 4, "in_flight": 0}
+    log_info("✅ Concurrent duplicates were coalesced")
+
+
+def test_degraded_reports_not_cached():
+    """Test that reports built from fallback output are not cached."""
+    log_info("=== Testing Degraded Reports ===")
+    from workflow.orchestrator import Orchestrator
+    from workflow.response_cache import ResponseCache
+
+    class FailingResearch:
+        def run(self, query, top_k=3):
+            raise ConnectionError("search outage")
+
+    class WorkingResearch:
+        def run(self, query, top_k=3):
+            return [{"title": "Doc", "url": "https://example.com", "content": "Agentic AI systems can plan tasks."}]
+
+    orchestrator = Orchestrator(response_cache=ResponseCache(max_age=60))
+    orchestrator.controller.retry_delay = 0
+    orchestrator.controller.research_agent = FailingResearch()
+    assert orchestrator.controller.run_query("What is agentic AI?").degraded
+    orchestrator.run("What is agentic AI?")
+    assert orchestrator.response_cache.lookup("What is agentic AI?") is None
+
+    orchestrator.controller.research_agent = WorkingResearch()
+    report = orchestrator.run("What is agentic AI?")
+    assert orchestrator.response_cache.lookup("What is agentic AI?") == report
+    log_info("✅ Degraded reports are not cached")
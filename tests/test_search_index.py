@@ -0,0 +1,297 @@
+import sys
+import pytest
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_bm25_corpus_search():
+    """Test BM25 ranking and incremental add/remove on the corpus index."""
+    log_info("=== Testing BM25 Corpus Index ===")
+    from tools.built_in.bm25_index import BM25Index
+    from tools.built_in.web_search_tool import CORPUS, web_search_corpus
+
+    results = web_search_corpus("How does multi-agent orchestration work?", top_k=2)
+    assert results[0]["title"] == "Multi-Agent Orchestration Basics"
+    assert len(results) <= 2
+
+    index = BM25Index.from_documents(CORPUS)
+    doc_id = index.add_document({"title": "Vector Databases", "content": "Embeddings are stored in vector databases."})
+    assert index.search("vector embeddings", top_k=1)[0][1]["title"] == "Vector Databases"
+    assert index.remove_document(doc_id)
+    assert index.search("vector embeddings", top_k=1) == []
+    log_info("✅ BM25 index ranks, adds and removes documents")
+
+
+def test_dense_and_hybrid_search():
+    """Test the offline dense and hybrid search backends."""
+    log_info("=== Testing Dense Retrieval ===")
+    from tools.built_in.web_search_tool import web_search
+
+    # "orchestrate" shares no exact token with the corpus, only trigrams.
+    results = web_search("orchestrate", top_k=1, backend="dense")
+    assert results[0]["title"] == "Multi-Agent Orchestration Basics"
+
+    results = web_search("agents that plan and collaborate", top_k=2, backend="hybrid")
+    assert results[0]["title"] == "Introduction to Agentic AI Systems"
+    assert len(results) == 2
+    log_info("✅ Dense and hybrid backends return ranked corpus documents")
+
+
+def test_dense_index_concurrent_updates():
+    """Test that searches stay consistent while documents are added and removed."""
+    log_info("=== Testing Concurrent Dense Index Updates ===")
+    import threading
+    pytest.importorskip("numpy")
+    from tools.built_in.dense_index import DenseIndex
+
+    index = DenseIndex(dim=64)
+    for i in range(50):
+        index.add_document({"title": f"Stable {i}", "content": "vector search over embeddings"})
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        n = 0
+        while not stop.is_set():
+            doc_id = index.add_document({"title": f"Churn {n}", "content": "graph databases store edges"})
+            index.remove_document(doc_id)
+            n += 1
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(200):
+            for score, doc in index.search("vector embeddings", top_k=5):
+                if not (0.0 < score <= 1.0001 and doc["title"].startswith("Stable")):
+                    errors.append((score, doc["title"]))
+    finally:
+        stop.set()
+        writer.join()
+    assert not errors
+    log_info("✅ Dense index searches are consistent under concurrent updates")
+
+
+def test_mmap_corpus_store(tmp_path):
+    """Test writing and searching a memory-mapped corpus file."""
+    log_info("=== Testing Memory-Mapped Corpus ===")
+    from tools.built_in.corpus_store import MmapCorpus, write_corpus
+    from tools.built_in.web_search_tool import CORPUS, CORPUS_INDEX
+
+    path = str(tmp_path / "corpus.arac")
+    docs = CORPUS + [{"title": "Vector Databases", "url": "https://example.com/vdb", "content": "Embeddings are stored in vector databases."}]
+    assert write_corpus(path, docs) == len(docs)
+
+    store = MmapCorpus(path)
+    query = "How does multi-agent orchestration work?"
+    assert [d for s, d in store.search(query)] == [d for s, d in CORPUS_INDEX.search(query)]
+    assert store.search("vector embeddings", top_k=1)[0][1] == docs[-1]
+    store.close()
+    log_info("✅ Memory-mapped corpus matches the in-memory index")
+
+
+def test_incremental_corpus_ingestion(tmp_path):
+    """Test that re-ingesting only reindexes new or changed files."""
+    log_info("=== Testing Corpus Ingestion ===")
+    from tools.built_in.corpus_ingest import CorpusDirectory, ingest
+
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "vectors.md").write_text("# Vector Databases\nEmbeddings are stored in vector databases.\n")
+    (docs_dir / "dump.jsonl").write_text('{"title": "Graphs", "text": "Graph networks pass messages.", "url": "https://example.com/g"}\n')
+    corpus_dir = str(tmp_path / "corpus")
+
+    stats = ingest([str(docs_dir)], corpus_dir, workers=2)
+    assert stats["indexed_files"] == 2 and stats["indexed_docs"] == 2
+
+    (docs_dir / "vectors.md").write_text("# Vector Search\nApproximate nearest neighbour search over embeddings.\n")
+    stats = ingest([str(docs_dir)], corpus_dir, workers=2)
+    assert stats["indexed_files"] == 1 and stats["unchanged"] == 1
+
+    corpus = CorpusDirectory(corpus_dir)
+    assert len(corpus) == 2
+    assert corpus.search("embeddings", top_k=3)[0][1]["title"] == "Vector Search"
+    assert corpus.search("graph messages", top_k=1)[0][1]["url"] == "https://example.com/g"
+    corpus.close()
+
+    # Ingesting another directory adds to the corpus; deletions under an
+    # input are removed, and only --prune drops files from other roots.
+    more_dir = tmp_path / "more"
+    more_dir.mkdir()
+    (more_dir / "rl.txt").write_text("Reinforcement Learning\nRewards shape agent behaviour.\n")
+    stats = ingest([str(more_dir)], corpus_dir, workers=2)
+    assert stats["indexed_files"] == 1 and stats["removed"] == 0
+    (docs_dir / "dump.jsonl").unlink()
+    stats = ingest([str(docs_dir)], corpus_dir, workers=2)
+    assert stats["removed"] == 1
+    corpus = CorpusDirectory(corpus_dir)
+    assert len(corpus) == 2
+    corpus.close()
+    stats = ingest([str(docs_dir)], corpus_dir, workers=2, prune=True)
+    assert stats["removed"] == 1
+    corpus = CorpusDirectory(corpus_dir)
+    assert [d["title"] for d in corpus.iter_documents()] == ["Vector Search"]
+    corpus.close()
+    log_info("✅ Ingestion reindexes only changed files")
+
+
+def test_corpus_survives_interrupted_compaction(tmp_path, monkeypatch):
+    """Test that segments are deleted only after the new manifest is saved."""
+    log_info("=== Testing Interrupted Compaction ===")
+    from tools.built_in import corpus_ingest
+    from tools.built_in.corpus_ingest import CorpusDirectory, compact, ingest
+
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "a.txt").write_text("Agents\nAgents plan tasks.\n")
+    corpus_dir = tmp_path / "corpus"
+    ingest([str(docs_dir)], str(corpus_dir), workers=1)
+    (docs_dir / "b.txt").write_text("Memory\nMemory is shared.\n")
+    ingest([str(docs_dir)], str(corpus_dir), workers=1)
+    before = sorted(p.name for p in corpus_dir.glob("segment-*.arac"))
+    assert len(before) == 2
+
+    def crash(corpus_dir, manifest):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(corpus_ingest, "_save_manifest", crash)
+    try:
+        compact(str(corpus_dir))
+        assert False, "expected the compaction to fail"
+    except OSError:
+        pass
+    monkeypatch.undo()
+    # The old manifest and its segments are intact; the partial segment is an orphan.
+    corpus = CorpusDirectory(str(corpus_dir))
+    assert len(corpus) == 2
+    corpus.close()
+    assert len(list(corpus_dir.glob("segment-*.arac"))) == 3
+
+    assert compact(str(corpus_dir)) == 2
+    assert len(list(corpus_dir.glob("segment-*.arac"))) == 1
+    corpus = CorpusDirectory(str(corpus_dir))
+    assert sorted(d["title"] for d in corpus.iter_documents()) == ["a", "b"]
+    corpus.close()
+    log_info("✅ Interrupted compaction leaves the corpus readable")
+
+
+def test_fanout_search_deadline(monkeypatch):
+    """Test that fan-out merges sub-query results and drops late ones."""
+    log_info("=== Testing Fan-out Search ===")
+    import asyncio
+    import time
+    from tools.built_in import async_search_tool
+    from utils.resilience import TokenBucket
+
+    subqueries = async_search_tool.decompose_query("What is agentic AI?", max_subqueries=3)
+    assert subqueries[0] == "What is agentic AI?" and len(subqueries) == 3
+
+    async def fake_search(query, top_k=3, reserved=False):
+        if query == subqueries[-1]:
+            await asyncio.sleep(5)
+        return [{"title": query, "url": f"https://example.com/{len(query)}", "content": query}]
+
+    monkeypatch.setenv("TOOL_CACHE_DISABLED", "1")
+    monkeypatch.setattr(async_search_tool, "DDG_RATE_LIMITER", TokenBucket(rate=100, capacity=10))
+    monkeypatch.setattr(async_search_tool, "ddg_enabled", lambda: True)
+    monkeypatch.setattr(async_search_tool, "search_duckduckgo_async", fake_search)
+    start = time.time()
+    results = async_search_tool.web_search_fanout("What is agentic AI?", top_k=3, deadline=0.2, backend="auto")
+    assert time.time() - start < 2
+    assert [r["title"] for r in results] == subqueries[:2]
+
+    # With the default bucket (burst 3), concurrent fan-outs narrow to the
+    # tokens left instead of falling back to the corpus.
+    searched = []
+
+    async def quick_search(query, top_k=3, reserved=False):
+        assert reserved
+        searched.append(query)
+        return [{"title": query, "url": f"https://example.com/{query}", "content": query}]
+
+    monkeypatch.setattr(async_search_tool, "DDG_RATE_LIMITER", TokenBucket(rate=0.001, capacity=3))
+    monkeypatch.setattr(async_search_tool, "DDG_RATE_WAIT", 0.0)
+    monkeypatch.setattr(async_search_tool, "search_duckduckgo_async", quick_search)
+
+    async def three_queries():
+        questions = ["What is agentic AI?", "How do agents use memory?", "Why use reinforcement learning?"]
+        return await asyncio.gather(*(
+            async_search_tool.web_search_fanout_async(q, top_k=3, max_subqueries=3, deadline=1.0, backend="auto")
+            for q in questions
+        ))
+
+    merged = asyncio.run(three_queries())
+    assert len(searched) == 3
+    assert all(len(r) == 1 and r[0]["url"].startswith("https://example.com/") for r in merged)
+
+    # Inside an event loop the blocking wrapper refuses instead of stalling the loop.
+    async def blocking_call():
+        async_search_tool.web_search_fanout("What is agentic AI?", deadline=1.0)
+
+    with pytest.raises(RuntimeError, match="web_search_fanout_async"):
+        asyncio.run(blocking_call())
+    log_info("✅ Fan-out search respects its deadline")
+
+
+def test_near_duplicate_sources():
+    """Test that mirrored sources collapse into the best-ranked copy."""
+    log_info("=== Testing Source De-duplication ===")
+    from tools.built_in.dedup_tool import dedupe_sources
+
+    content = "Agentic AI systems use autonomous agents that can plan, act and collaborate with tools and memory."
+    sources = [
+        {"title": "Agentic AI explained", "url": "https://a.example/post", "content": content},
+        {"title": "Reinforcement Learning", "url": "https://b.example/rl", "content": "Feedback signals adjust agent strategies."},
+        {"title": "Agentic AI explained | Mirror", "url": "https://mirror.example/post", "content": content + "!"},
+        {"title": "Reinforcement Learning", "url": "https://b.example/rl", "content": "Feedback signals adjust agent strategies."},
+    ]
+    unique = dedupe_sources(sources, threshold=0.7)
+    assert [s["title"] for s in unique] == ["Agentic AI explained", "Reinforcement Learning"]
+    assert unique[0]["urls"] == ["https://a.example/post", "https://mirror.example/post"]
+    assert unique[1]["urls"] == ["https://b.example/rl"]
+    log_info("✅ Near-duplicate sources are merged")
+
+
+def test_dense_search_uses_loaded_corpus(tmp_path, monkeypatch):
+    """Test that dense and hybrid search cover the loaded corpus store."""
+    log_info("=== Testing Dense Retrieval Over A Corpus Store ===")
+    from tools.built_in import web_search_tool
+    from tools.built_in.corpus_store import write_corpus
+
+    pytest.importorskip("numpy")
+    for name in ("CORPUS_STORE", "CORPUS_DENSE_INDEX", "_DENSE_INDEX_BUILT"):
+        monkeypatch.setattr(web_search_tool, name, getattr(web_search_tool, name))
+    path = str(tmp_path / "corpus.arac")
+    write_corpus(path, [
+        {"title": "Vector Databases", "url": "https://example.com/vdb", "content": "Embeddings are stored in vector databases."},
+        {"title": "Graph Databases", "url": "https://example.com/gdb", "content": "Graphs store nodes and edges."},
+    ])
+    web_search_tool.load_corpus_file(path)
+
+    results = web_search_tool.web_search_dense("vector embedding", top_k=3)
+    assert results[0]["title"] == "Vector Databases"
+    titles = {d["title"] for d in web_search_tool.web_search_hybrid("databases", top_k=5)}
+    assert titles == {"Vector Databases", "Graph Databases"}
+
+    # The store is immutable, so runtime corpus edits are refused.
+    for edit in (lambda: web_search_tool.add_corpus_document({"title": "New", "content": "x"}),
+                 lambda: web_search_tool.remove_corpus_document(0)):
+        try:
+            edit()
+            assert False, "expected the corpus edit to be refused"
+        except RuntimeError:
+            pass
+
+    # Above the size cap the store is not copied into RAM; BM25 answers.
+    monkeypatch.setattr(web_search_tool, "DENSE_CORPUS_MAX_DOCS", 1)
+    web_search_tool.load_corpus_file(path)
+    assert web_search_tool.get_corpus_dense_index() is None
+    assert web_search_tool.web_search_dense("vector databases", top_k=1)[0]["title"] == "Vector Databases"
+
+    # With a dense default backend the index is built at load time.
+    monkeypatch.setattr(web_search_tool, "DENSE_CORPUS_MAX_DOCS", 10)
+    monkeypatch.setattr(web_search_tool, "DEFAULT_SEARCH_BACKEND", "hybrid")
+    web_search_tool.load_corpus_file(path)
+    assert web_search_tool._DENSE_INDEX_BUILT and len(web_search_tool.CORPUS_DENSE_INDEX) == 2
+    log_info("✅ Dense index is built from the loaded corpus store")
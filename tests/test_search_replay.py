@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+from tools.built_in.search_replay import Cassette, ReplayServer
+
+
+def test_record_and_replay(tmp_path, monkeypatch):
+    """Test that recorded results are replayed through the DuckDuckGo path."""
+    log_info("=== Testing Search Record/Replay ===")
+    from tools.built_in import web_search_tool
+    from utils.resilience import CircuitBreaker, TokenBucket
+
+    path = str(tmp_path / "cassette.json")
+    raw = [
+        {"title": "Agentic AI", "href": "https://example.com/a", "body": "Agents plan and act."},
+        {"title": "Agent Memory", "href": "https://example.com/m", "body": "Agents remember context."},
+    ]
+    Cassette(path).record("Agentic  AI", raw)
+    assert Cassette(path).lookup("agentic ai", 1) == raw[:1]
+
+    server = ReplayServer(Cassette(path), latency=0.01).start()
+    monkeypatch.setenv("DDG_ENDPOINT", server.url)
+    monkeypatch.setattr(web_search_tool, "DDG_BREAKER", CircuitBreaker("duckduckgo", failure_threshold=1))
+    monkeypatch.setattr(web_search_tool, "DDG_RATE_LIMITER", TokenBucket(rate=100, capacity=10))
+    try:
+        results = web_search_tool.web_search_duckduckgo("agentic AI", top_k=2)
+        assert [r["url"] for r in results] == ["https://example.com/a", "https://example.com/m"]
+        assert web_search_tool.web_search_duckduckgo("unrecorded query") == []
+
+        server.error_rate = 1.0
+        assert web_search_tool.web_search_duckduckgo("agentic AI") == []
+        assert web_search_tool.DDG_BREAKER.state == "open"
+        assert server.stats == {"requests": 3, "errors": 1, "misses": 1}
+    finally:
+        server.stop()
+    log_info("✅ Search replay works")
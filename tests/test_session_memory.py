@@ -0,0 +1,92 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_session_memory(tmp_path, monkeypatch):
+    """Test per-session memory shards, LRU closing and isolation."""
+    log_info("=== Testing Session Memory ===")
+    from memory.memory_manager import MemoryManager, create_memory_manager
+    from memory.session_memory import ShardedMemory, session_scope
+
+    monkeypatch.setenv("MEMORY_SHARD_DIR", str(tmp_path / "shards"))
+    closed = []
+
+    class TrackedMemory(MemoryManager):
+        def close(self):
+            closed.append(self.filename)
+
+    def factory(session_id):
+        if session_id is None:
+            return TrackedMemory(str(tmp_path / "shared.json"))
+        return TrackedMemory(create_memory_manager(session_id).filename)
+
+    memory = ShardedMemory(max_open=2, factory=factory)
+    with session_scope("alice"):
+        memory.add_fact("Alice studies reinforcement learning.")
+    with session_scope("bob"):
+        memory.add_fact("Bob studies databases.")
+        assert [f["fact"] for f in memory.get_recent_context()["facts"]] == ["Bob studies databases."]
+        assert memory.get_relevant_context("reinforcement learning")["facts"] == []
+    memory.add_fact("Shared fact.")
+    assert [f["fact"] for f in memory.get_recent_context()["facts"]] == ["Shared fact."]
+    assert sorted(os.listdir(tmp_path / "shards")) == ["alice.json", "bob.json"]
+
+    # A third session closes the least recently used shard, which reopens from disk.
+    with session_scope("carol/../x"):
+        memory.add_fact("Carol's id is hashed into a safe file name.")
+    assert closed == [str(tmp_path / "shards" / "alice.json")]
+    with session_scope("alice"):
+        assert memory.get_relevant_context("reinforcement learning")["facts"][0]["fact"].startswith("Alice")
+    stats = memory.get_stats()
+    assert stats["open_shards"] == 2 and stats["evictions"] == 2 and stats["opens"] == 4
+
+    # Sessions do not wait on each other's shard lock.
+    memory = ShardedMemory(max_open=8, factory=factory)
+    with memory.shard("slow") as slow:
+        slow._lock.acquire()
+    try:
+        done = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            def fast():
+                with session_scope("fast"):
+                    memory.add_fact("Not blocked.")
+                done.set()
+            pool.submit(fast)
+            assert done.wait(timeout=5)
+    finally:
+        slow._lock.release()
+
+    # Many concurrent sessions with a small LRU never lose writes.
+    memory = ShardedMemory(max_open=3, factory=factory)
+
+    def write(i):
+        with session_scope(f"s{i % 6}"):
+            memory.add_fact(f"fact {i}")
+            time.sleep(0.001)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(120)))
+    memory.close()
+    total = sum(len(MemoryManager(str(tmp_path / "shards" / f"s{s}.json"), max_entries=100).state["facts"]) for s in range(6))
+    assert total == 120
+    log_info("✅ Session memory is sharded and bounded")
+
+
+def test_shard_names_do_not_collide():
+    """Test that hashed session ids cannot name another session's shard."""
+    log_info("=== Testing Shard Names ===")
+    import hashlib
+    from memory.memory_manager import shard_name
+
+    unsafe = "carol@example.com"
+    digest = hashlib.blake2b(unsafe.encode("utf-8"), digest_size=16).hexdigest()
+    assert shard_name(digest) == digest
+    assert shard_name(unsafe) != digest and shard_name(unsafe).endswith(digest)
+    assert shard_name("../etc/passwd") not in {"../etc/passwd", shard_name(unsafe)}
+    log_info("✅ Safe and hashed shard names are disjoint")
@@ -0,0 +1,50 @@
+import sys
+import os
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def _write_facts(db_path: str, worker: int) -> None:
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+    from memory.sqlite_memory import SQLiteMemoryManager
+
+    memory = SQLiteMemoryManager(db_path, max_entries=1000)
+    for i in range(20):
+        memory.add_fact(f"process {worker} fact {i}", source=f"p{worker}")
+
+
+def test_sqlite_memory(tmp_path):
+    """Test the SQLite memory backend under threads and processes."""
+    log_info("=== Testing SQLite Memory ===")
+    from memory.sqlite_memory import SQLiteMemoryManager
+
+    db_path = str(tmp_path / "memory.db")
+    memory = SQLiteMemoryManager(db_path, max_entries=3)
+    memory.add_facts([f"fact {i}" for i in range(5)], source="batch")
+    memory.add_conversation("q", "r")
+    context = memory.get_recent_context(limit=2)
+    assert context["conversations"] == [{"query": "q", "response": "r"}]
+    assert [(f["fact"], f["sources"]) for f in context["facts"]] == [("fact 3", ["batch"]), ("fact 4", ["batch"])]
+    assert [f["fact"] for f in memory.state["facts"].values()] == ["fact 2", "fact 3", "fact 4"]
+    assert memory.get_stats()["rows_trimmed"] == 2
+
+    # Concurrent request threads share one manager.
+    memory = SQLiteMemoryManager(db_path, max_entries=1000)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: memory.add_conversation(f"q{i}", f"r{i}"), range(200)))
+    assert len(memory.state["conversations"]) == 201
+
+    # Worker processes share the same database file.
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_write_facts, args=(db_path, w)) for w in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+    facts = [f["fact"] for f in memory.state["facts"].values()]
+    assert sum(f.startswith("process ") for f in facts) == 60
+    log_info("✅ SQLite memory is shared safely")
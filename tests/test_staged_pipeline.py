@@ -0,0 +1,106 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def _controller(search_delay, analysis_delay, calls, gate=None):
+    from controller.controller import Controller
+
+    cpu = threading.Semaphore(1)
+
+    class Research:
+        def run(self, query, top_k=3):
+            if gate is not None and query == "question 7":
+                gate.set()
+            time.sleep(search_delay)
+            return [{"title": "Doc", "url": "https://example.com", "content": f"About {query}."}]
+
+    class Analysis:
+        def run(self, query, sources):
+            # One "core": analyses never run concurrently with each other.
+            with cpu:
+                if gate is not None and query == "question 0":
+                    # Only a pipeline can start the last search before the
+                    # first analysis ends; run back to back this times out.
+                    calls.append(("overlapped", gate.wait(5)))
+                calls.append(("analysis", query, time.perf_counter()))
+                time.sleep(analysis_delay)
+            return {"summary": f"Summary of {query}.", "claims": ["c"], "evidence": ["e"], "confidence": 0.9}
+
+    class Writer:
+        def run(self, query, analysis, sources):
+            if "crash" in query:
+                raise RuntimeError("writer crashed")
+            return f"# Report\n\n{analysis['summary']} " + "Details. " * 10
+
+    return Controller(Research(), Analysis(), Writer(), max_retries=1, retry_delay=0)
+
+
+def test_staged_pipeline_overlaps_stages():
+    """Test that research for later queries overlaps analysis of earlier ones."""
+    log_info("=== Testing Staged Pipeline ===")
+    from workflow.staged_pipeline import StagedPipeline
+    from memory.session_memory import CURRENT_SESSION, session_scope
+    from tools.custom.claim_evidence_extractor import get_batching_stats
+
+    calls = []
+    gate = threading.Event()
+    controller = _controller(search_delay=0.2, analysis_delay=0.05, calls=calls, gate=gate)
+    pipeline = StagedPipeline(controller, research_workers=8, analysis_workers=1, writer_workers=1, queue_size=4)
+    try:
+        futures = [pipeline.submit(f"question {i}") for i in range(8)]
+        responses = [f.result(timeout=10) for f in futures]
+
+        assert all(r.startswith("# Report") for r in responses)
+        assert "question 3" in responses[3]
+        # The last query's research started while the first was being analyzed.
+        assert ("overlapped", True) in calls
+        assert get_batching_stats() is not None
+        stats = pipeline.get_stats()
+        assert [name for name in stats] == ["research", "analysis", "writer"]
+        assert stats["research"]["processed"] == 8 and stats["writer"]["processed"] == 8
+        assert stats["analysis"]["max_queued"] >= 2 and stats["analysis"]["queued"] == 0
+        assert stats["analysis"]["avg_wait_ms"] > 0
+
+        # The submitter's memory session follows the query through the stages.
+        seen = []
+        controller.analysis_agent.run = lambda query, sources: (
+            seen.append(CURRENT_SESSION.get()) or {"summary": "s", "claims": ["c"], "evidence": ["e"], "confidence": 0.9}
+        )
+        with session_scope("alice"):
+            future = pipeline.submit("session question")
+        future.result(timeout=10)
+        assert seen and set(seen) == {"alice"}
+
+        # Failures and invalid queries resolve their own future only.
+        assert pipeline.run("please crash").startswith("# System Error")
+        assert pipeline.run("  ").startswith("Your query appears to be empty")
+        assert pipeline.get_stats()["writer"]["failed"] == 0
+    finally:
+        pipeline.close()
+    log_info("✅ Staged pipeline works")
+
+
+def test_staged_pipeline_backpressure():
+    """Test that full queues block submitters instead of growing."""
+    log_info("=== Testing Staged Pipeline Backpressure ===")
+    from workflow.staged_pipeline import StagedPipeline
+
+    calls = []
+    controller = _controller(search_delay=0.0, analysis_delay=0.05, calls=calls)
+    pipeline = StagedPipeline(controller, research_workers=1, analysis_workers=1, writer_workers=1, queue_size=1)
+    try:
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            responses = list(pool.map(pipeline.run, [f"question {i}" for i in range(12)]))
+        assert len(responses) == 12 and all(r.startswith("# Report") for r in responses)
+        stats = pipeline.get_stats()
+        assert all(stage["max_queued"] <= 1 for stage in stats.values())
+        assert stats["analysis"]["processed"] == 12
+    finally:
+        pipeline.close()
+    log_info("✅ Staged pipeline backpressure works")
@@ -0,0 +1,43 @@
+import sys
+import os
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def test_lazy_startup():
+    """Test that building the orchestrator defers spaCy, DuckDuckGo and numpy."""
+    log_info("=== Testing Lazy Startup ===")
+    script = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "from workflow.orchestrator import Orchestrator\n"
+        "Orchestrator()\n"
+        "print([m for m in ('spacy', 'duckduckgo_search', 'numpy') if m in sys.modules])\n"
+    ) % SRC_DIR
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == "[]"
+    log_info("✅ Heavy dependencies load on first use")
+
+
+def test_lazy_package_exports():
+    """Test that package exports resolve on access and are listed by dir()."""
+    log_info("=== Testing Lazy Package Exports ===")
+    script = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "import controller\n"
+        "loaded = 'controller.protocol' in sys.modules\n"
+        "listed = 'QueryResult' in dir(controller)\n"
+        "print(loaded, listed, controller.QueryResult.__name__)\n"
+        "try:\n"
+        "    controller.Missing\n"
+        "except AttributeError as e:\n"
+        "    print(e)\n"
+    ) % SRC_DIR
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    lines = out.strip().splitlines()
+    assert lines[-2] == "False True QueryResult"
+    assert lines[-1] == "module 'controller' has no attribute 'Missing'"
+    log_info("✅ Exports load on first access")
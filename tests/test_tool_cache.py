@@ -0,0 +1,29 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import log_info
+
+
+def test_two_tier_tool_cache(tmp_path):
+    """Test LRU eviction, disk-tier persistence and TTL expiry."""
+    log_info("=== Testing Tool Cache ===")
+    from utils.tool_cache import ToolCache, make_cache_key
+
+    db_path = str(tmp_path / "cache.db")
+    cache = ToolCache(db_path=db_path, max_entries=1)
+    key_a = make_cache_key("web_search", ("agentic AI",), {"top_k": 3})
+    key_b = make_cache_key("web_search", ("agentic AI",), {"top_k": 5})
+    assert key_a != key_b
+
+    cache.set("web_search", key_a, [{"title": "A"}], ttl=60)
+    cache.set("web_search", key_b, [{"title": "B"}], ttl=-1)  # already expired
+    assert cache.get("web_search", key_a) == (True, [{"title": "A"}])  # evicted from LRU, served from disk
+    assert cache.get("web_search", key_b) == (False, None)
+
+    restarted = ToolCache(db_path=db_path, max_entries=8)
+    assert restarted.get("web_search", key_a) == (True, [{"title": "A"}])
+    assert restarted.get("web_search", key_a) == (True, [{"title": "A"}])
+    counters = restarted.get_stats()["tools"]["web_search"]
+    assert counters == {"memory_hits": 1, "disk_hits": 1, "misses": 0}
+    log_info("✅ Tool cache serves hits from memory and disk")